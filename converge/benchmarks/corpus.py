@@ -0,0 +1,129 @@
+"""
+Synthetic corpus for the benchmarks: resume and project JSON in the shapes
+the parsers produce, plus random unit embeddings.
+
+Embeddings are drawn around a handful of topic directions (not uniformly
+on the sphere, where every cosine is ~0), so the semantic gate sees the
+usual mix of unrelated, borderline, meaningful and strong candidates.
+Everything is seeded, so a given (size, seed) always yields the same corpus.
+"""
+import numpy as np
+
+EMBEDDING_DIM = 768
+TOPICS = 12
+
+SKILLS = {
+    "programming_languages": ["Python", "Java", "C/C++", "Go", "Rust", "JavaScript", "TypeScript", "SQL", "Kotlin", "Solidity"],
+    "frameworks_libraries": ["Django", "React", "Node.js", "PyTorch", "TensorFlow", "Pandas", "Scikit-Learn", "Spring Boot", "Flutter", "FastAPI"],
+    "tools_platforms": ["Docker", "Kubernetes", "AWS", "GCP", "Git", "Linux", "PostgreSQL", "Redis", "Firebase", "Twilio"],
+    "core_cs_concepts": ["Data Structures & Algorithms", "OOPs", "Operating Systems", "Computer Networks", "DBMS", "Cryptography"],
+    "domain_skills": ["Machine Learning", "Data Science", "Web Development", "Cyber Security", "Blockchain", "Robotics", "Cloud"],
+}
+DOMAINS = ["Healthcare", "Transportation", "FinTech", "Education", "Security", "Machine Learning", "E-commerce", "Climate"]
+LEVELS = ["beginner", "intermediate", "advanced"]
+AVAILABILITY = ["low", "medium", "high"]
+PROJECT_TYPES = ["hackathon", "research", "startup", "open_source"]
+
+
+def _pick(rng, items, low, high):
+    return [items[i] for i in rng.choice(len(items), size=int(rng.integers(low, high + 1)), replace=False)]
+
+
+def resume_json(rng, resume_id):
+    """One resume in the parser's schema."""
+    level = LEVELS[int(rng.integers(len(LEVELS)))]
+    skills = {category: _pick(rng, items, 1, 4) for category, items in SKILLS.items()}
+    projects = []
+    for p in range(int(rng.integers(1, 5))):
+        technologies = _pick(rng, SKILLS["programming_languages"] + SKILLS["frameworks_libraries"], 2, 5)
+        domain = DOMAINS[int(rng.integers(len(DOMAINS)))]
+        projects.append({
+            "title": f"Project {resume_id}-{p}",
+            "description": f"Built a {domain.lower()} platform using {', '.join(technologies)}.",
+            "technologies": technologies,
+            "domain": domain,
+            "role": "",
+            "team_size": int(rng.integers(1, 6)),
+            "completion_status": "completed" if rng.random() < 0.8 else "ongoing",
+        })
+    return {
+        "profile": {
+            "user_id": str(resume_id),
+            "name": f"User {resume_id}",
+            "year": str(int(rng.integers(1, 5))),
+            "department": "CSE",
+            "institution": "Synthetic University",
+            "availability": AVAILABILITY[int(rng.integers(len(AVAILABILITY)))],
+        },
+        "skills": skills,
+        "experience_level": {
+            "overall": level,
+            "by_domain": {d: LEVELS[int(rng.integers(len(LEVELS)))] for d in ("web_dev", "ml_ai", "systems", "security")},
+        },
+        "projects": projects,
+        "interests": {
+            "technical": _pick(rng, SKILLS["domain_skills"], 1, 2),
+            "problem_domains": _pick(rng, DOMAINS, 0, 2),
+            "learning_goals": _pick(rng, SKILLS["frameworks_libraries"], 0, 2),
+        },
+        "collaboration_preferences": {"roles_preferred": [], "project_types": _pick(rng, PROJECT_TYPES, 1, 2), "team_size_preference": ""},
+        "open_source": {"experience": "none", "technologies": [], "contributions": 0},
+        "achievements": {"hackathons": [], "certifications": [], "awards": []},
+        "reputation_signals": {
+            "completed_projects": int(rng.integers(0, 8)),
+            "dropped_projects": int(rng.integers(0, 2)),
+            "average_rating": 0.0,
+            "peer_endorsements": 0,
+        },
+    }
+
+
+def project_json(rng, project_id):
+    """One project in the project parser's schema."""
+    domains = _pick(rng, DOMAINS, 1, 2)
+    return {
+        "project_id": f"proj_{project_id}",
+        "title": f"{domains[0]} platform",
+        "description": f"Building a {domains[0].lower()} system.",
+        "required_skills": _pick(rng, SKILLS["programming_languages"] + SKILLS["domain_skills"], 3, 5),
+        "preferred_technologies": _pick(rng, SKILLS["frameworks_libraries"], 2, 3),
+        "domains": domains,
+        "project_type": PROJECT_TYPES[int(rng.integers(len(PROJECT_TYPES)))],
+        "team_size": int(rng.integers(2, 6)),
+    }
+
+
+def topic_directions(seed=0, dim=EMBEDDING_DIM):
+    rng = np.random.default_rng(seed)
+    topics = rng.normal(size=(TOPICS, dim))
+    return topics / np.linalg.norm(topics, axis=1, keepdims=True)
+
+
+def unit_embeddings(rng, n, topics):
+    """(n, dim) float32 unit vectors, each a random-strength pull toward one topic plus noise."""
+    dim = topics.shape[1]
+    pull = rng.uniform(0.0, 2.0, size=(n, 1)) * np.sqrt(dim)
+    vectors = topics[rng.integers(len(topics), size=n)] * pull + rng.normal(size=(n, dim))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def make_corpus(size, seed=0, chunk=5000):
+    """
+    Yield (resume_id, resume_json, embedding) for `size` resumes, generated
+    `chunk` at a time so even the 100k corpus is never held in full.
+    """
+    rng = np.random.default_rng(seed + 1)
+    topics = topic_directions(seed)
+    for start in range(0, size, chunk):
+        embeddings = unit_embeddings(rng, min(chunk, size - start), topics)
+        for offset, embedding in enumerate(embeddings):
+            resume_id = start + offset + 1
+            yield resume_id, resume_json(rng, resume_id), embedding
+
+
+def make_project(seed=0):
+    """(project_json, unit embedding) near the first topic."""
+    rng = np.random.default_rng(seed + 2)
+    topics = topic_directions(seed)
+    embedding = topics[0] * 3.0 + rng.normal(size=topics.shape[1]) / np.sqrt(topics.shape[1])
+    return project_json(rng, 1), (embedding / np.linalg.norm(embedding)).astype(np.float32)
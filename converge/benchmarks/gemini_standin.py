@@ -0,0 +1,234 @@
+"""
+Local stand-in for the Gemini API, for load tests that must not hit
+generativelanguage.googleapis.com.
+
+Implements the calls the google-genai SDK makes for embed_resume,
+embed_project and parse_resume:
+
+    POST /v1beta/models/{model}:batchEmbedContents   (client.models.embed_content)
+    POST /v1beta/models/{model}:embedContent
+    POST /v1beta/models/{model}:generateContent      (client.models.generate_content)
+    GET  /stats                                      (counters since start)
+
+Embeddings are deterministic 768-dim unit vectors built from hashed tokens,
+so texts that share words get similar vectors and matching still has
+something to rank. generateContent answers with a synthetic resume JSON
+(benchmarks/corpus.py) or the contents of --generate-file, cut down to the
+properties of the request's responseSchema when one is sent; with
+--bad-section-rate each returned section is corrupted at that rate, to
+exercise parse_resume's section re-requests.
+
+    python benchmarks/gemini_standin.py --port 8090 --latency-ms 120 --jitter-ms 40 \\
+        --error-rate 0.01 --rate-429 0.02 --rpm 1500
+
+    GEMINI_BASE_URL=http://127.0.0.1:8090 GEMINI_API_KEY=standin python manage.py runserver
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import zlib
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from corpus import EMBEDDING_DIM, resume_json
+
+_PATH_RE = re.compile(r"^/v1beta/(?:models/)?(?P<model>[^:/]+):(?P<method>batchEmbedContents|embedContent|generateContent)$")
+_TOKEN_RE = re.compile(r"[a-z0-9+#.]+")
+
+ERRORS = {
+    429: ("RESOURCE_EXHAUSTED", "Resource has been exhausted (e.g. check quota)."),
+    500: ("INTERNAL", "An internal error has occurred."),
+}
+
+
+class StandIn:
+    """Shared configuration, fault injection and counters for all handler threads."""
+
+    def __init__(self, args):
+        self.args = args
+        self.generate_text = None
+        if args.generate_file:
+            with open(args.generate_file, "r", encoding="utf-8") as f:
+                self.generate_text = f.read()
+        self.lock = threading.Lock()
+        self.calls = deque()  # admitted call times, for --rpm
+        self.token_vectors = {}
+        self.stats = {"started": time.time(), "requests": {}, "injected_500": 0, "injected_429": 0, "rpm_429": 0, "bad_sections": 0}
+
+    def count(self, key, field=None):
+        with self.lock:
+            if field:
+                self.stats[field] += 1
+            else:
+                self.stats["requests"][key] = self.stats["requests"].get(key, 0) + 1
+
+    def admit(self):
+        """None to serve the call, else the HTTP status of an injected failure."""
+        roll = random.random()
+        if roll < self.args.rate_429:
+            self.count(None, "injected_429")
+            return 429
+        if roll < self.args.rate_429 + self.args.error_rate:
+            self.count(None, "injected_500")
+            return 500
+        if self.args.rpm:
+            now = time.monotonic()
+            with self.lock:
+                while self.calls and now - self.calls[0] > 60.0:
+                    self.calls.popleft()
+                if len(self.calls) >= self.args.rpm:
+                    self.stats["rpm_429"] += 1
+                    return 429
+                self.calls.append(now)
+        return None
+
+    def delay(self):
+        seconds = max(0.0, random.gauss(self.args.latency_ms, self.args.jitter_ms) / 1000.0)
+        time.sleep(seconds)
+
+    def embed(self, text):
+        """Sum of per-token random vectors (seeded by the token's crc32), unit-normalized."""
+        vector = np.zeros(EMBEDDING_DIM)
+        for token in _TOKEN_RE.findall((text or "").lower()):
+            token_vector = self.token_vectors.get(token)
+            if token_vector is None:
+                token_vector = np.random.default_rng(zlib.crc32(token.encode())).normal(size=EMBEDDING_DIM)
+                self.token_vectors[token] = token_vector
+            vector += token_vector
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            vector[0], norm = 1.0, 1.0
+        return (vector / norm).tolist()
+
+    def generate(self, prompt, schema=None):
+        if self.generate_text is not None:
+            return self.generate_text
+        rng = np.random.default_rng(zlib.crc32(prompt.encode()))
+        resume = resume_json(rng, int(rng.integers(1, 1_000_000)))
+        properties = (schema or {}).get("properties")
+        if properties:
+            resume = {name: resume.get(name) for name in properties}
+        for name in resume:
+            if random.random() < self.args.bad_section_rate:
+                resume[name] = "not an object"
+                self.count(None, "bad_sections")
+        return json.dumps(resume)
+
+
+def _text_of(content):
+    if isinstance(content, str):
+        return content
+    return " ".join(part.get("text", "") for part in (content or {}).get("parts", []))
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    standin = None  # set in main()
+
+    def log_message(self, format, *args):
+        if self.standin.args.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        if self.path.split("?")[0] == "/stats":
+            with self.standin.lock:
+                body = dict(self.standin.stats, uptime_seconds=round(time.time() - self.standin.stats["started"], 1))
+            return self._send(200, body)
+        self._send(404, {"error": {"code": 404, "message": "Not found", "status": "NOT_FOUND"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b"{}"
+        match = _PATH_RE.match(self.path.split("?")[0])
+        if not match:
+            return self._send(404, {"error": {"code": 404, "message": f"Unknown path {self.path}", "status": "NOT_FOUND"}})
+        method = match.group("method")
+        self.standin.count(method)
+        try:
+            payload = json.loads(raw or b"{}")
+        except json.JSONDecodeError:
+            return self._send(400, {"error": {"code": 400, "message": "Invalid JSON payload", "status": "INVALID_ARGUMENT"}})
+
+        self.standin.delay()
+        failure = self.standin.admit()
+        if failure:
+            status_name, message = ERRORS[failure]
+            headers = {"Retry-After": "1"} if failure == 429 else {}
+            return self._send(failure, {"error": {"code": failure, "message": message, "status": status_name}}, headers)
+
+        if method == "batchEmbedContents":
+            embeddings = [{"values": self.standin.embed(_text_of(r.get("content")))} for r in payload.get("requests", [])]
+            return self._send(200, {"embeddings": embeddings})
+        if method == "embedContent":
+            return self._send(200, {"embedding": {"values": self.standin.embed(_text_of(payload.get("content")))}})
+
+        prompt = " ".join(_text_of(c) for c in payload.get("contents", []))
+        text = self.standin.generate(prompt, (payload.get("generationConfig") or {}).get("responseSchema"))
+        prompt_tokens, output_tokens = len(prompt) // 4 + 1, len(text) // 4 + 1
+        return self._send(200, {
+            "candidates": [{"content": {"parts": [{"text": text}], "role": "model"}, "finishReason": "STOP", "index": 0}],
+            "usageMetadata": {
+                "promptTokenCount": prompt_tokens,
+                "candidatesTokenCount": output_tokens,
+                "totalTokenCount": prompt_tokens + output_tokens,
+            },
+            "modelVersion": match.group("model"),
+        })
+
+    def _send(self, status, body, headers=None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # socketserver's listen backlog of 5 resets connections once a few dozen
+    # callers are in flight, which the load tests would count as client errors
+    request_queue_size = 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency-ms", type=float, default=100.0, help="Mean added latency per call")
+    parser.add_argument("--jitter-ms", type=float, default=30.0, help="Standard deviation of the added latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of calls failing with 500")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Share of calls failing with 429")
+    parser.add_argument("--rpm", type=int, default=0, help="Calls per minute before answering 429 (0 = unlimited)")
+    parser.add_argument("--bad-section-rate", type=float, default=0.0, help="Share of generated sections replaced by invalid values")
+    parser.add_argument("--generate-file", help="Answer every generateContent call with this file's text")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for latency and fault injection")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    Handler.standin = StandIn(args)
+    server = _Server((args.host, args.port), Handler)
+    print(f"[standin] Gemini stand-in on http://{args.host}:{args.port} "
+          f"(latency {args.latency_ms}±{args.jitter_ms}ms, 500s {args.error_rate:.1%}, 429s {args.rate_429:.1%}, rpm {args.rpm or '∞'})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
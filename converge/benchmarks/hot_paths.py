@@ -0,0 +1,284 @@
+"""
+Micro-benchmarks for the matching and scoring hot paths.
+
+Times, per synthetic corpus size (see benchmarks/corpus.py):
+
+    semantic_relevance_filter   one call per resume, as the exact Phase 1 scan does
+    score_skill_match           one call per resume
+    compute_capability_score    one call per resume
+    compute_trust_score         one call per resume
+    build_semantic_text         one call per resume
+    match_project               the full view through the Django test client
+
+and reports p50/p95 plus the peak RSS of each size. Every size runs in its
+own subprocess, so peak RSS is that size's alone. The view runs against a
+throwaway test database (created and destroyed like `manage.py test`, so
+DJANGO_SETTINGS_MODULE needs working database settings), seeded with the
+same corpus; no Gemini calls are made.
+
+    python benchmarks/hot_paths.py --sizes 1000 10000 100000 --save benchmarks/baseline.json
+    python benchmarks/hot_paths.py --sizes 1000 10000 --compare benchmarks/baseline.json
+
+--compare exits with status 1 when any p50/p95 (or peak RSS) is more than
+--tolerance above the baseline.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from corpus import make_corpus, make_project
+
+FUNCTIONS = (
+    "semantic_relevance_filter",
+    "score_skill_match",
+    "compute_capability_score",
+    "compute_trust_score",
+    "build_semantic_text",
+)
+SEED_BATCH = 2000
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far (ru_maxrss is KiB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def summarize(samples_ns, unit):
+    """p50/p95/total of per-call timings, in `unit` ("us" or "ms")."""
+    scale = 1e3 if unit == "us" else 1e6
+    samples = np.asarray(samples_ns, dtype=np.float64) / scale
+    return {
+        "calls": len(samples),
+        f"p50_{unit}": round(float(np.percentile(samples, 50)), 3),
+        f"p95_{unit}": round(float(np.percentile(samples, 95)), 3),
+        "total_ms": round(float(samples.sum()) * scale / 1e6, 1),
+    }
+
+
+# -------- CHILD: ONE CORPUS SIZE --------
+
+def bench_functions(size, seed):
+    from external.match_users_to_projects import (
+        compute_capability_score,
+        compute_trust_score,
+        score_skill_match,
+        semantic_relevance_filter,
+    )
+    from external.semantic import build_semantic_text
+
+    project, project_embedding = make_project(seed)
+    project_embedding = project_embedding.tolist()
+    required_skills = project["required_skills"]
+    project_type = project["project_type"]
+    timings = {name: [] for name in FUNCTIONS}
+    clock = time.perf_counter_ns
+    passed = 0
+
+    for _, resume, embedding in make_corpus(size, seed):
+        embedding = embedding.tolist()  # stored vectors come back from the JSONField as lists
+
+        start = clock()
+        passes, semantic, _ = semantic_relevance_filter(project_embedding, embedding)
+        timings["semantic_relevance_filter"].append(clock() - start)
+        passed += passes
+
+        start = clock()
+        score_skill_match(required_skills, resume["skills"])
+        timings["score_skill_match"].append(clock() - start)
+
+        start = clock()
+        compute_capability_score(
+            project_embedding, embedding, project_type, required_skills,
+            resume["skills"], resume["experience_level"]["overall"], semantic_score=semantic
+        )
+        timings["compute_capability_score"].append(clock() - start)
+
+        signals = resume["reputation_signals"]
+        start = clock()
+        compute_trust_score(3.5, signals["completed_projects"], signals["dropped_projects"], resume["profile"]["availability"])
+        timings["compute_trust_score"].append(clock() - start)
+
+        start = clock()
+        build_semantic_text(resume)
+        timings["build_semantic_text"].append(clock() - start)
+
+    results = {name: summarize(samples, "us") for name, samples in timings.items()}
+    results["semantic_relevance_filter"]["gate_pass_rate"] = round(passed / size, 4)
+    return results
+
+
+def bench_view(size, seed, repeat, retrieval):
+    import django
+    django.setup()
+    from django.conf import settings
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import setup_test_environment, teardown_test_environment
+    from projects.models import ProjectEmbedding, ProjectJSON
+    from resumes.models import ResumeEmbedding, ResumeJSON
+    from external.semantic import build_semantic_text
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        model = settings.EMBEDDING_MODEL
+        embeddings, jsons = [], []
+        for resume_id, resume, embedding in make_corpus(size, seed):
+            embeddings.append(ResumeEmbedding(
+                resume_id=resume_id,
+                semantic_text=build_semantic_text(resume),
+                embedding=embedding.tolist(),
+                embedding_model=model,
+            ))
+            jsons.append(ResumeJSON(resume_id=resume_id, resume_json=resume))
+            if len(embeddings) == SEED_BATCH:
+                ResumeEmbedding.objects.bulk_create(embeddings)
+                ResumeJSON.objects.bulk_create(jsons)
+                embeddings, jsons = [], []
+        ResumeEmbedding.objects.bulk_create(embeddings)
+        ResumeJSON.objects.bulk_create(jsons)
+        del embeddings, jsons
+
+        project, project_embedding = make_project(seed)
+        ProjectEmbedding.objects.create(project_id=1, semantic_text=project["description"], embedding=project_embedding.tolist(), embedding_model=model)
+        ProjectJSON.objects.create(project_id=1, project_json=project)
+
+        client = Client()
+        url = f"/api/project/match/1/?top=10&retrieval={retrieval}"
+        samples, statuses = [], {}
+        for i in range(repeat + 1):  # the first request warms caches and is not counted
+            with contextlib.redirect_stdout(io.StringIO()):  # the view's per-resume logging
+                start = time.perf_counter_ns()
+                response = client.post(url, content_type="application/json")
+                elapsed = time.perf_counter_ns() - start
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            if i:
+                samples.append(elapsed)
+        result = summarize(samples, "ms")
+        result.update(retrieval=retrieval, statuses={str(k): v for k, v in statuses.items()})
+        return result
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def run_child(args):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "converge.settings")
+    results = bench_functions(args.child, args.seed)
+    results["peak_rss_mb_functions"] = peak_rss_mb()
+    if not args.skip_view:
+        results["match_project"] = bench_view(args.child, args.seed, args.view_repeat, args.retrieval)
+    results["peak_rss_mb"] = peak_rss_mb()
+    with open(args.child_out, "w", encoding="utf-8") as f:
+        json.dump(results, f)
+
+
+# -------- PARENT: SIZES, BASELINE, COMPARISON --------
+
+def compare(report, baseline, tolerance):
+    """Lines describing every metric more than `tolerance` above the baseline."""
+    regressions = []
+    for size, results in report["results"].items():
+        base = baseline.get("results", {}).get(size)
+        if not base:
+            continue
+        for name, stats in results.items():
+            if isinstance(stats, dict) and isinstance(base.get(name), dict):
+                for metric in ("p50_us", "p95_us", "p50_ms", "p95_ms"):
+                    old, new = base[name].get(metric), stats.get(metric)
+                    if old and new and new > old * (1 + tolerance):
+                        regressions.append(f"{size}: {name} {metric} {old} -> {new} (+{100 * (new / old - 1):.0f}%)")
+            elif name.startswith("peak_rss_mb") and base.get(name) and stats > base[name] * (1 + tolerance):
+                regressions.append(f"{size}: {name} {base[name]} -> {stats}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--view-repeat", type=int, default=5, help="Timed match_project requests per size")
+    parser.add_argument("--retrieval", default="exact", help="?retrieval= for the match_project view")
+    parser.add_argument("--skip-view", action="store_true", help="Only the function benchmarks (no database)")
+    parser.add_argument("--save", help="Write the report here as the new baseline")
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown before flagging (0.2 = 20%%)")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--child-out", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args)
+        return
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "seed": args.seed,
+            "retrieval": args.retrieval,
+        },
+        "results": {},
+    }
+    for size in args.sizes:
+        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+            out_path = f.name
+        command = [
+            sys.executable, os.path.abspath(__file__), "--child", str(size), "--child-out", out_path,
+            "--seed", str(args.seed), "--view-repeat", str(args.view_repeat), "--retrieval", args.retrieval,
+        ]
+        if args.skip_view:
+            command.append("--skip-view")
+        print(f"[benchmark] {size} resumes ...", flush=True)
+        subprocess.run(command, check=True, cwd=BASE_DIR)
+        with open(out_path, "r", encoding="utf-8") as f:
+            results = json.load(f)
+        os.unlink(out_path)
+        report["results"][str(size)] = results
+
+        for name in FUNCTIONS:
+            stats = results[name]
+            print(f"[benchmark] {size}: {name:<26} p50={stats['p50_us']}us p95={stats['p95_us']}us total={stats['total_ms']}ms")
+        if "match_project" in results:
+            stats = results["match_project"]
+            print(f"[benchmark] {size}: {'match_project':<26} p50={stats['p50_ms']}ms p95={stats['p95_ms']}ms")
+        print(f"[benchmark] {size}: peak RSS {results['peak_rss_mb']} MB")
+
+    print(json.dumps(report, indent=2))
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"[benchmark] Baseline saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        for line in regressions:
+            print(f"[benchmark] REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"[benchmark] No regressions beyond {int(args.tolerance * 100)}% of {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+Mixed-traffic load driver: resume upserts, project matches and rating
+submissions against a running server, reporting throughput, latency
+percentiles and error rates per endpoint.
+
+Run the server against the Gemini stand-in so ingest never reaches the real API:
+
+    python benchmarks/gemini_standin.py --port 8090 --latency-ms 120 --rate-429 0.01
+    GEMINI_BASE_URL=http://127.0.0.1:8090 GEMINI_API_KEY=standin \\
+        uvicorn converge.asgi:application --port 8001 --workers 4
+
+    python benchmarks/load_driver.py --base-url http://127.0.0.1:8001 --async-views \\
+        --duration 60 --concurrency 64 --mix upsert=2,match=5,rating=3
+
+--async-views needs an ASGI server: under a WSGI server every async view
+runs on a fresh event loop, which the shared google-genai client's async
+transport does not survive.
+
+Setup (not measured) stores --projects projects and --warm-resumes resumes,
+so matches have candidates from the first request. Resume ids start at
+--id-offset; project ids at --project-offset.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+import numpy as np
+
+from corpus import project_json, resume_json
+
+CATEGORIES = ("technical", "reliability", "communication", "initiative", "overall")
+SETUP_ATTEMPTS = 5
+
+
+class Endpoints:
+    """Request builders per operation (sync or async view variants)."""
+
+    def __init__(self, args):
+        self.args = args
+        self.rng = np.random.default_rng(args.seed)
+        self.project_ids = [args.project_offset + i for i in range(args.projects)]
+        suffix = "async/" if args.async_views else ""
+        self.upsert_path = f"/api/resume/json/{suffix}"
+        self.project_path = f"/api/project/embed/{suffix}"
+        self.match_suffix = suffix
+
+    def resume_id(self):
+        return self.args.id_offset + random.randrange(self.args.resume_pool)
+
+    def upsert(self):
+        resume_id = self.resume_id()
+        return "upsert", "POST", self.upsert_path, {"resume_id": resume_id, "resume_json": resume_json(self.rng, resume_id)}
+
+    def match(self):
+        project_id = random.choice(self.project_ids)
+        path = f"/api/project/match/{project_id}/{self.match_suffix}?top={self.args.top}&retrieval={self.args.retrieval}"
+        return "match", "POST", path, {}
+
+    def rating(self):
+        rater_id, ratee_id = random.sample(range(self.args.id_offset, self.args.id_offset + self.args.resume_pool), 2)
+        return "rating", "POST", "/api/ratings/submit/", {
+            "rater_id": rater_id,
+            "ratee_id": ratee_id,
+            "project_id": f"load_{random.choice(self.project_ids)}",
+            "category_scores": {c: random.randint(1, 5) for c in CATEGORIES},
+        }
+
+
+def parse_mix(value):
+    weights = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ("upsert", "match", "rating"):
+            raise argparse.ArgumentTypeError(f"unknown operation {name!r}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+async def setup(client, endpoints, args):
+    """Store the projects and the warm-up resumes (not measured)."""
+    rng = np.random.default_rng(args.seed + 1)
+    for project_id in endpoints.project_ids:
+        payload = {"project_id": project_id, "parsed_json": project_json(rng, project_id)}
+        for _ in range(SETUP_ATTEMPTS):  # the stand-in may be injecting failures
+            response = await client.post(endpoints.project_path, json=payload)
+            if response.status_code < 300:
+                break
+        else:
+            raise SystemExit(f"[load] project {project_id} setup failed: {response.status_code} {response.text[:200]}")
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def warm(resume_id):
+        async with semaphore:
+            await client.post(endpoints.upsert_path, json={"resume_id": resume_id, "resume_json": resume_json(rng, resume_id)})
+
+    await asyncio.gather(*(warm(args.id_offset + i) for i in range(min(args.warm_resumes, args.resume_pool))))
+
+
+async def run_load(args):
+    endpoints = Endpoints(args)
+    operations = list(args.mix)
+    weights = [args.mix[name] for name in operations]
+    results = {name: {"latencies": [], "statuses": {}} for name in operations}
+    issued = 0
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url.rstrip("/"), timeout=args.timeout, limits=limits) as client:
+        print("[load] Setting up projects and warm-up resumes ...", flush=True)
+        await setup(client, endpoints, args)
+
+        deadline = time.perf_counter() + args.duration
+
+        async def worker():
+            nonlocal issued
+            while time.perf_counter() < deadline and (not args.requests or issued < args.requests):
+                issued += 1
+                name, method, path, body = getattr(endpoints, random.choices(operations, weights)[0])()
+                start = time.perf_counter()
+                try:
+                    response = await client.request(method, path, json=body)
+                    key = response.status_code
+                except httpx.HTTPError as e:
+                    key = type(e).__name__
+                results[name]["latencies"].append(time.perf_counter() - start)
+                results[name]["statuses"][key] = results[name]["statuses"].get(key, 0) + 1
+
+        print(f"[load] Running for up to {args.duration}s with {args.concurrency} workers ...", flush=True)
+        wall_start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        wall = time.perf_counter() - wall_start
+
+    return wall, results
+
+
+def summarize(wall, results):
+    report = {"wall_seconds": round(wall, 2), "endpoints": {}}
+    total, total_errors = 0, 0
+    for name, data in results.items():
+        latencies = np.asarray(data["latencies"]) * 1000
+        if not len(latencies):
+            continue
+        errors = sum(count for status, count in data["statuses"].items() if not (isinstance(status, int) and status < 400))
+        total += len(latencies)
+        total_errors += errors
+        report["endpoints"][name] = {
+            "requests": len(latencies),
+            "requests_per_second": round(len(latencies) / wall, 2),
+            "latency_p50_ms": round(float(np.percentile(latencies, 50)), 1),
+            "latency_p95_ms": round(float(np.percentile(latencies, 95)), 1),
+            "latency_p99_ms": round(float(np.percentile(latencies, 99)), 1),
+            "error_rate": round(errors / len(latencies), 4),
+            "statuses": {str(status): count for status, count in sorted(data["statuses"].items(), key=str)},
+        }
+    report["total"] = {
+        "requests": total,
+        "requests_per_second": round(total / wall, 2) if wall else None,
+        "error_rate": round(total_errors / total, 4) if total else None,
+    }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", required=True, help="Base URL of the Django server")
+    parser.add_argument("--async-views", action="store_true", help="Use the async upsert/embed/match views")
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds of measured load")
+    parser.add_argument("--requests", type=int, default=0, help="Stop after this many requests (0 = duration only)")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("upsert=2,match=5,rating=3"), help="Operation weights")
+    parser.add_argument("--projects", type=int, default=3)
+    parser.add_argument("--resume-pool", type=int, default=500, help="Distinct resume ids upserted and rated")
+    parser.add_argument("--warm-resumes", type=int, default=100)
+    parser.add_argument("--id-offset", type=int, default=900000)
+    parser.add_argument("--project-offset", type=int, default=900000)
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument("--retrieval", default="exact")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    wall, results = asyncio.run(run_load(args))
+    report = summarize(wall, results)
+    for name, stats in report["endpoints"].items():
+        print(f"[load] {name:<7} {stats['requests_per_second']:>8} req/s  p50={stats['latency_p50_ms']}ms "
+              f"p95={stats['latency_p95_ms']}ms p99={stats['latency_p99_ms']}ms  errors={stats['error_rate']:.2%}")
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# Optional pgvector column for pushing the semantic gate into Postgres,
+# shared by the resumes and projects 0003 migrations.
+#
+# The column is maintained by a trigger from the JSON `embedding` field, so it
+# is not declared on the models and writers (Django or Spring Boot) need no
+# pgvector support. Skipped when the database is not PostgreSQL or the
+# `vector` extension cannot be installed; matching then stays in Python.
+
+from django.db import DatabaseError, migrations, transaction
+
+DIMENSIONS = 768
+
+# IVFFlat fallback (pgvector < 0.5): lists built, lists scanned per query.
+# pgvector scans one list by default, about 1% of the rows at 100 lists, so
+# queries raise ivfflat.probes to well above sqrt(lists)
+IVFFLAT_LISTS = 100
+IVFFLAT_PROBES = 20
+
+
+def _forward_sql(table):
+	return [
+		f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS embedding_vec vector({DIMENSIONS})",
+		f"""
+		UPDATE {table} SET embedding_vec = (embedding::text)::vector
+		WHERE jsonb_typeof(embedding) = 'array' AND jsonb_array_length(embedding) = {DIMENSIONS}
+		""",
+		f"""
+		CREATE OR REPLACE FUNCTION {table}_sync_vec() RETURNS trigger AS $$
+		BEGIN
+			IF jsonb_typeof(NEW.embedding) = 'array' AND jsonb_array_length(NEW.embedding) = {DIMENSIONS} THEN
+				NEW.embedding_vec := (NEW.embedding::text)::vector;
+			ELSE
+				NEW.embedding_vec := NULL;
+			END IF;
+			RETURN NEW;
+		END;
+		$$ LANGUAGE plpgsql
+		""",
+		f"DROP TRIGGER IF EXISTS {table}_sync_vec ON {table}",
+		f"""
+		CREATE TRIGGER {table}_sync_vec BEFORE INSERT OR UPDATE OF embedding ON {table}
+		FOR EACH ROW EXECUTE FUNCTION {table}_sync_vec()
+		""",
+	]
+
+
+def _reverse_sql(table):
+	return [
+		f"DROP TRIGGER IF EXISTS {table}_sync_vec ON {table}",
+		f"DROP FUNCTION IF EXISTS {table}_sync_vec()",
+		f"DROP INDEX IF EXISTS {table}_vec_idx",
+		f"ALTER TABLE {table} DROP COLUMN IF EXISTS embedding_vec",
+	]
+
+
+def add_embedding_vec(table):
+	"""RunPython operation adding `embedding_vec`, its sync trigger and an ANN index to `table`."""
+
+	def forward(apps, schema_editor):
+		connection = schema_editor.connection
+		if connection.vendor != "postgresql":
+			return
+		try:
+			with transaction.atomic(using=connection.alias):
+				schema_editor.execute("CREATE EXTENSION IF NOT EXISTS vector")
+		except DatabaseError as e:
+			print(f"[migrations] pgvector unavailable, skipping {table}.embedding_vec: {e}")
+			return
+
+		for statement in _forward_sql(table):
+			schema_editor.execute(statement)
+
+		# HNSW needs pgvector >= 0.5; older installs get IVFFlat
+		try:
+			with transaction.atomic(using=connection.alias):
+				schema_editor.execute(
+					f"CREATE INDEX IF NOT EXISTS {table}_vec_idx ON {table} USING hnsw (embedding_vec vector_cosine_ops)"
+				)
+		except DatabaseError:
+			schema_editor.execute(
+				f"CREATE INDEX IF NOT EXISTS {table}_vec_idx ON {table} "
+				f"USING ivfflat (embedding_vec vector_cosine_ops) WITH (lists = {IVFFLAT_LISTS})"
+			)
+
+	def reverse(apps, schema_editor):
+		if schema_editor.connection.vendor != "postgresql":
+			return
+		for statement in _reverse_sql(table):
+			schema_editor.execute(statement)
+
+	return migrations.RunPython(forward, reverse)
@@ -0,0 +1,179 @@
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import re
+import time
+import uuid
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+try:
+	from pyinstrument import Profiler as SamplingProfiler
+except ImportError:  # optional; cProfile is always available
+	SamplingProfiler = None
+
+
+# Header / query flag carrying settings.PROFILE_REQUESTS_TOKEN
+PROFILE_HEADER = "HTTP_X_PROFILE"
+PROFILE_QUERY_FLAG = "_profile"
+
+_SAFE_ID = re.compile(r"[^A-Za-z0-9_.-]")
+
+# Request plumbing that wraps every view; left out of the summary (not the profile file)
+_PLUMBING = re.compile(r"[/\\](django|asgiref|rest_framework|corsheaders|asyncio|concurrent|selectors\.py|threading\.py)([/\\]|$)")
+
+
+class RequestProfilerMiddleware:
+	"""
+	Profile one request on demand.
+
+	A request is profiled only when it carries the admin token from
+	settings.PROFILE_REQUESTS_TOKEN, as an `X-Profile` header or a
+	`?_profile=` query flag. The profile is written to
+	settings.PROFILE_DIR as `<timestamp>-<request id>.prof` (cProfile) or
+	`.pyisession` (pyinstrument, used when installed), and the response
+	carries `X-Profile-Id` plus an `X-Profile-Summary` of the top
+	functions by cumulative time.
+
+	With no token configured the middleware removes itself at startup
+	(MiddlewareNotUsed), so it costs nothing. For streaming responses only
+	the view itself is profiled, not the body being streamed.
+	"""
+
+	sync_capable = True
+	async_capable = True
+
+	def __init__(self, get_response):
+		self.token = getattr(settings, "PROFILE_REQUESTS_TOKEN", "")
+		if not self.token:
+			raise MiddlewareNotUsed
+		self.get_response = get_response
+		self.profile_dir = settings.PROFILE_DIR
+		self.top_n = settings.PROFILE_SUMMARY_SIZE
+		self.sampling = SamplingProfiler is not None and settings.PROFILE_SAMPLING
+		if iscoroutinefunction(get_response):
+			markcoroutinefunction(self)
+
+	def __call__(self, request):
+		if iscoroutinefunction(self):
+			return self.__acall__(request)
+		if not self._requested(request):
+			return self.get_response(request)
+
+		profiler = self._start(async_mode=False)
+		if profiler is None:
+			return self.get_response(request)
+		try:
+			response = self.get_response(request)
+		finally:
+			session = self._stop(profiler)
+		return self._finish(request, response, session)
+
+	async def __acall__(self, request):
+		if not self._requested(request):
+			return await self.get_response(request)
+
+		# cProfile only sees the event-loop thread (not sync_to_async workers)
+		# and counts other requests' coroutines; pyinstrument's async mode does not
+		profiler = self._start(async_mode=True)
+		if profiler is None:
+			return await self.get_response(request)
+		try:
+			response = await self.get_response(request)
+		finally:
+			session = self._stop(profiler)
+		return self._finish(request, response, session)
+
+	def _requested(self, request) -> bool:
+		supplied = request.META.get(PROFILE_HEADER) or request.GET.get(PROFILE_QUERY_FLAG)
+		return bool(supplied) and hmac.compare_digest(supplied.encode(), self.token.encode())
+
+	def _start(self, async_mode: bool):
+		"""A running profiler, or None if another profile already owns the interpreter."""
+		try:
+			if self.sampling:
+				profiler = SamplingProfiler(async_mode="enabled" if async_mode else "disabled")
+				profiler.start()
+			else:
+				# Python 3.12+ allows one active cProfile per process
+				profiler = cProfile.Profile()
+				profiler.enable()
+		except (RuntimeError, ValueError) as e:
+			print(f"⚠️ Request not profiled: {e}")
+			return None
+		return profiler
+
+	def _stop(self, profiler):
+		if self.sampling:
+			return profiler.stop()
+		profiler.disable()
+		return profiler
+
+	def _finish(self, request, response, session):
+		request_id = _SAFE_ID.sub("", request.META.get("HTTP_X_REQUEST_ID", ""))[:64] or uuid.uuid4().hex
+		try:
+			os.makedirs(self.profile_dir, exist_ok=True)
+			stem = os.path.join(self.profile_dir, f"{time.strftime('%Y%m%dT%H%M%S')}-{request_id}")
+			if self.sampling:
+				session.save(f"{stem}.pyisession")
+				summary = _sampling_summary(session, self.top_n)
+			else:
+				session.dump_stats(f"{stem}.prof")
+				summary = _cprofile_summary(session, self.top_n)
+		except Exception as e:
+			print(f"❌ Could not write profile for {request.path}: {e}")
+			return response
+
+		response["X-Profile-Id"] = request_id
+		response["X-Profile-Summary"] = summary
+		return response
+
+
+def _cprofile_summary(profiler, top_n: int) -> str:
+	"""`total=<s>; file:line(func)=<cumulative s>; ...` for the top_n functions by cumulative time."""
+	stats = pstats.Stats(profiler, stream=io.StringIO())
+	rows = sorted(stats.stats.items(), key=lambda item: -item[1][3])
+	parts = [f"total={stats.total_tt:.4f}s"]
+	rows = [row for row in rows if not _is_plumbing(row[0][0])]
+	for (path, line, func), (_, _, _, cumulative, _) in rows[:top_n]:
+		parts.append(f"{_short(path)}:{line}({func})={cumulative:.4f}s")
+	return _header_safe("; ".join(parts))
+
+
+def _sampling_summary(session, top_n: int) -> str:
+	"""Same format from a pyinstrument session; a function's time is its outermost frame's."""
+	root = session.root_frame()
+	if root is None:
+		return f"total={session.duration:.4f}s"
+	cumulative = {}
+	stack = [(root, frozenset())]
+	while stack:
+		frame, seen = stack.pop()
+		key = (frame.file_path or "", frame.line_no or 0, frame.function or "")
+		if getattr(frame, "is_synthetic", False):  # [self] / [await] pseudo-frames
+			pass
+		elif key not in seen:  # recursion: count only the outermost call
+			cumulative[key] = cumulative.get(key, 0.0) + frame.time
+			seen = seen | {key}
+		stack.extend((child, seen) for child in frame.children)
+	rows = [row for row in sorted(cumulative.items(), key=lambda item: -item[1]) if not _is_plumbing(row[0][0])]
+	parts = [f"total={session.duration:.4f}s"]
+	for (path, line, func), seconds in rows[:top_n]:
+		parts.append(f"{_short(path)}:{line}({func})={seconds:.4f}s")
+	return _header_safe("; ".join(parts))
+
+
+def _is_plumbing(path: str) -> bool:
+	return path == __file__ or bool(_PLUMBING.search(path))
+
+
+def _short(path: str) -> str:
+	return os.path.basename(path) or path
+
+
+def _header_safe(value: str) -> str:
+	return value.encode("latin-1", "replace").decode("latin-1").replace("\r", " ").replace("\n", " ")
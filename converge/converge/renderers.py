@@ -0,0 +1,85 @@
+import base64
+import numpy as np
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+	import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+	orjson = None
+
+
+# Wire formats for embedding vectors in API responses
+EMBEDDING_FORMATS = ("none", "base64_f32", "json")
+DEFAULT_EMBEDDING_FORMAT = "none"
+
+_drf_encoder = JSONEncoder()
+
+
+def fast_json_dumps(data) -> bytes:
+	"""
+	Compact UTF-8 JSON via orjson, with DRF's encoder for types orjson
+	does not know (lazy strings, Decimal, ...). Falls back to the stdlib.
+	"""
+	if orjson is None:
+		return JSONRenderer().render(data)
+	return orjson.dumps(data, default=_drf_encoder.default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONRenderer(JSONRenderer):
+	"""JSONRenderer backed by orjson; same media type and output, less CPU."""
+
+	def render(self, data, accepted_media_type=None, renderer_context=None):
+		if data is None:
+			return b""
+		return fast_json_dumps(data)
+
+
+def parse_embedding_format(query, body=None) -> str:
+	"""
+	`embedding_format` from the query string, else the request body.
+
+	Raises:
+		ValueError: for an unknown format
+	"""
+	value = query.get("embedding_format")
+	if value is None and isinstance(body, dict):
+		value = body.get("embedding_format")
+	value = value or DEFAULT_EMBEDDING_FORMAT
+	if value not in EMBEDDING_FORMATS:
+		raise ValueError(f"embedding_format must be one of {', '.join(EMBEDDING_FORMATS)}")
+	return value
+
+
+def encode_embedding_base64(embedding) -> str:
+	"""Base64 of the vector as little-endian float32 (4 bytes per dimension)."""
+	return base64.b64encode(np.asarray(embedding, dtype="<f4").tobytes()).decode("ascii")
+
+
+def decode_embedding_base64(encoded: str) -> list:
+	"""Inverse of encode_embedding_base64."""
+	return np.frombuffer(base64.b64decode(encoded), dtype="<f4").tolist()
+
+
+class EmbeddingFormatMixin:
+	"""
+	ModelSerializer mixin that writes the `embedding` field in the format
+	given by context["embedding_format"]:
+	  - "json" (default when no context is passed): the float list, unchanged
+	  - "base64_f32": encode_embedding_base64 string
+	  - "none": vector omitted
+	Non-json formats add "embedding_format" and "embedding_dim" keys.
+	"""
+
+	def to_representation(self, instance):
+		data = super().to_representation(instance)
+		embedding_format = self.context.get("embedding_format", "json")
+		if embedding_format == "json" or "embedding" not in data:
+			return data
+
+		embedding = data.pop("embedding") or []
+		if embedding_format == "base64_f32":
+			data["embedding"] = encode_embedding_base64(embedding)
+		data["embedding_format"] = embedding_format
+		data["embedding_dim"] = len(embedding)
+		return data
@@ -26,6 +26,14 @@ SECRET_KEY = config('SECRET_KEY')
 
 # Google Generative AI Configuration
 GEMINI_API_KEY = config('GEMINI_API_KEY')
+# Empty for the real API; set to e.g. http://127.0.0.1:8090 for benchmarks/gemini_standin.py
+GEMINI_BASE_URL = config('GEMINI_BASE_URL', default='')
+
+# Embedding model for new vectors; after changing it, run `manage.py reembed`
+EMBEDDING_MODEL = config('EMBEDDING_MODEL', default='models/text-embedding-004')
+
+# Resume parser model; Gemini models use native JSON output, Gemma models the in-prompt schema
+RESUME_PARSER_MODEL = config('RESUME_PARSER_MODEL', default='models/gemma-3-12b-it')
 
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = False
@@ -53,6 +61,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'converge.profiling.RequestProfilerMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -146,6 +155,26 @@ STATIC_URL = 'static/'
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Persisted HDBSCAN model + cached resume cluster assignments (manage.py cluster_resumes)
+CLUSTER_MODEL_PATH = config('CLUSTER_MODEL_PATH', default=str(BASE_DIR / 'cluster_model.pkl'))
+
+# Persisted BM25 index over resume semantic_text (?retrieval=hybrid, manage.py bm25_index)
+BM25_INDEX_PATH = config('BM25_INDEX_PATH', default=str(BASE_DIR / 'bm25_index.npz'))
+
+# Persisted rating leaderboard (/api/ratings/leaderboard/, manage.py rebuild_leaderboard)
+LEADERBOARD_PATH = config('LEADERBOARD_PATH', default=str(BASE_DIR / 'leaderboard.npz'))
+
+# Seconds a coalesced match request waits on the identical in-flight one before giving up (503)
+MATCH_COALESCE_TIMEOUT = config('MATCH_COALESCE_TIMEOUT', default=60, cast=float)
+
+# On-demand request profiling: a request carrying this token (X-Profile header or ?_profile=)
+# is profiled into PROFILE_DIR. Leave empty to disable; the middleware then drops out entirely.
+PROFILE_REQUESTS_TOKEN = config('PROFILE_REQUESTS_TOKEN', default='')
+PROFILE_DIR = config('PROFILE_DIR', default=str(BASE_DIR / 'profiles'))
+PROFILE_SUMMARY_SIZE = config('PROFILE_SUMMARY_SIZE', default=10, cast=int)
+# Prefer pyinstrument (sampling, async-aware) over cProfile when it is installed
+PROFILE_SAMPLING = config('PROFILE_SAMPLING', default=True, cast=bool)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
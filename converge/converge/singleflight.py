@@ -0,0 +1,113 @@
+import asyncio
+import threading
+
+
+class SingleFlightTimeout(TimeoutError):
+	"""A caller gave up waiting on another caller's in-flight computation."""
+
+
+class _Call:
+	"""One in-flight computation and everyone waiting on it."""
+
+	def __init__(self):
+		self.done = threading.Event()
+		self.result = None
+		self.error = None
+		self.waiters = []  # (loop, future) per waiting coroutine
+
+
+class SingleFlight:
+	"""
+	In-process request coalescing: while a computation for a key is in
+	flight, later callers with the same key wait for it and share its
+	result (or its exception) instead of running it again.
+
+	Thread waiters (WSGI workers, sync views under ASGI) block on an Event;
+	coroutines await a future that the finishing caller resolves on their
+	own event loop, so both kinds can share one key. A key is dropped as
+	soon as its computation finishes; nothing is cached afterwards.
+	"""
+
+	def __init__(self):
+		self._lock = threading.Lock()
+		self._calls = {}
+
+	def do(self, key, fn, timeout=None):
+		"""
+		Run fn() once for all concurrent callers of `key`.
+
+		Returns: (result, shared); shared is True for callers that waited on
+		another caller's computation.
+		Raises: fn's exception (in every caller), or SingleFlightTimeout after
+		`timeout` seconds of waiting.
+		"""
+		call, leader = self._join(key)
+		if leader:
+			try:
+				result = fn()
+			except BaseException as e:
+				self._finish(key, call, None, e)
+				raise
+			self._finish(key, call, result, None)
+			return result, False
+
+		if not call.done.wait(timeout):
+			raise SingleFlightTimeout(f"no result for {key!r} after {timeout}s")
+		if call.error is not None:
+			raise call.error
+		return call.result, True
+
+	async def ado(self, key, afn, timeout=None):
+		"""Coroutine version of do(): awaits afn() once for all concurrent callers of `key`."""
+		call, leader = self._join(key)
+		if leader:
+			try:
+				result = await afn()
+			except BaseException as e:
+				self._finish(key, call, None, e)
+				raise
+			self._finish(key, call, result, None)
+			return result, False
+
+		future = asyncio.get_running_loop().create_future()
+		with self._lock:
+			if call.done.is_set():
+				_resolve(future, call)
+			else:
+				call.waiters.append((future.get_loop(), future))
+		try:
+			return await asyncio.wait_for(future, timeout), True
+		except asyncio.TimeoutError:
+			raise SingleFlightTimeout(f"no result for {key!r} after {timeout}s") from None
+
+	def _join(self, key):
+		with self._lock:
+			call = self._calls.get(key)
+			if call is not None:
+				return call, False
+			call = self._calls[key] = _Call()
+			return call, True
+
+	def _finish(self, key, call, result, error):
+		if isinstance(error, asyncio.CancelledError):
+			# The leader's client went away; waiters get an error, not a cancellation
+			error = RuntimeError("in-flight computation was cancelled")
+		with self._lock:
+			self._calls.pop(key, None)
+			call.result, call.error = result, error
+			call.done.set()
+			waiters, call.waiters = call.waiters, []
+		for loop, future in waiters:
+			try:
+				loop.call_soon_threadsafe(_resolve, future, call)
+			except RuntimeError:  # that waiter's event loop is already closed
+				pass
+
+
+def _resolve(future, call):
+	if future.done():  # the waiter already timed out
+		return
+	if call.error is not None:
+		future.set_exception(call.error)
+	else:
+		future.set_result(call.result)
@@ -3,6 +3,7 @@ import sys
 import json
 from pathlib import Path
 from process_resume import process_resume
+from external.parse_resume import parse_stats
 
 # -------- CONFIG --------
 SUPPORTED_FORMATS = [".pdf"]
@@ -73,6 +74,11 @@ def batch_process_resumes(directory_path):
     print(f"Total PDFs: {results['total']}")
     print(f"Successful: {results['successful']}")
     print(f"Failed: {results['failed']}")
+    stats = parse_stats()
+    results["parse_stats"] = stats
+    print(f"Parser retry rate: {stats['retry_rate']:.1%} ({stats['calls_per_resume']} LLM calls/resume)")
+    print(f"Parser tokens/resume: {stats['tokens_per_resume']['total']} "
+          f"(prompt {stats['tokens_per_resume']['prompt']}, output {stats['tokens_per_resume']['output']})")
     print(f"{'='*70}\n")
     
     if results["processed_users"]:
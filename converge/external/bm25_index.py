@@ -0,0 +1,257 @@
+import json
+import math
+import os
+import re
+import tempfile
+import zlib
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# -------- CONFIG --------
+
+# BM25 term-frequency saturation and length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Compact on save once this share of indexed rows are superseded or deleted
+COMPACT_DEAD_RATIO = 0.25
+
+# Technology-friendly tokens: keeps "c++", "c#", "node.js", "ros2", "scikit-learn"
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#._\-]*")
+
+# -------- TOKENIZER --------
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased tokens with trailing sentence punctuation stripped."""
+    tokens = []
+    for token in _TOKEN_RE.findall((text or "").lower()):
+        token = token.rstrip(".-_")
+        if token:
+            tokens.append(token)
+    return tokens
+
+# -------- INVERTED INDEX --------
+
+class BM25Index:
+    """
+    In-process BM25 inverted index over document texts, keyed by doc id.
+
+    Postings are per-term typed arrays (row int32, tf uint16) that grow by
+    appending, so adding or replacing a document touches only its own
+    terms. A replaced or removed document leaves a dead row behind until
+    compact() rewrites the postings without dead rows. Persisted as one
+    .npz with the postings in CSR form.
+    """
+
+    def __init__(self):
+        self.vocab: Dict[str, int] = {}
+        self.post_rows: List[array] = []   # term id -> rows containing it
+        self.post_tfs: List[array] = []    # term id -> tf in each of those rows
+        self.df = array("i")               # term id -> live documents containing it
+        self.row_ids = array("q")          # row -> doc id
+        self.row_lens = array("i")         # row -> document length in tokens
+        self.row_hash = array("I")         # row -> crc32 of the text (re-adding it unchanged is a no-op)
+        self.row_alive = bytearray()       # row -> 1 while it is the doc's current row
+        self.row_terms: List[Optional[array]] = []  # row -> its term ids (for df on removal)
+        self.doc_rows: Dict[int, int] = {} # doc id -> current row
+        self.total_len = 0                 # tokens over live rows
+        self.watermark = None              # caller-owned sync marker, persisted with the index
+
+    def __len__(self) -> int:
+        return len(self.doc_rows)
+
+    @property
+    def dead_rows(self) -> int:
+        return len(self.row_ids) - len(self.doc_rows)
+
+    def add(self, doc_id: int, text: str) -> bool:
+        """Index (or re-index) one document. Returns False when its text is unchanged."""
+        text_hash = zlib.crc32((text or "").encode("utf-8"))
+        row = self.doc_rows.get(doc_id)
+        if row is not None and self.row_hash[row] == text_hash:
+            return False
+        self.remove(doc_id)
+        tokens = tokenize(text)
+        counts: Dict[int, int] = {}
+        for token in tokens:
+            term = self.vocab.get(token)
+            if term is None:
+                term = self.vocab[token] = len(self.vocab)
+                self.post_rows.append(array("i"))
+                self.post_tfs.append(array("H"))
+                self.df.append(0)
+            counts[term] = counts.get(term, 0) + 1
+
+        row = len(self.row_ids)
+        for term, tf in counts.items():
+            self.post_rows[term].append(row)
+            self.post_tfs[term].append(min(tf, 65535))
+            self.df[term] += 1
+        self.row_ids.append(doc_id)
+        self.row_lens.append(len(tokens))
+        self.row_hash.append(text_hash)
+        self.row_alive.append(1)
+        self.row_terms.append(array("i", counts))
+        self.doc_rows[doc_id] = row
+        self.total_len += len(tokens)
+        return True
+
+    def remove(self, doc_id: int):
+        row = self.doc_rows.pop(doc_id, None)
+        if row is None:
+            return
+        self.row_alive[row] = 0
+        self.total_len -= self.row_lens[row]
+        for term in self.row_terms[row]:
+            self.df[term] -= 1
+        self.row_terms[row] = None
+
+    def search(self, query: str, k: int) -> List[Tuple[int, float]]:
+        """
+        Top-k documents by BM25.
+
+        Formula:
+            idf(t) = ln(1 + (N - df_t + 0.5) / (df_t + 0.5))
+            score(d) = Σ_t idf(t) · tf·(k1 + 1) / (tf + k1·(1 - b + b·|d| / avgdl))
+
+        Returns:
+            List[(doc_id, score)] best first; documents sharing no term are omitted
+        """
+        n_docs = len(self.doc_rows)
+        terms = {self.vocab[t] for t in tokenize(query) if t in self.vocab}
+        if not n_docs or not terms or k <= 0:
+            return []
+
+        avgdl = self.total_len / n_docs or 1.0
+        lens = np.frombuffer(self.row_lens, dtype=np.int32)
+        scores = np.zeros(len(self.row_ids))
+        for term in terms:
+            df = self.df[term]
+            if not df:
+                continue
+            rows = np.frombuffer(self.post_rows[term], dtype=np.int32)
+            tfs = np.frombuffer(self.post_tfs[term], dtype=np.uint16).astype(np.float64)
+            idf = math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+            norm = BM25_K1 * (1.0 - BM25_B + BM25_B * lens[rows] / avgdl)
+            # A row holds each term once, so plain fancy-index addition is safe
+            scores[rows] += idf * tfs * (BM25_K1 + 1.0) / (tfs + norm)
+
+        scores[np.frombuffer(bytes(self.row_alive), dtype=np.uint8) == 0] = 0.0
+        hits = np.flatnonzero(scores > 0)
+        if len(hits) > k:
+            hits = hits[np.argpartition(-scores[hits], k - 1)[:k]]
+        # Best first; ties by doc id for a stable order
+        ranked = sorted(((-scores[row], self.row_ids[row]) for row in hits))
+        return [(doc_id, float(-neg)) for neg, doc_id in ranked]
+
+    def compact(self):
+        """Rewrite rows and postings without dead rows (row numbers change)."""
+        if not self.dead_rows:
+            return
+        live = [row for row in range(len(self.row_ids)) if self.row_alive[row]]
+        remap = np.full(len(self.row_ids), -1, dtype=np.int64)
+        remap[live] = np.arange(len(live))
+        for term in range(len(self.vocab)):
+            rows = np.frombuffer(self.post_rows[term], dtype=np.int32)
+            keep = remap[rows] >= 0
+            self.post_rows[term] = array("i", remap[rows[keep]].astype(np.int32).tobytes())
+            self.post_tfs[term] = array("H", np.frombuffer(self.post_tfs[term], dtype=np.uint16)[keep].tobytes())
+        self.row_ids = array("q", (self.row_ids[row] for row in live))
+        self.row_lens = array("i", (self.row_lens[row] for row in live))
+        self.row_hash = array("I", (self.row_hash[row] for row in live))
+        self.row_alive = bytearray(b"\x01" * len(live))
+        self.row_terms = [self.row_terms[row] for row in live]
+        self.doc_rows = {doc_id: row for row, doc_id in enumerate(self.row_ids)}
+
+    # -------- PERSISTENCE --------
+
+    def save(self, path: str):
+        """Compact if worthwhile, then write atomically (temp file, then rename)."""
+        if self.dead_rows > COMPACT_DEAD_RATIO * max(len(self.row_ids), 1):
+            self.compact()
+        lengths = np.array([len(rows) for rows in self.post_rows], dtype=np.int64)
+        offsets = np.concatenate(([0], np.cumsum(lengths))).astype(np.int64)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".npz")  # unique per writer
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(
+                    f,
+                    vocab=np.array(json.dumps(sorted(self.vocab, key=self.vocab.get))),
+                    watermark=np.array(json.dumps(self.watermark)),
+                    offsets=offsets,
+                    rows=_concat(self.post_rows, np.int32),
+                    tfs=_concat(self.post_tfs, np.uint16),
+                    row_ids=np.frombuffer(self.row_ids, dtype=np.int64),
+                    row_lens=np.frombuffer(self.row_lens, dtype=np.int32),
+                    row_hash=np.frombuffer(self.row_hash, dtype=np.uint32),
+                    row_alive=np.frombuffer(bytes(self.row_alive), dtype=np.uint8),
+                )
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> Optional["BM25Index"]:
+        """Load a persisted index, or None if there is none yet."""
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            index = cls()
+            terms = json.loads(str(data["vocab"]))
+            index.watermark = json.loads(str(data["watermark"]))
+            offsets, rows, tfs = data["offsets"], data["rows"], data["tfs"]
+            index.vocab = {term: i for i, term in enumerate(terms)}
+            index.post_rows = [array("i", rows[offsets[i]:offsets[i + 1]].tobytes()) for i in range(len(terms))]
+            index.post_tfs = [array("H", tfs[offsets[i]:offsets[i + 1]].tobytes()) for i in range(len(terms))]
+            index.row_ids = array("q", data["row_ids"].tobytes())
+            index.row_lens = array("i", data["row_lens"].tobytes())
+            index.row_hash = array("I", data["row_hash"].tobytes())
+            index.row_alive = bytearray(data["row_alive"].tobytes())
+
+        # Derived state: per-row terms, live df, doc -> row, total length
+        row_terms = [array("i") for _ in index.row_ids]
+        index.df = array("i", bytes(4 * len(terms)))
+        for term, term_rows in enumerate(index.post_rows):
+            for row in term_rows:
+                if index.row_alive[row]:
+                    row_terms[row].append(term)
+                    index.df[term] += 1
+        index.row_terms = [terms_ if index.row_alive[row] else None for row, terms_ in enumerate(row_terms)]
+        index.doc_rows = {doc_id: row for row, doc_id in enumerate(index.row_ids) if index.row_alive[row]}
+        index.total_len = sum(index.row_lens[row] for row in index.doc_rows.values())
+        return index
+
+    @classmethod
+    def build(cls, documents: Iterable[Tuple[int, str]]) -> "BM25Index":
+        index = cls()
+        for doc_id, text in documents:
+            index.add(doc_id, text)
+        return index
+
+
+def _concat(arrays: List[array], dtype) -> np.ndarray:
+    if not arrays:
+        return np.zeros(0, dtype=dtype)
+    return np.concatenate([np.frombuffer(a, dtype=dtype) for a in arrays]).astype(dtype, copy=False)
+
+# -------- FUSION --------
+
+def reciprocal_rank_fusion(rankings: List[List[int]], k: int = 60) -> List[Tuple[int, float]]:
+    """
+    Fuse ranked id lists.
+
+    Formula:
+        RRF(d) = Σ_r 1 / (k + rank_r(d)),  rank starting at 1
+
+    Returns:
+        List[(id, rrf_score)] best first; ties keep first-seen order
+    """
+    fused: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, 1):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda item: -item[1])
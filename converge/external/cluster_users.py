@@ -1,24 +1,76 @@
+import os
+import pickle
 import numpy as np
-import hdbscan
-from sklearn.metrics.pairwise import cosine_similarity
 from collections import defaultdict
+from datetime import datetime
 
 # ---------------- CONFIG ----------------
 MIN_CLUSTER_SIZE = 4        # tune based on dataset size
 SOFT_MEMBERSHIP_THRESHOLD = 0.60
 MAX_SOFT_CLUSTERS = 3
+CLUSTER_MODEL_FILE = "cluster_model.pkl"
 
-# ---------------- CLUSTERING ----------------
-def cluster_users(user_records):
+# ---------------- SOFT MEMBERSHIP ----------------
+def compute_soft_memberships(embeddings, centroid_ids, centroids):
     """
-    user_records: list of dicts with keys:
-      - user_id
-      - embedding (list[float])
+    Soft cluster memberships from cosine similarity to cluster centroids.
+
+    One normalized users x centroids matrix product, then argpartition keeps
+    the MAX_SOFT_CLUSTERS best centroids per user before thresholding.
 
     Returns:
-      cluster_assignments (dict)
-      cluster_centroids (dict)
+      list (one per user) of [{"cluster_id", "confidence"}, ...] best first
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float64)
+    if len(centroid_ids) == 0 or len(embeddings) == 0:
+        return [[] for _ in range(len(embeddings))]
+
+    def unit_rows(matrix):
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms > 0, norms, 1.0)
+
+    sims = unit_rows(embeddings) @ unit_rows(np.asarray(centroids, dtype=np.float64)).T
+
+    k = min(MAX_SOFT_CLUSTERS, sims.shape[1])
+    top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+    top_sims = np.take_along_axis(sims, top, axis=1)
+    order = np.argsort(-top_sims, axis=1)
+    top = np.take_along_axis(top, order, axis=1)
+    top_sims = np.take_along_axis(top_sims, order, axis=1)
+
+    memberships = []
+    for row_ids, row_sims in zip(top, top_sims):
+        memberships.append([
+            {
+                "cluster_id": f"cluster_{centroid_ids[c]}",
+                "confidence": round(float(sim), 3)
+            }
+            for c, sim in zip(row_ids, row_sims)
+            if sim >= SOFT_MEMBERSHIP_THRESHOLD
+        ])
+    return memberships
+
+
+def _assignment(memberships, label, probability):
+    return {
+        "primary_cluster": (
+            memberships[0]["cluster_id"]
+            if memberships else "outlier"
+        ),
+        "memberships": memberships,
+        "hdbscan_cluster": f"cluster_{label}" if label != -1 else "outlier",
+        "hdbscan_probability": round(float(probability), 3)
+    }
+
+# ---------------- CLUSTER MODEL ----------------
+def fit_cluster_model(user_records):
     """
+    Fit HDBSCAN on all users and assign every one of them.
+
+    Returns:
+      model (dict): clusterer, centroid_ids, centroids, assignments, fitted_at
+    """
+    import hdbscan
 
     user_ids = [u["user_id"] for u in user_records]
     embeddings = np.array([u["embedding"] for u in user_records])
@@ -41,40 +93,98 @@ def cluster_users(user_records):
             clusters[label].append(idx)
 
     # Step 3: Compute cluster centroids
-    cluster_centroids = {}
-
-    for cluster_id, indices in clusters.items():
-        cluster_centroids[cluster_id] = np.mean(
-            embeddings[indices], axis=0
-        )
+    centroid_ids = sorted(int(c) for c in clusters)
+    centroids = (
+        np.vstack([np.mean(embeddings[clusters[c]], axis=0) for c in centroid_ids])
+        if centroid_ids else np.zeros((0, embeddings.shape[1]))
+    )
 
     # Step 4: Soft membership via centroid similarity
-    user_cluster_map = {}
+    memberships = compute_soft_memberships(embeddings, centroid_ids, centroids)
+
+    return {
+        "clusterer": clusterer,
+        "centroid_ids": centroid_ids,
+        "centroids": centroids,
+        "assignments": {
+            user_id: _assignment(memberships[idx], labels[idx], probabilities[idx])
+            for idx, user_id in enumerate(user_ids)
+        },
+        "fitted_at": datetime.now().isoformat(),
+        "fitted_count": len(user_ids)
+    }
+
+
+def assign_users(model, user_records):
+    """
+    Place users into an existing model with hdbscan.approximate_predict (no refit).
+
+    Updates model["assignments"] in place and returns the new assignments.
+    """
+    import hdbscan
 
-    for idx, user_id in enumerate(user_ids):
-        user_vec = embeddings[idx].reshape(1, -1)
+    if not user_records:
+        return {}
 
-        memberships = []
+    user_ids = [u["user_id"] for u in user_records]
+    embeddings = np.array([u["embedding"] for u in user_records])
+
+    labels, strengths = hdbscan.approximate_predict(model["clusterer"], embeddings)
+    memberships = compute_soft_memberships(embeddings, model["centroid_ids"], model["centroids"])
+
+    assigned = {
+        user_id: _assignment(memberships[idx], labels[idx], strengths[idx])
+        for idx, user_id in enumerate(user_ids)
+    }
+    model["assignments"].update(assigned)
+    return assigned
 
-        for cluster_id, centroid in cluster_centroids.items():
-            sim = cosine_similarity(user_vec, centroid.reshape(1, -1))[0][0]
 
-            if sim >= SOFT_MEMBERSHIP_THRESHOLD:
-                memberships.append({
-                    "cluster_id": f"cluster_{cluster_id}",
-                    "confidence": round(float(sim), 3)
-                })
+def save_cluster_model(model, path=CLUSTER_MODEL_FILE):
+    """Persist the model atomically (write to a temp file, then rename)."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def load_cluster_model(path=CLUSTER_MODEL_FILE):
+    """Load a persisted model, or None if there is none yet."""
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+# ---------------- CLUSTERING ----------------
+def cluster_users(user_records, model_path=None, refit=False):
+    """
+    user_records: list of dicts with keys:
+      - user_id
+      - embedding (list[float])
 
-        # Sort & trim
-        memberships.sort(key=lambda x: x["confidence"], reverse=True)
-        memberships = memberships[:MAX_SOFT_CLUSTERS]
+    With model_path, the persisted model is reused: only users it has not
+    seen are assigned (via approximate_predict) and the model is saved back.
+    HDBSCAN is refit only when there is no model yet or refit=True.
 
-        user_cluster_map[user_id] = {
-            "primary_cluster": (
-                memberships[0]["cluster_id"]
-                if memberships else "outlier"
-            ),
-            "memberships": memberships
-        }
+    Returns:
+      cluster_assignments (dict)
+      cluster_centroids (dict)
+    """
+    model = None if refit or not model_path else load_cluster_model(model_path)
+
+    if model is None:
+        model = fit_cluster_model(user_records)
+    else:
+        new_users = [u for u in user_records if u["user_id"] not in model["assignments"]]
+        assign_users(model, new_users)
+
+    if model_path:
+        save_cluster_model(model, model_path)
+
+    user_cluster_map = {
+        u["user_id"]: model["assignments"][u["user_id"]]
+        for u in user_records
+    }
+    cluster_centroids = dict(zip(model["centroid_ids"], model["centroids"]))
 
     return user_cluster_map, cluster_centroids
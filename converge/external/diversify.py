@@ -0,0 +1,69 @@
+from typing import Dict
+
+import numpy as np
+
+# -------- CONFIG --------
+
+# Relevance vs. novelty trade-off (1.0 = plain final-score order)
+MMR_LAMBDA = 0.7
+
+# Top candidates by final score that MMR picks from
+MMR_POOL_SIZE = 50
+
+# -------- MAXIMAL MARGINAL RELEVANCE --------
+
+def mmr_rerank(
+    relevance: np.ndarray,
+    embeddings: np.ndarray,
+    k: int,
+    lam: float = MMR_LAMBDA
+) -> Dict:
+    """
+    Select k of m candidates with Maximal Marginal Relevance.
+
+    Formula:
+        MMR_i = λ · rel_i - (1 - λ) · max_{j ∈ S} cos(e_i, e_j)
+
+    The m×m cosine block is computed once; after each pick the running
+    max-similarity vector is updated with that pick's row, so selection is
+    O(k·m) vectorized work instead of re-scanning the selected set.
+
+    Args:
+        relevance: (m,) relevance per candidate (final scores)
+        embeddings: (m, dim) candidate embeddings
+        k: Number of candidates to select
+        lam: λ in [0, 1]
+
+    Returns:
+        dict: {"order": selected indices in pick order,
+               "mmr_score": MMR score at pick time,
+               "max_similarity": max similarity to earlier picks at pick time}
+    """
+    relevance = np.asarray(relevance, dtype=np.float64)
+    embeddings = np.asarray(embeddings, dtype=np.float64)
+    m = len(relevance)
+    k = max(0, min(k, m))
+
+    norms = np.sqrt(np.einsum("ij,ij->i", embeddings, embeddings))
+    norms[norms == 0.0] = 1.0
+    units = embeddings / norms[:, None]
+    similarity = units @ units.T
+
+    # Max similarity to the picks so far (no penalty before the first pick)
+    max_sim = np.full(m, -np.inf)
+    available = np.ones(m, dtype=bool)
+    order = np.empty(k, dtype=np.int64)
+    mmr_scores = np.empty(k)
+    max_sims = np.empty(k)
+
+    for step in range(k):
+        mmr = lam * relevance - (1.0 - lam) * (max_sim if step else 0.0)
+        mmr[~available] = -np.inf
+        pick = int(np.argmax(mmr))  # first index wins ties, i.e. the better-ranked candidate
+        order[step] = pick
+        mmr_scores[step] = mmr[pick]
+        max_sims[step] = max_sim[pick] if step else 0.0
+        available[pick] = False
+        np.maximum(max_sim, similarity[pick], out=max_sim)
+
+    return {"order": order, "mmr_score": mmr_scores, "max_similarity": max_sims}
@@ -1,24 +1,10 @@
-import os
-import django
-from google.genai import Client
-from google.genai import types
+from external.genai_client import genai_types, get_embedding_model, get_genai_client
 
-# Configure Django if not already configured
-if not django.apps.apps.ready:
-    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'converge.settings')
-    django.setup()
-
-from django.conf import settings
-
-# Configure Google Generative AI
-EMBEDDING_MODEL = "models/text-embedding-004"
-api_key = settings.GEMINI_API_KEY
-if not api_key:
-    raise ValueError("GEMINI_API_KEY not configured in settings")
-client = Client(api_key=api_key)
+# Google Generative AI client is built on first use; the model comes from
+# settings.EMBEDDING_MODEL unless a caller passes one (see manage.py reembed)
 
 # -------- EMBEDDING FUNCTION --------
-def embed_semantic_text_project(text: str) -> list:
+def embed_semantic_text_project(text: str, model: str = None) -> list:
     """
     Converts semantic text into a 768-dim embedding vector using Google's embedding model.
     """
@@ -26,27 +12,46 @@ def embed_semantic_text_project(text: str) -> list:
         return [0.0] * 768
     
     try:
-        config = types.EmbedContentConfig(
-            task_type="RETRIEVAL_DOCUMENT",
+        result = get_genai_client().models.embed_content(
+            model=model or get_embedding_model(),
+            contents=text,
+            config=genai_types().EmbedContentConfig(task_type="RETRIEVAL_DOCUMENT"),
         )
-        result = client.models.embed_content(
-            model=EMBEDDING_MODEL,
+        embedding = _extract_embedding(result)
+        print(f"[embed_project] Generated Google embedding (dim={len(embedding)})")
+        return embedding
+    except Exception as e:
+        print(f"[embed_project] ❌ Error generating embedding: {str(e)}")
+        raise
+
+async def aembed_semantic_text_project(text: str, model: str = None) -> list:
+    """
+    Async embed_semantic_text_project: awaits the provider call on the event loop
+    (google.genai `client.aio`) instead of blocking a worker thread.
+    """
+    if not text:
+        return [0.0] * 768
+    
+    try:
+        result = await get_genai_client().aio.models.embed_content(
+            model=model or get_embedding_model(),
             contents=text,
-            config=config,
+            config=genai_types().EmbedContentConfig(task_type="RETRIEVAL_DOCUMENT"),
         )
-        # Extract embedding: result.embeddings is a list of ContentEmbedding objects
-        # Each ContentEmbedding has a 'values' attribute with the vector
-        if hasattr(result, 'embeddings') and result.embeddings:
-            embedding = list(result.embeddings[0].values)
-        else:
-            raise ValueError(f"Unexpected response structure: {result}")
-        
+        embedding = _extract_embedding(result)
         print(f"[embed_project] Generated Google embedding (dim={len(embedding)})")
         return embedding
     except Exception as e:
         print(f"[embed_project] ❌ Error generating embedding: {str(e)}")
         raise
 
+def _extract_embedding(result) -> list:
+    # Extract embedding: result.embeddings is a list of ContentEmbedding objects
+    # Each ContentEmbedding has a 'values' attribute with the vector
+    if hasattr(result, 'embeddings') and result.embeddings:
+        return list(result.embeddings[0].values)
+    raise ValueError(f"Unexpected response structure: {result}")
+
 # -------- RUNNER --------
 if __name__ == "__main__":
     from external.semantic_project import build_semantic_text_project
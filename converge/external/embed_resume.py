@@ -1,25 +1,14 @@
-import os
-import django
-from google.genai import Client
-from google.genai import types
-from external.semantic import build_semantic_text
-
-# Configure Django if not already configured
-if not django.apps.apps.ready:
-    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'converge.settings')
-    django.setup()
-
-from django.conf import settings
-
-# Configure Google Generative AI
-EMBEDDING_MODEL = "models/text-embedding-004"
-api_key = settings.GEMINI_API_KEY
-if not api_key:
-    raise ValueError("GEMINI_API_KEY not configured in settings")
-client = Client(api_key=api_key)
+from external.genai_client import genai_types, get_embedding_model, get_genai_client
+from external.semantic import FACETS, build_facet_texts, build_semantic_text
+
+# Google Generative AI client is built on first use; the model comes from
+# settings.EMBEDDING_MODEL unless a caller passes one (see manage.py reembed)
+
+# Most texts the provider accepts in one embed_content call
+EMBED_BATCH_LIMIT = 100
 
 # ---------------- EMBEDDING FUNCTION ----------------
-def embed_semantic_text(text: str) -> list:
+def embed_semantic_text(text: str, model: str = None) -> list:
     """
     Converts semantic text into a 768-dim embedding vector using Google's embedding model.
     """
@@ -27,27 +16,99 @@ def embed_semantic_text(text: str) -> list:
         return [0.0] * 768
     
     try:
-        config = types.EmbedContentConfig(
-            task_type="RETRIEVAL_DOCUMENT",
+        result = get_genai_client().models.embed_content(
+            model=model or get_embedding_model(),
+            contents=text,
+            config=genai_types().EmbedContentConfig(task_type="RETRIEVAL_DOCUMENT"),
         )
-        result = client.models.embed_content(
-            model=EMBEDDING_MODEL,
+        embedding = _extract_embedding(result)
+        print(f"[embed_resume] Generated Google embedding (dim={len(embedding)})")
+        return embedding
+    except Exception as e:
+        print(f"[embed_resume] ❌ Error generating embedding: {str(e)}")
+        raise
+
+async def aembed_semantic_text(text: str, model: str = None) -> list:
+    """
+    Async embed_semantic_text: awaits the provider call on the event loop
+    (google.genai `client.aio`) instead of blocking a worker thread.
+    """
+    if not text:
+        return [0.0] * 768
+    
+    try:
+        result = await get_genai_client().aio.models.embed_content(
+            model=model or get_embedding_model(),
             contents=text,
-            config=config,
+            config=genai_types().EmbedContentConfig(task_type="RETRIEVAL_DOCUMENT"),
         )
-        # Extract embedding: result.embeddings is a list of ContentEmbedding objects
-        # Each ContentEmbedding has a 'values' attribute with the vector
-        if hasattr(result, 'embeddings') and result.embeddings:
-            embedding = list(result.embeddings[0].values)
-        else:
-            raise ValueError(f"Unexpected response structure: {result}")
-        
+        embedding = _extract_embedding(result)
         print(f"[embed_resume] Generated Google embedding (dim={len(embedding)})")
         return embedding
     except Exception as e:
         print(f"[embed_resume] ❌ Error generating embedding: {str(e)}")
         raise
 
+# ---------------- BATCH EMBEDDINGS ----------------
+def embed_texts(texts: list, model: str = None) -> list:
+    """
+    Embeds many texts in one call (at most EMBED_BATCH_LIMIT); used by the
+    resume upserts (semantic text plus facets) and `manage.py reembed`.
+
+    Returns:
+        list: one row per text, in order; empty texts are zero rows
+    """
+    wanted = [text for text in texts if text]
+    if not wanted:
+        return [[0.0] * 768 for _ in texts]
+
+    result = get_genai_client().models.embed_content(
+        model=model or get_embedding_model(),
+        contents=wanted,
+        config=genai_types().EmbedContentConfig(task_type="RETRIEVAL_DOCUMENT"),
+    )
+    return _fill_embedding_matrix(texts, result)
+
+async def aembed_texts(texts: list, model: str = None) -> list:
+    """Async embed_texts (google.genai `client.aio`)."""
+    wanted = [text for text in texts if text]
+    if not wanted:
+        return [[0.0] * 768 for _ in texts]
+
+    result = await get_genai_client().aio.models.embed_content(
+        model=model or get_embedding_model(),
+        contents=wanted,
+        config=genai_types().EmbedContentConfig(task_type="RETRIEVAL_DOCUMENT"),
+    )
+    return _fill_embedding_matrix(texts, result)
+
+def resume_embedding_texts(semantic_text: str, resume_json: dict) -> list:
+    """The semantic text followed by the FACETS texts, for one embed_texts call."""
+    facet_texts = build_facet_texts(resume_json)
+    return [semantic_text] + [facet_texts[facet] for facet in FACETS]
+
+def _fill_embedding_matrix(texts: list, result) -> list:
+    # One returned embedding per non-empty text, in request order
+    embeddings = iter(getattr(result, 'embeddings', None) or [])
+    matrix = []
+    for text in texts:
+        if not text:
+            matrix.append(None)
+            continue
+        embedding = next(embeddings, None)
+        if embedding is None:
+            raise ValueError(f"Unexpected response structure: {result}")
+        matrix.append(list(embedding.values))
+    dim = len(next(row for row in matrix if row is not None))
+    return [row if row is not None else [0.0] * dim for row in matrix]
+
+def _extract_embedding(result) -> list:
+    # Extract embedding: result.embeddings is a list of ContentEmbedding objects
+    # Each ContentEmbedding has a 'values' attribute with the vector
+    if hasattr(result, 'embeddings') and result.embeddings:
+        return list(result.embeddings[0].values)
+    raise ValueError(f"Unexpected response structure: {result}")
+
 # ---------------- RUNNER ----------------
 if __name__ == "__main__":
     import json
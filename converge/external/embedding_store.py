@@ -0,0 +1,371 @@
+import json
+import os
+import sqlite3
+import uuid
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# -------- CONFIG --------
+STORE_DIR = "converge_store"
+DB_FILE = "store.sqlite3"
+
+# Vectors live in one memory-mapped .npy per kind; rows are only ever
+# appended (an upsert appends and repoints the id), and the file grows by
+# doubling so appends are amortized O(1). compact() writes the live rows to
+# a new file, which vector_files.file switches to in the remap's transaction
+VECTOR_DTYPE = np.float32
+INITIAL_CAPACITY = 1024
+
+# SQLite's default limit on bound parameters is 999 on older builds
+SQL_IN_CHUNK = 500
+
+_KINDS = {
+    "user": {
+        "table": "users",
+        "key": "user_id",
+        "label": "resume_file",
+        "json": "resume_json",
+        "vectors": "user_vectors.npy",
+    },
+    "project": {
+        "table": "projects",
+        "key": "project_id",
+        "label": "title",
+        "json": "project_json",
+        "vectors": "project_vectors.npy",
+    },
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id TEXT PRIMARY KEY,
+    resume_file TEXT,
+    vector_row INTEGER NOT NULL,
+    resume_json TEXT
+);
+CREATE INDEX IF NOT EXISTS users_resume_file ON users (resume_file);
+CREATE TABLE IF NOT EXISTS projects (
+    project_id TEXT PRIMARY KEY,
+    title TEXT,
+    vector_row INTEGER NOT NULL,
+    project_json TEXT
+);
+CREATE TABLE IF NOT EXISTS vector_files (
+    kind TEXT PRIMARY KEY,
+    used INTEGER NOT NULL,
+    dim INTEGER NOT NULL,
+    file TEXT
+);
+"""
+
+# -------- VECTOR FILE --------
+class _VectorFile:
+    """Append-only, memory-mapped (capacity, dim) .npy matrix."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.data = np.load(path, mmap_mode="r+") if os.path.exists(path) else None
+        self._inode = _inode(path)
+
+    def is_current(self) -> bool:
+        """False once another process has grown (replaced) the file under this mapping."""
+        return _inode(self.path) == self._inode
+
+    @property
+    def capacity(self) -> int:
+        return 0 if self.data is None else self.data.shape[0]
+
+    def append(self, vectors: np.ndarray, used: int) -> int:
+        """Write `vectors` after the first `used` rows; returns the first row written."""
+        needed = used + len(vectors)
+        if needed > self.capacity:
+            self._grow(max(needed, 2 * self.capacity, INITIAL_CAPACITY), used, vectors.shape[1])
+        self.data[used:needed] = vectors
+        self.data.flush()
+        return used
+
+    def _grow(self, capacity: int, used: int, dim: int):
+        tmp_path = f"{self.path}.tmp"
+        grown = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=VECTOR_DTYPE, shape=(capacity, dim))
+        if used:
+            grown[:used] = self.data[:used]
+        grown.flush()
+        del grown
+        self.data = None
+        os.replace(tmp_path, self.path)
+        self.data = np.load(self.path, mmap_mode="r+")
+        self._inode = _inode(self.path)
+
+
+def _inode(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_ino
+    except FileNotFoundError:
+        return None
+
+# -------- STORE --------
+class EmbeddingStore:
+    """
+    Embedded store for the offline CLI pipeline.
+
+    SQLite (`store.sqlite3`) holds ids, metadata and the resume/project JSON;
+    each kind's vectors live in an append-only memory-mapped .npy, with the
+    SQLite row pointing at its vector row. Upserts are one indexed SQLite
+    write plus one appended vector, so they cost the same at 10 or 100k users.
+    Writers (upserts, compact()) hold SQLite's write lock from before they
+    read the vector file state until they commit, so several processes can
+    share a store.
+
+    Usage:
+        with EmbeddingStore() as store:
+            store.upsert_user("user_1", embedding, resume_file="cv", resume_json={...})
+            user_ids, matrix = store.user_matrix()
+    """
+
+    def __init__(self, root: str = STORE_DIR):
+        os.makedirs(root, exist_ok=True)
+        self.root = root
+        self.conn = sqlite3.connect(os.path.join(root, DB_FILE))
+        self.conn.executescript(_SCHEMA)
+        self._vectors = {kind: None for kind in _KINDS}
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -------- USERS --------
+    def upsert_user(self, user_id: str, embedding: list, resume_file: Optional[str] = None, resume_json: Optional[Dict] = None):
+        self._upsert_many("user", [(user_id, resume_file or user_id, resume_json)], [embedding])
+
+    def bulk_load_users(self, records: Iterable[Dict]) -> int:
+        """Upsert many {user_id, embedding, resume_file?, resume_json?} records in one transaction."""
+        records = list(records)
+        self._upsert_many(
+            "user",
+            [(r["user_id"], r.get("resume_file") or r["user_id"], r.get("resume_json")) for r in records],
+            [r["embedding"] for r in records],
+        )
+        return len(records)
+
+    def get_user(self, user_id: str) -> Optional[Dict]:
+        return self.get_users([user_id], with_embeddings=True).get(user_id)
+
+    def find_user_by_resume_file(self, resume_file: str) -> Optional[Dict]:
+        row = self.conn.execute(
+            "SELECT user_id FROM users WHERE resume_file = ? ORDER BY rowid DESC LIMIT 1", (resume_file,)
+        ).fetchone()
+        return self.get_user(row[0]) if row else None
+
+    def get_users(self, user_ids: List[str], with_embeddings: bool = False) -> Dict[str, Dict]:
+        """{user_id: {user_id, resume_file, resume_json[, embedding]}} in one query per SQL_IN_CHUNK ids."""
+        return self._get_many("user", user_ids, with_embeddings)
+
+    def user_matrix(self) -> Tuple[List[str], np.ndarray]:
+        """All user ids (insertion order) and their (n, dim) embedding matrix."""
+        return self._matrix("user")
+
+    def count_users(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+    # -------- PROJECTS --------
+    def upsert_project(self, project_id: str, embedding: list, title: str = "", project_json: Optional[Dict] = None):
+        self._upsert_many("project", [(project_id, title, project_json)], [embedding])
+
+    def bulk_load_projects(self, records: Iterable[Dict]) -> int:
+        """Upsert many {project_id, embedding, title?, project_json?} records in one transaction."""
+        records = list(records)
+        self._upsert_many(
+            "project",
+            [(r["project_id"], r.get("title", ""), r.get("project_json")) for r in records],
+            [r["embedding"] for r in records],
+        )
+        return len(records)
+
+    def get_project(self, project_id: str) -> Optional[Dict]:
+        return self._get_many("project", [project_id], True).get(project_id)
+
+    def project_matrix(self) -> Tuple[List[str], np.ndarray]:
+        return self._matrix("project")
+
+    def count_projects(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM projects").fetchone()[0]
+
+    # -------- MAINTENANCE --------
+    def compact(self):
+        """
+        Rewrite each vector file with live rows only (upserts leave dead rows behind).
+
+        The live rows go to a new file; the row remap and the switch to that
+        file commit together, and only then is the old file removed, so a
+        crash at any point leaves the ids pointing at a consistent file.
+        """
+        for kind, spec in _KINDS.items():
+            new_path = None
+            try:
+                with self.conn:
+                    self.conn.execute("BEGIN IMMEDIATE")  # no upsert can append while the rows are copied
+                    old_file = self._current_vectors(kind)
+                    ids, matrix = self._matrix(kind)
+                    used, dim = self._vector_state(kind)
+                    if not used or len(ids) == used:
+                        continue
+                    name = f"{os.path.splitext(spec['vectors'])[0]}.{uuid.uuid4().hex[:8]}.npy"
+                    new_path = os.path.join(self.root, name)
+                    compacted = np.lib.format.open_memmap(new_path, mode="w+", dtype=VECTOR_DTYPE, shape=(max(len(ids), 1), dim))
+                    compacted[:len(ids)] = matrix
+                    compacted.flush()
+                    del compacted
+                    self.conn.executemany(
+                        f"UPDATE {spec['table']} SET vector_row = ? WHERE {spec['key']} = ?",
+                        [(row, item_id) for row, item_id in enumerate(ids)],
+                    )
+                    self.conn.execute("UPDATE vector_files SET used = ?, file = ? WHERE kind = ?", (len(ids), name, kind))
+            except Exception:
+                if new_path is not None and os.path.exists(new_path):
+                    os.remove(new_path)
+                raise
+            self._vectors[kind] = _VectorFile(new_path)
+            old_file.data = None
+            os.remove(old_file.path)
+
+    # -------- INTERNALS --------
+    def _vector_state(self, kind: str) -> Tuple[int, Optional[int]]:
+        row = self.conn.execute("SELECT used, dim FROM vector_files WHERE kind = ?", (kind,)).fetchone()
+        return row if row else (0, None)
+
+    def _current_vectors(self, kind: str) -> _VectorFile:
+        """This kind's vector file as vector_files names it, remapped if another process grew or compacted it."""
+        row = self.conn.execute("SELECT file FROM vector_files WHERE kind = ?", (kind,)).fetchone()
+        path = os.path.join(self.root, (row and row[0]) or _KINDS[kind]["vectors"])
+        vector_file = self._vectors[kind]
+        if vector_file is None or vector_file.path != path or not vector_file.is_current():
+            vector_file = self._vectors[kind] = _VectorFile(path)
+        return vector_file
+
+    def _upsert_many(self, kind: str, rows: List[Tuple], embeddings: List[list]):
+        if not rows:
+            return
+        spec = _KINDS[kind]
+        vectors = np.asarray(embeddings, dtype=VECTOR_DTYPE)
+        if vectors.ndim != 2:
+            raise ValueError(f"{kind} embeddings must all have the same dimension")
+
+        with self.conn:
+            # Write lock before reading `used`: another writer can neither
+            # append to the same rows nor commit between our read and commit
+            self.conn.execute("BEGIN IMMEDIATE")
+            used, dim = self._vector_state(kind)
+            if dim is not None and vectors.shape[1] != dim:
+                raise ValueError(f"{kind} embedding dimension {vectors.shape[1]} does not match store dimension {dim}")
+
+            # Vectors first: if the SQLite commit never happens the appended rows
+            # stay past `used` and are simply overwritten by the next append
+            vector_file = self._current_vectors(kind)
+            start = vector_file.append(vectors, used)
+            self.conn.executemany(
+                f"""
+                INSERT INTO {spec['table']} ({spec['key']}, {spec['label']}, vector_row, {spec['json']})
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT({spec['key']}) DO UPDATE SET
+                    {spec['label']} = excluded.{spec['label']},
+                    vector_row = excluded.vector_row,
+                    {spec['json']} = COALESCE(excluded.{spec['json']}, {spec['json']})
+                """,
+                [
+                    (item_id, label, start + i, json.dumps(item_json) if item_json is not None else None)
+                    for i, (item_id, label, item_json) in enumerate(rows)
+                ],
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO vector_files (kind, used, dim, file) VALUES (?, ?, ?, ?)",
+                (kind, start + len(rows), vectors.shape[1], os.path.basename(vector_file.path)),
+            )
+
+    def _get_many(self, kind: str, ids: List[str], with_embeddings: bool) -> Dict[str, Dict]:
+        spec = _KINDS[kind]
+        vector_file = self._current_vectors(kind) if with_embeddings else None
+        found = {}
+        for i in range(0, len(ids), SQL_IN_CHUNK):
+            chunk = list(ids[i:i + SQL_IN_CHUNK])
+            placeholders = ",".join("?" * len(chunk))
+            for item_id, label, vector_row, item_json in self.conn.execute(
+                f"SELECT {spec['key']}, {spec['label']}, vector_row, {spec['json']} "
+                f"FROM {spec['table']} WHERE {spec['key']} IN ({placeholders})",
+                chunk,
+            ):
+                record = {
+                    spec["key"]: item_id,
+                    spec["label"]: label,
+                    spec["json"]: json.loads(item_json) if item_json else {},
+                }
+                if with_embeddings:
+                    record["embedding"] = vector_file.data[vector_row].tolist()
+                found[item_id] = record
+        return found
+
+    def _matrix(self, kind: str) -> Tuple[List[str], np.ndarray]:
+        spec = _KINDS[kind]
+        rows = self.conn.execute(f"SELECT {spec['key']}, vector_row FROM {spec['table']} ORDER BY rowid").fetchall()
+        _, dim = self._vector_state(kind)
+        if not rows:
+            return [], np.zeros((0, dim or 0), dtype=VECTOR_DTYPE)
+        ids = [item_id for item_id, _ in rows]
+        matrix = self._current_vectors(kind).data[np.fromiter((r for _, r in rows), dtype=np.int64, count=len(rows))]
+        return ids, matrix
+
+# -------- IMPORT --------
+def import_json_files(
+    store: EmbeddingStore,
+    user_embeddings_file: str = "user_embeddings.json",
+    project_embeddings_file: str = "project_embeddings.json",
+    resume_jsons_dir: str = "resume_jsons",
+    project_jsons_dir: str = "project_jsons"
+) -> Dict:
+    """
+    One-shot import of the old file layout (embedding JSON lists plus one
+    JSON file per resume/project) into the store.
+
+    Returns:
+        dict: {"users": n, "projects": n}
+    """
+    def read_json(path):
+        if not os.path.exists(path):
+            return None
+        with open(path, "r") as f:
+            return json.load(f)
+
+    users = read_json(user_embeddings_file) or []
+    for user in users:
+        resume_file = user.get("resume_file", user["user_id"])
+        user["resume_json"] = read_json(os.path.join(resume_jsons_dir, f"{resume_file}.json"))
+
+    projects = read_json(project_embeddings_file) or []
+    for project in projects:
+        project["project_json"] = read_json(os.path.join(project_jsons_dir, f"{project['project_id']}.json"))
+
+    return {
+        "users": store.bulk_load_users(users),
+        "projects": store.bulk_load_projects(projects),
+    }
+
+# -------- RUNNER --------
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2 or sys.argv[1] not in ("import", "stats", "compact"):
+        print("❌ Usage: python embedding_store.py import|stats|compact [store_dir]")
+        sys.exit(1)
+
+    with EmbeddingStore(sys.argv[2] if len(sys.argv) > 2 else STORE_DIR) as store:
+        if sys.argv[1] == "import":
+            counts = import_json_files(store)
+            print(f"✅ Imported {counts['users']} users and {counts['projects']} projects into {store.root}")
+        elif sys.argv[1] == "compact":
+            store.compact()
+            print(f"✅ Compacted vector files in {store.root}")
+        print(f"Users: {store.count_users()} | Projects: {store.count_projects()}")
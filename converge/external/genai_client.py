@@ -0,0 +1,85 @@
+import os
+import threading
+
+# The google-genai SDK (and its pydantic/httpx stack) is imported on the first
+# provider call, not at module import, so loading the URLconf or running a
+# manage.py command never pays for it or needs GEMINI_API_KEY
+
+# Model behind every vector stored before embeddings recorded their model
+DEFAULT_EMBEDDING_MODEL = "models/text-embedding-004"
+DEFAULT_PARSER_MODEL = "models/gemma-3-12b-it"
+
+_client_lock = threading.Lock()
+_client = None
+
+
+def get_genai_client():
+    """
+    Process-wide google-genai Client, built on first use.
+
+    The API key comes from Django settings (GEMINI_API_KEY, which also reads
+    .env); when the settings cannot load (no SECRET_KEY, database or Django
+    project around it) the GEMINI_API_KEY environment variable is used.
+    GEMINI_BASE_URL, when set, points the client at another endpoint (e.g.
+    the local stand-in in benchmarks/gemini_standin.py).
+
+    Raises:
+        ValueError: when GEMINI_API_KEY is not configured
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from google.genai import Client
+                base_url = get_base_url()
+                http_options = {"base_url": base_url} if base_url else None
+                _client = Client(api_key=get_api_key(), http_options=http_options)
+    return _client
+
+
+def get_api_key() -> str:
+    api_key = _setting("GEMINI_API_KEY")
+    if not api_key:
+        raise ValueError("GEMINI_API_KEY not configured in settings")
+    return api_key
+
+
+def get_base_url() -> str:
+    """Provider endpoint override (settings.GEMINI_BASE_URL); empty for the real API."""
+    return _setting("GEMINI_BASE_URL") or ""
+
+
+def get_embedding_model() -> str:
+    """
+    Embedding model for new vectors (settings.EMBEDDING_MODEL). Every stored
+    vector records the model that produced it; see `manage.py reembed`.
+    """
+    return _setting("EMBEDDING_MODEL") or DEFAULT_EMBEDDING_MODEL
+
+
+def get_parser_model() -> str:
+    """Model behind parse_resume (settings.RESUME_PARSER_MODEL)."""
+    return _setting("RESUME_PARSER_MODEL") or DEFAULT_PARSER_MODEL
+
+
+def _setting(name: str):
+    """
+    settings.<name>, or the environment variable of the same name when it is
+    unset or the settings cannot load (the offline scripts run outside a
+    configured project).
+    """
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "converge.settings")
+    from decouple import UndefinedValueError
+    from django.conf import settings
+    from django.core.exceptions import ImproperlyConfigured
+    try:
+        value = getattr(settings, name, None)
+    except (ImproperlyConfigured, ImportError, UndefinedValueError):
+        value = None
+    return value or os.getenv(name)
+
+
+def genai_types():
+    """google.genai.types, imported on first use."""
+    from google.genai import types
+    return types
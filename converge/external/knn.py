@@ -0,0 +1,103 @@
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# -------- CONFIG --------
+
+# Rows per block of the similarity pass; bounds the float32 temporary
+BLOCK_ROWS = 65536
+
+# -------- RESIDENT UNIT MATRIX --------
+
+class UnitEmbeddingMatrix:
+    """
+    Resident float32 copy of the resume embeddings, each row scaled to unit
+    length, so cosine similarity to every resume is one matrix-vector
+    product (about 3 KB per 768-dim resume).
+    """
+
+    def __init__(self, ids: List[int], units: np.ndarray):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.units = units
+        self.rows = {int(resume_id): row for row, resume_id in enumerate(self.ids)}
+
+    @classmethod
+    def from_chunks(cls, chunks) -> "UnitEmbeddingMatrix":
+        """Build from (ids, embeddings) chunks, normalizing each chunk as it arrives."""
+        ids, blocks = [], []
+        for chunk_ids, chunk_embeddings in chunks:
+            if not len(chunk_ids):
+                continue
+            block = np.asarray(chunk_embeddings, dtype=np.float32).reshape(len(chunk_ids), -1)
+            norms = np.linalg.norm(block, axis=1)
+            norms[norms == 0] = 1.0
+            ids.extend(chunk_ids)
+            blocks.append(block / norms[:, None])
+        if not ids:
+            return cls([], np.zeros((0, 0), dtype=np.float32))
+        return cls(ids, np.vstack(blocks))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        return self.units.nbytes + self.ids.nbytes
+
+    def nearest(self, resume_id: int, k: int) -> List[Tuple[int, float]]:
+        """
+        The k resumes most similar to `resume_id` (itself excluded).
+
+        One blocked matrix-vector pass gives every cosine similarity;
+        argpartition then selects the k best in O(n) and only those k (plus
+        any rows tied with the k-th) are sorted.
+
+        Returns:
+            List[(resume_id, cosine similarity)] best first; ties by resume id.
+            Raises KeyError when the resume has no row.
+        """
+        row = self.rows[resume_id]
+        n = len(self.ids)
+        k = min(k, n - 1)
+        if k <= 0:
+            return []
+
+        query = self.units[row]
+        sims = np.empty(n, dtype=np.float32)
+        for start in range(0, n, BLOCK_ROWS):
+            sims[start:start + BLOCK_ROWS] = self.units[start:start + BLOCK_ROWS] @ query
+        sims[row] = -np.inf
+
+        top = np.argpartition(-sims, k - 1)[:k]
+        # argpartition keeps an arbitrary subset of rows tied at the cut-off; take them all, then order
+        top = np.flatnonzero(sims >= sims[top].min())
+        top = top[np.lexsort((self.ids[top], -sims[top]))][:k]
+        return [(int(self.ids[i]), float(sims[i])) for i in top]
+
+# -------- SHARED SKILLS --------
+
+def shared_skills(resume_json: Dict, other_json: Dict) -> Dict:
+    """
+    Skills two resumes have in common, per skills category (case-insensitive,
+    spelled as in `resume_json`).
+
+    Returns:
+        dict: {"count": int, "by_category": {category: [skill, ...]}}
+    """
+    other = set()
+    for skill_list in ((other_json or {}).get("skills") or {}).values():
+        if isinstance(skill_list, list):
+            other.update(s.lower() for s in skill_list if isinstance(s, str))
+
+    by_category, seen = {}, set()
+    for category, skill_list in ((resume_json or {}).get("skills") or {}).items():
+        if not isinstance(skill_list, list):
+            continue
+        common = []
+        for skill in skill_list:
+            if isinstance(skill, str) and skill.lower() in other and skill.lower() not in seen:
+                seen.add(skill.lower())
+                common.append(skill)
+        if common:
+            by_category[category] = common
+    return {"count": len(seen), "by_category": by_category}
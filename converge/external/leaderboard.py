@@ -0,0 +1,118 @@
+import json
+import os
+import tempfile
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# -------- LEADERBOARD --------
+
+class Leaderboard:
+    """
+    Users ordered by Bayesian global rating.
+
+    `keys` is a sorted list of (-global_rating, ratee_id), best first, and
+    `entries` maps ratee_id -> (global_rating, ratings_count); a user's key
+    is found from the map and ranked by bisection, so rank and percentile
+    lookups are O(log n) and an update is one removal plus one insertion.
+    Only users with at least one rating are on the board.
+    """
+
+    def __init__(self):
+        self.keys: List[Tuple[float, int]] = []
+        self.entries: Dict[int, Tuple[float, int]] = {}
+        self.watermark = None  # caller-owned sync marker, persisted with the board
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def update(self, ratee_id: int, global_rating: float, ratings_count: int):
+        """Insert or move one user (users with no ratings are removed)."""
+        old = self.entries.pop(ratee_id, None)
+        if old is not None:
+            del self.keys[bisect_left(self.keys, (-old[0], ratee_id))]
+        if ratings_count:
+            self.entries[ratee_id] = (global_rating, ratings_count)
+            insort(self.keys, (-global_rating, ratee_id))
+
+    def standing(self, ratee_id: int) -> Optional[Dict]:
+        """
+        A user's place on the board, or None when they have no ratings.
+
+        Formula:
+            rank = 1 + #users with a higher rating            (ties share a rank)
+            percentile = 100 · #users with a lower rating / (n - 1)
+            top_percent = 100 · rank / n
+
+        Returns:
+            dict: {"rank", "of", "percentile", "top_percent", "global_rating", "ratings_count"}
+        """
+        entry = self.entries.get(ratee_id)
+        if entry is None:
+            return None
+        n = len(self.keys)
+        rank = self._rank(entry[0])
+        below = n - bisect_right(self.keys, (-entry[0], float("inf")))
+        return {
+            "rank": rank,
+            "of": n,
+            "percentile": round(100.0 * below / (n - 1), 2) if n > 1 else 100.0,
+            "top_percent": round(100.0 * rank / n, 2),
+            "global_rating": entry[0],
+            "ratings_count": entry[1],
+        }
+
+    def page(self, offset: int, limit: int) -> List[Dict]:
+        """Board rows [offset, offset + limit), best first."""
+        return [
+            {
+                "rank": self._rank(-neg_rating),
+                "ratee_id": ratee_id,
+                "global_rating": -neg_rating,
+                "ratings_count": self.entries[ratee_id][1],
+            }
+            for neg_rating, ratee_id in self.keys[offset:offset + limit]
+        ]
+
+    def _rank(self, global_rating: float) -> int:
+        return bisect_left(self.keys, (-global_rating, float("-inf"))) + 1
+
+    # -------- BUILD + PERSISTENCE --------
+
+    @classmethod
+    def build(cls, rows: Iterable[Tuple[int, float, int]]) -> "Leaderboard":
+        """From (ratee_id, global_rating, ratings_count) rows, sorted once."""
+        board = cls()
+        board.entries = {ratee_id: (rating, count) for ratee_id, rating, count in rows if count}
+        board.keys = sorted((-rating, ratee_id) for ratee_id, (rating, _) in board.entries.items())
+        return board
+
+    def save(self, path: str):
+        """Write atomically (temp file, then rename)."""
+        ratee_ids = np.array([ratee_id for _, ratee_id in self.keys], dtype=np.int64)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".npz")  # unique per writer
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(
+                    f,
+                    ratee_ids=ratee_ids,
+                    ratings=np.array([self.entries[r][0] for r in ratee_ids.tolist()], dtype=np.float64),
+                    counts=np.array([self.entries[r][1] for r in ratee_ids.tolist()], dtype=np.int64),
+                    watermark=np.array(json.dumps(self.watermark)),
+                )
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> Optional["Leaderboard"]:
+        """Load a saved board, or None if there is none yet."""
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            board = cls.build(zip(data["ratee_ids"].tolist(), data["ratings"].tolist(), data["counts"].tolist()))
+            board.watermark = json.loads(str(data["watermark"]))
+        return board
@@ -1,9 +1,6 @@
-import json
 import numpy as np
-import math
-from sklearn.metrics.pairwise import cosine_similarity
-from typing import List, Dict, Tuple
-from ratings.services import get_global_rating_data
+from typing import List, Dict, Optional, Tuple
+from external.embedding_store import EmbeddingStore, STORE_DIR
 
 # -------- CONFIG --------
 
@@ -55,42 +52,24 @@ EXPERIENCE_LEVELS = {
     "advanced": 3
 }
 
-# -------- DATA LOADING --------
-def load_project_embeddings() -> Dict:
-    """Load project embeddings from file."""
-    try:
-        with open("project_embeddings.json", "r") as f:
-            data = json.load(f)
-            return {proj["project_id"]: proj for proj in data}
-    except FileNotFoundError:
-        print("❌ project_embeddings.json not found")
-        return {}
-
-def load_user_embeddings() -> Dict:
-    """Load user embeddings from file."""
-    try:
-        with open("user_embeddings.json", "r") as f:
-            data = json.load(f)
-            return {user["user_id"]: user for user in data}
-    except FileNotFoundError:
-        print("❌ user_embeddings.json not found")
-        return {}
-
-def load_project_json(project_id: str) -> Dict:
-    """Load individual project JSON file."""
-    try:
-        with open(f"project_jsons/{project_id}.json", "r") as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {}
-
-def load_user_json(resume_file: str) -> Dict:
-    """Load individual user JSON file."""
-    try:
-        with open(f"resume_jsons/{resume_file}.json", "r") as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {}
+# Availability level mapping (codes index _AVAILABILITY_SIGNAL)
+AVAILABILITY_LEVELS = {
+    "low": 0,
+    "medium": 1,
+    "high": 2
+}
+
+# Availability signal (A) used by the reliability score, by availability code
+_AVAILABILITY_SIGNAL = np.array([0.3, 0.6, 1.0])
+
+# Facet weights for the fused semantic score, in FACETS order
+# (skills, projects, interests); each row sums to 1
+FACET_WEIGHTS = {
+    "hackathon": (0.50, 0.30, 0.20),
+    "research": (0.35, 0.35, 0.30),
+    "startup": (0.40, 0.40, 0.20),
+    "open_source": (0.45, 0.30, 0.25)
+}
 
 # -------- LAYER 1: CAPABILITY AND ALIGNMENT SCORE --------
 
@@ -105,11 +84,35 @@ def compute_semantic_similarity(project_embedding: list, user_embedding: list) -
     Returns:
         float: Cosine similarity score (0-1)
     """
-    proj_vec = np.array(project_embedding).reshape(1, -1)
-    user_vec = np.array(user_embedding).reshape(1, -1)
+    return float(compute_semantic_similarities(project_embedding, [user_embedding])[0])
+
+def compute_semantic_similarities(project_embedding: list, user_embeddings) -> np.ndarray:
+    """
+    Cosine similarity between a project and many users in one matrix product.
     
-    similarity = cosine_similarity(proj_vec, user_vec)[0][0]
-    return float(similarity)
+    Args:
+        project_embedding: Project embedding vector
+        user_embeddings: (n, dim) user embedding vectors
+    
+    Returns:
+        np.ndarray: Cosine similarity per user (0 for zero vectors)
+    """
+    proj_vec = np.asarray(project_embedding, dtype=np.float64).reshape(1, -1)
+    user_vecs = np.asarray(user_embeddings, dtype=np.float64)
+    if user_vecs.size == 0:
+        return np.zeros(0)
+    user_vecs = user_vecs.reshape(len(user_vecs), -1)
+    
+    # Same normalization and product order as sklearn's cosine_similarity,
+    # so scores are bit-identical without importing scikit-learn
+    proj_unit = proj_vec / _safe_row_norms(proj_vec)[:, None]
+    user_units = user_vecs / _safe_row_norms(user_vecs)[:, None]
+    return (proj_unit @ user_units.T)[0]
+
+def _safe_row_norms(matrix: np.ndarray) -> np.ndarray:
+    norms = np.sqrt(np.einsum("ij,ij->i", matrix, matrix))
+    norms[norms == 0.0] = 1.0
+    return norms
 
 def semantic_relevance_filter(
     project_embedding: list,
@@ -131,16 +134,31 @@ def semantic_relevance_filter(
         Tuple[passes_filter, similarity, interpretation]
     """
     similarity = compute_semantic_similarity(project_embedding, user_embedding)
+    passes, interpretation = classify_semantic_similarity(similarity)
+    return passes, similarity, interpretation
+
+def classify_semantic_similarity(similarity: float) -> Tuple[bool, str]:
+    """
+    Apply the semantic relevance thresholds to an already computed similarity.
     
+    Returns:
+        Tuple[passes_filter, interpretation]
+    """
     if similarity < SEMANTIC_THRESHOLDS["unrelated"]:
-        return False, similarity, "unrelated"
+        return False, "unrelated"
     elif SEMANTIC_THRESHOLDS["meaningful"][0] <= similarity <= SEMANTIC_THRESHOLDS["meaningful"][1]:
-        return True, similarity, "meaningful"
+        return True, "meaningful"
     elif similarity > SEMANTIC_THRESHOLDS["strong"]:
-        return True, similarity, "strong"
+        return True, "strong"
     else:
         # 0.30-0.35: borderline, reject
-        return False, similarity, "borderline"
+        return False, "borderline"
+
+def semantic_gate_batch(similarities: np.ndarray) -> np.ndarray:
+    """Vectorized classify_semantic_similarity pass/fail for many similarities."""
+    similarities = np.asarray(similarities, dtype=np.float64)
+    low, high = SEMANTIC_THRESHOLDS["meaningful"]
+    return ((similarities >= low) & (similarities <= high)) | (similarities > SEMANTIC_THRESHOLDS["strong"])
 
 def score_skill_match(
     required_skills: List[str],
@@ -195,26 +213,8 @@ def score_experience_alignment(
     Returns:
         float: Experience alignment score (0-1)
     """
-    preferred_levels = PROJECT_TYPE_EXPERIENCE.get(project_type, ["intermediate"])
-    user_level = user_overall_experience.lower()
-    
-    # Perfect match if user is in preferred list
-    if user_level in preferred_levels:
-        return 1.0
-    
-    # Partial credit if adjacent to preferred
-    user_value = EXPERIENCE_LEVELS.get(user_level, 2)
-    preferred_values = [EXPERIENCE_LEVELS.get(level, 2) for level in preferred_levels]
-    
-    # Calculate distance to nearest preferred level
-    min_distance = min(abs(user_value - pref) for pref in preferred_values)
-    
-    if min_distance == 0:
-        return 1.0
-    elif min_distance == 1:
-        return 0.7  # Adjacent level
-    else:
-        return 0.3  # Far from preferred
+    experience_codes = encode_experience_levels([user_overall_experience])
+    return float(score_experience_alignment_batch(project_type, experience_codes)[0])
 
 def compute_capability_score(
     project_embedding: list,
@@ -222,7 +222,8 @@ def compute_capability_score(
     project_type: str,
     required_skills: List[str],
     user_skills: Dict[str, list],
-    user_experience: str
+    user_experience: str,
+    semantic_score: Optional[float] = None
 ) -> Dict:
     """
     LAYER 1: Compute Capability and Alignment Score
@@ -237,32 +238,27 @@ def compute_capability_score(
         required_skills: Required skills for project
         user_skills: User's available skills
         user_experience: User's overall experience level
+        semantic_score: Cosine similarity already computed by the semantic
+            filter; recomputed from the embeddings when omitted
     
     Returns:
         dict: Capability score components
     """
     # Semantic component
-    s_semantic = compute_semantic_similarity(project_embedding, user_embedding)
+    if semantic_score is None:
+        semantic_score = compute_semantic_similarity(project_embedding, user_embedding)
     
     # Skills component
     s_skills = score_skill_match(required_skills, user_skills)
     
-    # Experience component
-    s_experience = score_experience_alignment(project_type, user_experience)
-    
-    # Weighted combination
-    capability_score = (
-        C_WEIGHTS["semantic"] * s_semantic +
-        C_WEIGHTS["skills"] * s_skills +
-        C_WEIGHTS["experience"] * s_experience
+    batch = compute_capability_scores_batch(
+        [semantic_score],
+        [s_skills],
+        encode_experience_levels([user_experience]),
+        project_type
     )
     
-    return {
-        "capability_score": round(min(1.0, capability_score), 4),
-        "s_semantic": round(s_semantic, 4),
-        "s_skills": round(s_skills, 4),
-        "s_experience": round(s_experience, 4)
-    }
+    return {key: float(values[0]) for key, values in batch.items()}
 
 # -------- LAYER 2: TRUST AND EXECUTION SCORE --------
 
@@ -276,12 +272,7 @@ def score_rating(global_rating: float) -> float:
     Returns:
         float: Rating score (0-1)
     """
-    if global_rating == 0:
-        return 0.5  # No rating = neutral
-    
-    # Normalize 1-5 to 0-1
-    normalized = (global_rating - 1.0) / 4.0
-    return min(1.0, max(0.0, normalized))
+    return float(score_rating_batch([global_rating])[0])
 
 def score_reliability(
     completed_projects: int,
@@ -305,26 +296,11 @@ def score_reliability(
     Returns:
         float: Reliability score (0-1)
     """
-    # Availability signal
-    availability_map = {"low": 0.3, "medium": 0.6, "high": 1.0}
-    A = availability_map.get(availability.lower(), 0.6)
-    
-    # Completion ratio (with epsilon to avoid division by zero)
-    C = completed_projects / (completed_projects + dropped_projects + EPSILON)
-    
-    # Base reliability
-    r_base = 0.7 * C + 0.3 * A
-    
-    # Total projects for confidence
-    n = completed_projects + dropped_projects
-    
-    # Confidence factor (exponential)
-    gamma = 1.0 - math.exp(-n / COMPLETION_CONFIDENCE_CONSTANT)
-    
-    # Final reliability score
-    s_reliability = (gamma * r_base) + ((1.0 - gamma) * RELIABILITY_PRIOR)
-    
-    return round(min(1.0, max(0.0, s_reliability)), 4)
+    return float(score_reliability_batch(
+        [completed_projects],
+        [dropped_projects],
+        encode_availability_levels([availability])
+    )[0])
 
 def compute_trust_score(
     global_rating: float,
@@ -347,20 +323,14 @@ def compute_trust_score(
     Returns:
         dict: Trust score with components
     """
-    s_rating = score_rating(global_rating)
-    s_reliability = score_reliability(completed_projects, dropped_projects, availability)
-    
-    trust_score = (
-        T_WEIGHTS["rating"] * s_rating +
-        T_WEIGHTS["reliability"] * s_reliability
+    batch = compute_trust_scores_batch(
+        [global_rating],
+        [completed_projects],
+        [dropped_projects],
+        encode_availability_levels([availability])
     )
     
-    return {
-        "trust_score": round(min(1.0, trust_score), 4),
-        "s_rating": round(s_rating, 4),
-        "s_reliability": s_reliability,
-        "completion_ratio": round(completed_projects / (completed_projects + dropped_projects + EPSILON), 3)
-    }
+    return {key: float(values[0]) for key, values in batch.items()}
 
 # -------- FINAL SCORING --------
 
@@ -387,16 +357,292 @@ def compute_final_score(
     Returns:
         dict: Final score with metadata
     """
-    alpha = PROJECT_TYPE_ALPHA.get(project_type, 0.65)
-    
-    final_score = (alpha * capability_score) + ((1.0 - alpha) * trust_score)
+    batch = compute_final_scores_batch([capability_score], [trust_score], project_type)
+    alpha = batch["alpha"]
     
     return {
-        "final_score": round(min(1.0, final_score), 4),
+        "final_score": float(batch["final_score"][0]),
         "alpha": alpha,
         "formula": f"{alpha:.2f} × {capability_score:.4f} + {(1-alpha):.2f} × {trust_score:.4f}"
     }
 
+# -------- BATCH SCORING (VECTORIZED) --------
+# The scalar scoring functions above are thin wrappers around these, so a
+# candidate scored alone or as part of a batch gets bit-identical results.
+
+def _round(values: np.ndarray, ndigits: int) -> np.ndarray:
+    """
+    np.round that agrees with Python's round() on near-ties.
+    
+    np.round scales by 10**ndigits before rounding, which can flip exact
+    binary ties (e.g. 0.42795); those few elements fall back to round().
+    """
+    values = np.asarray(values, dtype=np.float64)
+    rounded = np.round(values, ndigits)
+    scaled = np.abs(values) * 10.0 ** ndigits
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_tie.any():
+        rounded[near_tie] = [round(value, ndigits) for value in values[near_tie].tolist()]
+    return rounded
+
+def encode_experience_levels(levels: List[str]) -> np.ndarray:
+    """
+    Encode experience level strings as EXPERIENCE_LEVELS codes.
+    
+    Unknown levels map to intermediate (2), as in the scalar scorer.
+    """
+    return np.array(
+        [EXPERIENCE_LEVELS.get(str(level).lower(), 2) for level in levels],
+        dtype=np.int64
+    )
+
+def encode_availability_levels(levels: List[str]) -> np.ndarray:
+    """
+    Encode availability strings as AVAILABILITY_LEVELS codes.
+    
+    Unknown levels map to medium, as in the scalar scorer.
+    """
+    return np.array(
+        [AVAILABILITY_LEVELS.get(str(level).lower(), AVAILABILITY_LEVELS["medium"]) for level in levels],
+        dtype=np.int64
+    )
+
+def score_experience_alignment_batch(
+    project_type: str,
+    experience_codes: np.ndarray
+) -> np.ndarray:
+    """
+    Vectorized score_experience_alignment over EXPERIENCE_LEVELS codes.
+    
+    Returns:
+        np.ndarray: 1.0 for a preferred level, 0.7 for an adjacent level, 0.3 otherwise
+    """
+    preferred_levels = PROJECT_TYPE_EXPERIENCE.get(project_type, ["intermediate"])
+    preferred_values = np.array([EXPERIENCE_LEVELS.get(level, 2) for level in preferred_levels])
+    codes = np.asarray(experience_codes, dtype=np.int64).reshape(-1)
+    
+    # Distance to nearest preferred level
+    min_distance = np.abs(codes[:, None] - preferred_values[None, :]).min(axis=1)
+    
+    return np.where(min_distance == 0, 1.0, np.where(min_distance == 1, 0.7, 0.3))
+
+def compute_capability_scores_batch(
+    semantic_scores: np.ndarray,
+    skill_scores: np.ndarray,
+    experience_codes: np.ndarray,
+    project_type: str
+) -> Dict[str, np.ndarray]:
+    """
+    LAYER 1 for many candidates at once.
+    
+    Args:
+        semantic_scores: Cosine similarities from the semantic filter
+        skill_scores: score_skill_match fractions
+        experience_codes: EXPERIENCE_LEVELS codes (see encode_experience_levels)
+        project_type: Type of project
+    
+    Returns:
+        dict: Arrays keyed like compute_capability_score's result
+    """
+    s_semantic = np.asarray(semantic_scores, dtype=np.float64).reshape(-1)
+    s_skills = np.asarray(skill_scores, dtype=np.float64).reshape(-1)
+    s_experience = score_experience_alignment_batch(project_type, experience_codes)
+    
+    capability_score = (
+        C_WEIGHTS["semantic"] * s_semantic +
+        C_WEIGHTS["skills"] * s_skills +
+        C_WEIGHTS["experience"] * s_experience
+    )
+    
+    return {
+        "capability_score": _round(np.minimum(1.0, capability_score), 4),
+        "s_semantic": _round(s_semantic, 4),
+        "s_skills": _round(s_skills, 4),
+        "s_experience": _round(s_experience, 4)
+    }
+
+def score_rating_batch(global_ratings: np.ndarray) -> np.ndarray:
+    """Vectorized score_rating: 1-5 ratings to 0-1, with 0 (no rating) as neutral."""
+    ratings = np.asarray(global_ratings, dtype=np.float64).reshape(-1)
+    normalized = np.clip((ratings - 1.0) / 4.0, 0.0, 1.0)
+    return np.where(ratings == 0, 0.5, normalized)
+
+def score_reliability_batch(
+    completed_projects: np.ndarray,
+    dropped_projects: np.ndarray,
+    availability_codes: np.ndarray
+) -> np.ndarray:
+    """
+    Vectorized score_reliability.
+    
+    Args:
+        completed_projects: Completed project counts
+        dropped_projects: Dropped project counts
+        availability_codes: AVAILABILITY_LEVELS codes (see encode_availability_levels)
+    
+    Returns:
+        np.ndarray: Reliability scores (0-1), rounded to 4 places
+    """
+    completed = np.asarray(completed_projects, dtype=np.float64).reshape(-1)
+    dropped = np.asarray(dropped_projects, dtype=np.float64).reshape(-1)
+    A = _AVAILABILITY_SIGNAL[np.asarray(availability_codes, dtype=np.int64).reshape(-1)]
+    
+    C = completed / (completed + dropped + EPSILON)
+    r_base = 0.7 * C + 0.3 * A
+    n = completed + dropped
+    gamma = 1.0 - np.exp(-n / COMPLETION_CONFIDENCE_CONSTANT)
+    s_reliability = (gamma * r_base) + ((1.0 - gamma) * RELIABILITY_PRIOR)
+    
+    return _round(np.clip(s_reliability, 0.0, 1.0), 4)
+
+def compute_trust_scores_batch(
+    global_ratings: np.ndarray,
+    completed_projects: np.ndarray,
+    dropped_projects: np.ndarray,
+    availability_codes: np.ndarray
+) -> Dict[str, np.ndarray]:
+    """
+    LAYER 2 for many candidates at once.
+    
+    Returns:
+        dict: Arrays keyed like compute_trust_score's result
+    """
+    completed = np.asarray(completed_projects, dtype=np.float64).reshape(-1)
+    dropped = np.asarray(dropped_projects, dtype=np.float64).reshape(-1)
+    
+    s_rating = score_rating_batch(global_ratings)
+    s_reliability = score_reliability_batch(completed, dropped, availability_codes)
+    
+    trust_score = (
+        T_WEIGHTS["rating"] * s_rating +
+        T_WEIGHTS["reliability"] * s_reliability
+    )
+    
+    return {
+        "trust_score": _round(np.minimum(1.0, trust_score), 4),
+        "s_rating": _round(s_rating, 4),
+        "s_reliability": s_reliability,
+        "completion_ratio": _round(completed / (completed + dropped + EPSILON), 3)
+    }
+
+def compute_final_scores_batch(
+    capability_scores: np.ndarray,
+    trust_scores: np.ndarray,
+    project_type: str
+) -> Dict:
+    """
+    Final score for many candidates at once.
+    
+    Returns:
+        dict: "final_score" array and the scalar "alpha" used
+    """
+    alpha = PROJECT_TYPE_ALPHA.get(project_type, 0.65)
+    capability = np.asarray(capability_scores, dtype=np.float64).reshape(-1)
+    trust = np.asarray(trust_scores, dtype=np.float64).reshape(-1)
+    
+    final_score = (alpha * capability) + ((1.0 - alpha) * trust)
+    
+    return {
+        "final_score": _round(np.minimum(1.0, final_score), 4),
+        "alpha": alpha
+    }
+
+def score_candidates_batch(
+    semantic_scores: np.ndarray,
+    skill_scores: np.ndarray,
+    experience_codes: np.ndarray,
+    global_ratings: np.ndarray,
+    completed_projects: np.ndarray,
+    availability_codes: np.ndarray,
+    project_type: str,
+    dropped_projects: Optional[np.ndarray] = None
+) -> Dict:
+    """
+    Score Layer 1, Layer 2 and the final score for a whole candidate set.
+    
+    Semantic scores are taken as given (computed once by the semantic filter),
+    so no cosine similarity is recomputed here.
+    
+    Args:
+        semantic_scores: Cosine similarities from the semantic filter
+        skill_scores: score_skill_match fractions
+        experience_codes: EXPERIENCE_LEVELS codes
+        global_ratings: Global ratings (1-5)
+        completed_projects: Completed project counts
+        availability_codes: AVAILABILITY_LEVELS codes
+        project_type: Type of project
+        dropped_projects: Dropped project counts (default: zeros)
+    
+    Returns:
+        dict: {"capability": {...}, "trust": {...}, "final_score": array, "alpha": float}
+    """
+    if dropped_projects is None:
+        dropped_projects = np.zeros(len(completed_projects), dtype=np.float64)
+    
+    capability = compute_capability_scores_batch(
+        semantic_scores, skill_scores, experience_codes, project_type
+    )
+    trust = compute_trust_scores_batch(
+        global_ratings, completed_projects, dropped_projects, availability_codes
+    )
+    final = compute_final_scores_batch(
+        capability["capability_score"], trust["trust_score"], project_type
+    )
+    
+    return {
+        "capability": capability,
+        "trust": trust,
+        "final_score": final["final_score"],
+        "alpha": final["alpha"]
+    }
+
+# -------- FACET SCORING --------
+
+def compute_facet_similarities(project_embedding: list, facet_tensor) -> np.ndarray:
+    """
+    Cosine similarity of the project to every facet of every candidate,
+    as one tensor contraction.
+    
+    Formula:
+        S[n, f] = Σ_d X̂[n, f, d] · p̂[d]
+    
+    Args:
+        project_embedding: Project embedding (dim,)
+        facet_tensor: Candidate facet embeddings (n, facets, dim)
+    
+    Returns:
+        np.ndarray: (n, facets) similarities; 0 for empty (zero) facets
+    """
+    tensor = np.asarray(facet_tensor, dtype=np.float64)
+    proj_vec = np.asarray(project_embedding, dtype=np.float64).reshape(-1)
+    if tensor.size == 0:
+        return np.zeros(tensor.shape[:2] if tensor.ndim == 3 else (0, 0))
+    
+    proj_norm = np.linalg.norm(proj_vec)
+    norms = np.linalg.norm(tensor, axis=2)
+    dots = np.einsum("nfd,d->nf", tensor, proj_vec)
+    denom = norms * proj_norm
+    return np.where(denom > 0, dots / np.where(denom > 0, denom, 1.0), 0.0)
+
+
+def fuse_facet_similarities(facet_similarities: np.ndarray, facet_tensor, project_type: str) -> np.ndarray:
+    """
+    Weighted facet similarity per candidate.
+    
+    Weights come from FACET_WEIGHTS[project_type] and are renormalized over
+    the facets a candidate actually has, so an empty interests section does
+    not pull the score toward 0.
+    
+    Returns:
+        np.ndarray: (n,) fused semantic scores
+    """
+    weights = np.asarray(FACET_WEIGHTS.get(project_type, FACET_WEIGHTS["hackathon"]), dtype=np.float64)
+    present = np.linalg.norm(np.asarray(facet_tensor, dtype=np.float64), axis=2) > 0
+    effective = present * weights
+    totals = effective.sum(axis=1)
+    fused = (facet_similarities * effective).sum(axis=1)
+    return np.where(totals > 0, fused / np.where(totals > 0, totals, 1.0), 0.0)
+
 # -------- MAIN MATCHING ENGINE --------
 
 def match_users_to_project(project_id: str, top_n: int = 5) -> List[Dict]:
@@ -415,62 +661,66 @@ def match_users_to_project(project_id: str, top_n: int = 5) -> List[Dict]:
         List[Dict]: Top N ranked matches with full score breakdown
     """
     
-    # Load data
-    project_embeddings = load_project_embeddings()
-    user_embeddings = load_user_embeddings()
+    from ratings.services import get_global_rating_data
     
-    if project_id not in project_embeddings:
-        print(f"❌ Project {project_id} not found")
-        return []
-    
-    project_data = project_embeddings[project_id]
-    project_json = load_project_json(project_id)
-    project_embedding = project_data["embedding"]
-    project_type = project_json.get("project_type", "hackathon")
-    required_skills = project_json.get("required_skills", [])
-    
-    matches = []
-    
-    print(f"\n{'='*90}")
-    print(f"TWO-LAYER MATCHING ENGINE - ROBUST COLLABORATION MATCHING")
-    print(f"{'='*90}")
-    print(f"Project: {project_id}")
-    print(f"Title: {project_data['title']}")
-    print(f"Type: {project_type} | Required Skills: {', '.join(required_skills)}")
-    print(f"{'='*90}\n")
-    
-    # -------- PHASE 1: SEMANTIC RELEVANCE FILTER --------
-    print("PHASE 1: SEMANTIC RELEVANCE FILTER")
-    print("Thresholds:")
-    print(f"  • < 0.30: Unrelated (REJECT)")
-    print(f"  • 0.35-0.55: Meaningful alignment (PASS)")
-    print(f"  • > 0.55: Strong match (PASS)\n")
-    
-    phase1_passes = []
-    
-    for user_id, user_data in user_embeddings.items():
-        user_embedding = user_data["embedding"]
-        resume_file = user_data.get("resume_file", user_id)
+    # Load data: one matrix read for all users, JSON only for those that pass
+    with EmbeddingStore(STORE_DIR) as store:
+        project_data = store.get_project(project_id)
         
-        # Apply semantic filter
-        passes_filter, similarity, interpretation = semantic_relevance_filter(
-            project_embedding, user_embedding
-        )
+        if project_data is None:
+            print(f"❌ Project {project_id} not found")
+            return []
+        
+        user_ids, user_matrix = store.user_matrix()
+        
+        project_json = project_data["project_json"]
+        project_embedding = project_data["embedding"]
+        project_type = project_json.get("project_type", "hackathon")
+        required_skills = project_json.get("required_skills", [])
+        
+        matches = []
+        
+        print(f"\n{'='*90}")
+        print(f"TWO-LAYER MATCHING ENGINE - ROBUST COLLABORATION MATCHING")
+        print(f"{'='*90}")
+        print(f"Project: {project_id}")
+        print(f"Title: {project_data['title']}")
+        print(f"Type: {project_type} | Required Skills: {', '.join(required_skills)}")
+        print(f"{'='*90}\n")
+        
+        # -------- PHASE 1: SEMANTIC RELEVANCE FILTER --------
+        print("PHASE 1: SEMANTIC RELEVANCE FILTER")
+        print("Thresholds:")
+        print(f"  • < 0.30: Unrelated (REJECT)")
+        print(f"  • 0.35-0.55: Meaningful alignment (PASS)")
+        print(f"  • > 0.55: Strong match (PASS)\n")
+        
+        phase1_passes = []
+        similarities = compute_semantic_similarities(project_embedding, user_matrix)
+        
+        for row, (user_id, similarity) in enumerate(zip(user_ids, similarities)):
+            similarity = float(similarity)
+            passes_filter, interpretation = classify_semantic_similarity(similarity)
+            
+            if passes_filter:
+                phase1_passes.append({
+                    "user_id": user_id,
+                    "semantic_score": similarity,
+                    "interpretation": interpretation,
+                    "embedding": user_matrix[row]
+                })
+                print(f"  ✓ {user_id:<20} {similarity:.4f} ({interpretation})")
+            else:
+                print(f"  ✗ {user_id:<20} {similarity:.4f} ({interpretation})")
+        
+        print(f"\nPhase 1 Result: {len(phase1_passes)} / {len(user_ids)} users passed\n")
         
-        if passes_filter:
-            phase1_passes.append({
-                "user_id": user_id,
-                "resume_file": resume_file,
-                "semantic_score": similarity,
-                "interpretation": interpretation,
-                "user_data": user_data,
-                "user_json": load_user_json(resume_file)
-            })
-            print(f"  ✓ {user_id:<20} {similarity:.4f} ({interpretation})")
-        else:
-            print(f"  ✗ {user_id:<20} {similarity:.4f} ({interpretation})")
-    
-    print(f"\nPhase 1 Result: {len(phase1_passes)} / {len(user_embeddings)} users passed\n")
+        # Resume JSONs of the survivors in one query
+        user_records = store.get_users([c["user_id"] for c in phase1_passes])
+        for candidate in phase1_passes:
+            record = user_records.get(candidate["user_id"], {})
+            candidate["resume_file"] = record.get("resume_file", candidate["user_id"])
+            candidate["user_json"] = record.get("resume_json", {})
     
     if not phase1_passes:
         print("⚠️  No users passed semantic relevance filter")
@@ -494,11 +744,12 @@ def match_users_to_project(project_id: str, top_n: int = 5) -> List[Dict]:
         # -------- LAYER 1: CAPABILITY AND ALIGNMENT --------
         capability_data = compute_capability_score(
             project_embedding,
-            candidate["user_data"]["embedding"],
+            candidate["embedding"],
             project_type,
             required_skills,
             skills,
-            experience.get("overall", "beginner")
+            experience.get("overall", "beginner"),
+            semantic_score=candidate["semantic_score"]
         )
         
         # -------- LAYER 2: TRUST AND EXECUTION --------
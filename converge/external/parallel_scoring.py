@@ -0,0 +1,327 @@
+import atexit
+import heapq
+import multiprocessing
+import os
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from external.match_users_to_projects import (
+    encode_availability_levels,
+    encode_experience_levels,
+    score_candidates_batch,
+    semantic_gate_batch,
+)
+
+# -------- CONFIG --------
+
+# Below this many resumes the whole corpus is scored in-process; process
+# fan-out and result merging cost more than they save on small corpora
+PARALLEL_MIN_ROWS = 20000
+
+# Worker processes in the persistent pool
+PARALLEL_WORKERS = max(1, min(8, (os.cpu_count() or 1)))
+
+# Rows per task; several shards per worker keeps the pool balanced
+SHARD_ROWS = 25000
+
+# Per-row arrays of a ScoringCorpus, all placed in shared memory
+_FIELDS = (
+    "resume_ids",       # int64 (n,)
+    "units",            # float64 (n, dim) unit-normalized embeddings
+    "experience",       # int64 (n,) EXPERIENCE_LEVELS codes
+    "availability",     # int64 (n,) AVAILABILITY_LEVELS codes
+    "completed",        # float64 (n,) completed projects
+    "skill_offsets",    # int64 (n + 1,) CSR offsets into skill_ids
+    "skill_ids",        # int32 (nnz,) distinct lower-cased skills per resume
+)
+
+# -------- SHARED CORPUS --------
+
+class ScoringCorpus:
+    """
+    Everything the gate and Layer 1 / Layer 2 need per resume, laid out as
+    flat arrays in multiprocessing.shared_memory. Workers attach to the
+    blocks by name, so a request ships only the project vector, a few
+    scalars and each shard's slice of the ratings; no embedding bytes are
+    copied per request.
+
+    Global ratings change far more often than embeddings, so they live in a
+    plain array (`global_rating`) that update_ratings() swaps without
+    touching the shared blocks.
+
+    Requests hold the corpus between acquire() and release(); unlink() only
+    removes the blocks once no request holds it, so workers that have not
+    attached yet can still find them by name.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], skill_vocab: Dict[str, int], global_rating: np.ndarray, version=None):
+        self.version = version
+        self.skill_vocab = skill_vocab
+        self.size = len(arrays["resume_ids"])
+        self.update_ratings(global_rating)
+        self._lock = threading.Lock()
+        self._users = 0
+        self._retired = False
+        self._blocks = {}
+        self.spec = {"fields": {}}
+        for field in _FIELDS:
+            array = np.ascontiguousarray(arrays[field])
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            view = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+            view[...] = array
+            self._blocks[field] = block
+            self.spec["fields"][field] = (block.name, array.shape, array.dtype.str)
+        self.arrays = {
+            field: np.ndarray(shape, dtype=dtype, buffer=self._blocks[field].buf)
+            for field, (_, shape, dtype) in self.spec["fields"].items()
+        }
+        # Unlinked on unlink(), garbage collection or interpreter exit, whichever comes first
+        self._finalizer = weakref.finalize(self, _unlink_blocks, list(self._blocks.values()))
+
+    @classmethod
+    def from_records(cls, records: List[Dict], version=None) -> "ScoringCorpus":
+        """
+        Args:
+            records: [{"resume_id", "embedding", "resume_json", "global_rating"}, ...]
+        """
+        skill_vocab: Dict[str, int] = {}
+        offsets, skill_ids = [0], []
+        experience, availability, completed = [], [], []
+        for record in records:
+            user_json = record.get("resume_json") or {}
+            skills = set()
+            for skill_list in (user_json.get("skills") or {}).values():
+                if isinstance(skill_list, list):
+                    skills.update(s.lower() for s in skill_list if isinstance(s, str))
+            skill_ids.extend(skill_vocab.setdefault(s, len(skill_vocab)) for s in skills)
+            offsets.append(len(skill_ids))
+            experience.append((user_json.get("experience_level") or {}).get("overall", "beginner"))
+            availability.append((user_json.get("profile") or {}).get("availability", "medium"))
+            completed.append((user_json.get("reputation_signals") or {}).get("completed_projects", 0))
+
+        matrix = np.asarray([r["embedding"] for r in records], dtype=np.float64)
+        if not len(records):
+            matrix = matrix.reshape(0, 0)
+        norms = np.sqrt(np.einsum("ij,ij->i", matrix, matrix))
+        norms[norms == 0.0] = 1.0
+
+        return cls({
+            "resume_ids": np.asarray([r["resume_id"] for r in records], dtype=np.int64),
+            "units": matrix / norms[:, None],
+            "experience": encode_experience_levels(experience),
+            "availability": encode_availability_levels(availability),
+            "completed": np.asarray(completed, dtype=np.float64),
+            "skill_offsets": np.asarray(offsets, dtype=np.int64),
+            "skill_ids": np.asarray(skill_ids, dtype=np.int32),
+        }, skill_vocab, np.asarray([r["global_rating"] for r in records], dtype=np.float64), version)
+
+    def update_ratings(self, global_rating: np.ndarray):
+        """Replace the per-row global ratings; calls already running keep the array they started with."""
+        global_rating = np.asarray(global_rating, dtype=np.float64)
+        if global_rating.shape != (self.size,):
+            raise ValueError(f"expected {self.size} ratings, got shape {global_rating.shape}")
+        self.global_rating = global_rating
+
+    def acquire(self) -> "ScoringCorpus":
+        """Hold the shared blocks for one request (pair with release())."""
+        with self._lock:
+            self._users += 1
+        return self
+
+    def release(self):
+        with self._lock:
+            self._users -= 1
+            unlink = self._retired and not self._users
+        if unlink:
+            self._finalizer()
+
+    def unlink(self):
+        """
+        Remove the shared blocks' names once the last request holding the
+        corpus releases it (immediately when none does). Workers attach by
+        name, so unlinking earlier would fail in-flight shards that have not
+        attached yet.
+        """
+        with self._lock:
+            self._retired = True
+            unlink = not self._users
+        if unlink:
+            self._finalizer()
+
+
+def _unlink_blocks(blocks):
+    for block in blocks:
+        try:
+            block.unlink()
+        except FileNotFoundError:
+            pass
+
+# -------- WORKER SIDE --------
+
+_attached = {"names": None, "blocks": [], "arrays": None}
+
+
+def _attach(spec: Dict) -> Dict[str, np.ndarray]:
+    """Map the corpus' shared blocks into this worker, once per corpus."""
+    names = tuple(name for name, _, _ in spec["fields"].values())
+    if _attached["names"] != names:
+        for block in _attached["blocks"]:
+            block.close()
+        blocks, arrays = [], {}
+        for field, (name, shape, dtype) in spec["fields"].items():
+            # Spawned workers share the parent's resource tracker, so attaching
+            # here does not hand ownership (or the unlink) to the worker
+            block = shared_memory.SharedMemory(name=name)
+            blocks.append(block)
+            arrays[field] = np.ndarray(tuple(shape), dtype=np.dtype(dtype), buffer=block.buf)
+        _attached.update(names=names, blocks=blocks, arrays=arrays)
+    return _attached["arrays"]
+
+
+def score_shard(spec: Dict, start: int, stop: int, query: Dict, global_rating: np.ndarray, arrays: Optional[Dict] = None) -> Dict:
+    """
+    Gate plus Layer 1 / Layer 2 for rows [start, stop) of the corpus;
+    `global_rating` holds the ratings of those rows.
+
+    Returns the shard's pass count, its top-K passes by final score as
+    (final, row, semantic) and its top-N rows by semantic score (for the
+    strict-gate fallback) as (semantic, row).
+    """
+    arrays = arrays if arrays is not None else _attach(spec)
+    units = arrays["units"][start:stop]
+    sims = (query["proj_unit"] @ units.T)[0] if len(units) else np.zeros(0)
+
+    # Strict-gate fallback candidates (ties toward lower rows, like the exact path)
+    fallback_n = min(query["fallback_n"], len(sims))
+    fallback_rows = np.argsort(-sims, kind="stable")[:fallback_n]
+    fallback = [(float(sims[i]), start + int(i)) for i in fallback_rows]
+
+    rows = np.flatnonzero(semantic_gate_batch(sims))
+    if not len(rows):
+        return {"passed": 0, "top": [], "fallback": fallback}
+
+    # Skill match: |required ∩ skills| / |required| from the CSR skill ids
+    required_ids = query["required_ids"]
+    if query["required_count"]:
+        offsets = arrays["skill_offsets"][start:stop + 1]
+        ids = arrays["skill_ids"][offsets[0]:offsets[-1]]
+        hits = np.concatenate(([0], np.cumsum(np.isin(ids, required_ids))))
+        local = offsets - offsets[0]
+        skill_scores = np.minimum(1.0, (hits[local[1:]] - hits[local[:-1]]) / query["required_count"])[rows]
+    else:
+        skill_scores = np.ones(len(rows))
+
+    absolute = start + rows
+    scores = score_candidates_batch(
+        sims[rows],
+        skill_scores,
+        arrays["experience"][absolute],
+        global_rating[rows],
+        arrays["completed"][absolute],
+        arrays["availability"][absolute],
+        query["project_type"],
+    )
+    final = scores["final_score"]
+
+    k = min(query["top_k"], len(rows))
+    best = np.argpartition(-final, k - 1)[:k] if k < len(rows) else np.arange(len(rows))
+    top = [(float(final[i]), int(absolute[i]), float(sims[rows[i]])) for i in best]
+    return {"passed": len(rows), "top": top, "fallback": fallback}
+
+# -------- POOL + MERGE --------
+
+_pool_lock = threading.Lock()
+_pool = None
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Persistent worker pool (spawned once per process, reused across requests)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=PARALLEL_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+@atexit.register
+def _shutdown_pool():
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+
+
+def parallel_top_k(
+    corpus: ScoringCorpus,
+    project_embedding: list,
+    required_skills: List[str],
+    project_type: str,
+    top_k: int,
+    fallback_n: int
+) -> Dict:
+    """
+    Best `top_k` gated candidates by final score over the whole corpus.
+
+    Shards run on the persistent pool when the corpus has at least
+    PARALLEL_MIN_ROWS rows, otherwise in this process; per-shard top-K
+    lists are merged with a heap. The caller holds the corpus (acquire()
+    / release()) for the duration of the call.
+
+    Returns:
+        dict: {"passes": [(resume_id, semantic_score), ...] best final score
+               first, "passed": total gate passes, "fallback": bool,
+               "shards": int, "parallel": bool}
+    """
+    proj = np.asarray(project_embedding, dtype=np.float64).reshape(1, -1)
+    proj_norm = np.sqrt(np.einsum("ij,ij->i", proj, proj))
+    proj_norm[proj_norm == 0.0] = 1.0
+    required = {s.lower() for s in required_skills}
+    query = {
+        "proj_unit": proj / proj_norm[:, None],
+        "required_ids": np.asarray([corpus.skill_vocab[s] for s in required if s in corpus.skill_vocab], dtype=np.int32),
+        "required_count": len(required),
+        "project_type": project_type,
+        "top_k": max(top_k, 1),
+        "fallback_n": fallback_n,
+    }
+
+    global_rating = corpus.global_rating
+    parallel = corpus.size >= PARALLEL_MIN_ROWS
+    bounds = [(start, min(start + SHARD_ROWS, corpus.size)) for start in range(0, corpus.size, SHARD_ROWS)]
+    if parallel:
+        pool = get_pool()
+        futures = [
+            pool.submit(score_shard, corpus.spec, start, stop, query, global_rating[start:stop])
+            for start, stop in bounds
+        ]
+        results = [future.result() for future in futures]
+    else:
+        results = [score_shard(corpus.spec, 0, corpus.size, query, global_rating, arrays=corpus.arrays)] if corpus.size else []
+
+    resume_ids = corpus.arrays["resume_ids"]
+    passed = sum(r["passed"] for r in results)
+    if passed:
+        # Highest final score first; ties go to the earlier row, as in the exact path
+        merged = heapq.nsmallest(top_k, (
+            (-final, row, sim) for r in results for final, row, sim in r["top"]
+        ))
+        passes = [(int(resume_ids[row]), sim) for _, row, sim in merged]
+    else:
+        merged = heapq.nsmallest(fallback_n, (
+            (-sim, row) for r in results for sim, row in r["fallback"]
+        ))
+        passes = [(int(resume_ids[row]), -neg_sim) for neg_sim, row in merged]
+
+    return {
+        "passes": passes,
+        "passed": passed,
+        "fallback": not passed,
+        "shards": len(bounds) if parallel else 1,
+        "parallel": parallel,
+    }
@@ -1,26 +1,22 @@
-import os
 import json
 import re
+import threading
 import time
-from google import genai
+from external.genai_client import DEFAULT_PARSER_MODEL, get_genai_client, get_parser_model
 
 # ---------------- CONFIG ---------------- #
 
-MODEL_NAME = "models/gemma-3-12b-it"
+MODEL_NAME = DEFAULT_PARSER_MODEL  # default; settings.RESUME_PARSER_MODEL overrides
 MAX_RETRIES = 3
 RETRY_DELAY = 2  # seconds
+SECTION_RETRIES = 1  # re-request rounds for sections that fail validation
+MAX_OUTPUT_TOKENS = 2048
 
 INPUT_FILE = "RESUME_UJJWALCHORARIA.txt"
 OUTPUT_FILE = "resume_json.json"
 
 # ---------------- GEMINI SETUP ---------------- #
-
-API_KEY = os.getenv("GEMINI_API_KEY")
-if not API_KEY:
-    raise EnvironmentError("❌ GEMINI_API_KEY not set in environment")
-
-# New google-genai client
-CLIENT = genai.Client(api_key=API_KEY)
+# Shared google-genai client, built on the first parse (external.genai_client)
 
 # ---------------- SCHEMA ---------------- #
 
@@ -103,9 +99,165 @@ RESUME_SCHEMA = {
 
 }
 
+# ---------------- RESPONSE SCHEMA ---------------- #
+# Compact Gemini response schema (OpenAPI subset) for the parsed sections,
+# used both as `response_schema` in JSON mode and by validate_resume().
+# "embeddings" holds ids assigned later, so it is never requested.
+
+def _obj(properties):
+    return {"type": "OBJECT", "properties": properties, "required": list(properties)}
+
+def _enum(*values):
+    return {"type": "STRING", "enum": list(values), "nullable": True}
+
+_STR = {"type": "STRING"}
+_STRS = {"type": "ARRAY", "items": _STR}
+_INT = {"type": "INTEGER"}
+_LEVEL = _enum("beginner", "intermediate", "advanced")
+
+RESPONSE_SCHEMA = _obj({
+    "profile": _obj({
+        "user_id": _STR, "name": _STR, "year": _STR, "department": _STR, "institution": _STR,
+        "availability": _enum("low", "medium", "high"),
+    }),
+    "skills": _obj({
+        "programming_languages": _STRS, "frameworks_libraries": _STRS, "tools_platforms": _STRS,
+        "core_cs_concepts": _STRS, "domain_skills": _STRS,
+    }),
+    "experience_level": _obj({
+        "overall": _LEVEL,
+        "by_domain": _obj({"web_dev": _LEVEL, "ml_ai": _LEVEL, "systems": _LEVEL, "security": _LEVEL}),
+    }),
+    "projects": {"type": "ARRAY", "items": _obj({
+        "title": _STR, "description": _STR, "technologies": _STRS, "domain": _STR, "role": _STR,
+        "team_size": _INT, "completion_status": _enum("completed", "ongoing"),
+    })},
+    "interests": _obj({"technical": _STRS, "problem_domains": _STRS, "learning_goals": _STRS}),
+    "collaboration_preferences": _obj({
+        "roles_preferred": _STRS,
+        "project_types": {"type": "ARRAY", "items": _enum("hackathon", "research", "startup", "open_source")},
+        "team_size_preference": _STR,
+    }),
+    "open_source": _obj({
+        "experience": _enum("none", "beginner", "active", "maintainer"),
+        "technologies": _STRS,
+        "contributions": _INT,
+    }),
+    "achievements": _obj({"hackathons": _STRS, "certifications": _STRS, "awards": _STRS}),
+    "reputation_signals": _obj({"completed_projects": _INT, "average_rating": {"type": "NUMBER"}, "peer_endorsements": _INT}),
+})
+
+SECTIONS = list(RESPONSE_SCHEMA["properties"])
+
+
+def response_schema(sections) -> dict:
+    """RESPONSE_SCHEMA restricted to `sections`."""
+    return _obj({name: RESPONSE_SCHEMA["properties"][name] for name in sections})
+
+
+def supports_json_mode(model: str) -> bool:
+    """Gemini models accept response_mime_type/response_schema; Gemma models do not."""
+    return "gemma" not in model.lower()
+
+# ---------------- VALIDATOR ---------------- #
+
+def _default(schema):
+    kind = schema["type"]
+    if kind == "OBJECT":
+        return {name: _default(sub) for name, sub in schema["properties"].items()}
+    return {"ARRAY": [], "STRING": "", "INTEGER": 0, "NUMBER": 0.0}[kind]
+
+
+def _check(value, schema):
+    """
+    Validate one value against a schema node, coercing what is unambiguous.
+
+    Missing keys and nulls take the node's default; numbers given as strings
+    and enum values in another case are normalized.
+
+    Returns:
+        (ok, value): ok is False when the value cannot be made to fit
+    """
+    kind = schema["type"]
+    if value is None:
+        return True, _default(schema)
+    if kind == "OBJECT":
+        if not isinstance(value, dict):
+            return False, None
+        result = {}
+        for name, sub in schema["properties"].items():
+            ok, result[name] = _check(value.get(name), sub)
+            if not ok:
+                return False, None
+        return True, result
+    if kind == "ARRAY":
+        if not isinstance(value, list):
+            return False, None
+        result = []
+        for item in value:
+            ok, item = _check(item, schema["items"])
+            if not ok:
+                return False, None
+            result.append(item)
+        return True, result
+    if kind == "STRING":
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = str(value)
+        if not isinstance(value, str):
+            return False, None
+        if "enum" in schema:
+            value = value.strip().lower()
+            return value in schema["enum"] or value == "", value
+        return True, value
+    if isinstance(value, bool):
+        return False, None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return False, None
+    if kind == "INTEGER":
+        return number.is_integer(), int(number) if number.is_integer() else None
+    return True, number
+
+
+def validate_resume(data, sections=None):
+    """
+    Validate parsed sections against RESPONSE_SCHEMA.
+
+    Args:
+        data: Decoded model output (anything; non-dicts fail every section)
+        sections: Section names to check (default: all)
+
+    Returns:
+        (resume, failed): valid sections (failed ones at their defaults) and
+        the names of the sections that failed
+    """
+    data = data if isinstance(data, dict) else {}
+    resume, failed = {}, []
+    for name in sections or SECTIONS:
+        schema = RESPONSE_SCHEMA["properties"][name]
+        ok, value = _check(data.get(name), schema) if name in data else (False, None)
+        if not ok:
+            failed.append(name)
+            value = _default(schema)
+        resume[name] = value
+    return resume, failed
+
 # ---------------- PROMPT BUILDER ---------------- #
 
-def build_prompt(resume_text: str) -> str:
+def build_prompt(resume_text: str, sections=None, json_mode: bool = False) -> str:
+    """
+    Parser prompt for `sections` (default: all). In JSON mode the schema
+    travels as response_schema; otherwise a compact template of the
+    requested sections is appended.
+    """
+    sections = sections or SECTIONS
+    if json_mode:
+        schema_block = ""
+    else:
+        template = {name: RESUME_SCHEMA[name] for name in sections}
+        schema_block = f"\nREQUIRED JSON SCHEMA:\n{json.dumps(template, separators=(',', ':'))}\n"
+    scope = "" if len(sections) == len(SECTIONS) else f"- Return ONLY these sections: {', '.join(sections)}\n"
     return f"""
 You are an expert resume parser.
 
@@ -120,94 +272,155 @@ TASK:
 - No markdown, no explanations, no extra text
 - Extract ONLY information that is explicitly present in the text.
 - DO NOT create synthetic skills, projects, experience levels, or interests.
-
-
-
+{scope}
 RESUME TEXT:
 ----------------
 {resume_text}
 ----------------
+{schema_block}"""
 
-REQUIRED JSON SCHEMA:
-{json.dumps(RESUME_SCHEMA, indent=2)}
-"""
+# ---------------- JSON DECODING ---------------- #
 
-# ---------------- JSON CLEANER ---------------- #
-
-def extract_json(text: str) -> dict:
-    """
-    Extracts the first valid JSON object from model output.
-    Handles cases where LLM adds extra text or malformed JSON.
-    """
-    # Try direct parse
+def _load_json(text: str):
+    """Decode model output; in-prompt mode may need the outermost {...} and trailing commas dropped."""
     try:
         return json.loads(text)
-    except json.JSONDecodeError as e:
-        print(f"[parse_resume] Direct JSON parse failed: {e}")
+    except json.JSONDecodeError:
         pass
+    match = re.search(r"\{.*\}", text or "", re.DOTALL)
+    if match:
+        try:
+            return json.loads(re.sub(r',(\s*[}\]])', r'\1', match.group()))
+        except json.JSONDecodeError:
+            pass
+    return None
 
-    # Extract JSON between first { and last }
-    match = re.search(r"\{.*\}", text, re.DOTALL)
-    if not match:
-        raise ValueError("❌ No JSON object found in LLM response")
+# ---------------- USAGE STATS ---------------- #
+# Process-wide counters, reported by parse_stats()
 
-    json_str = match.group()
-    
-    # Try parsing extracted JSON
-    try:
-        return json.loads(json_str)
-    except json.JSONDecodeError as e:
-        print(f"[parse_resume] Extracted JSON parse failed at char {e.pos}: {e.msg}")
-        
-        # Common fixes for LLM JSON issues
-        # 1. Fix trailing commas
-        json_str = re.sub(r',(\s*[}\]])', r'\1', json_str)
-        
-        # 2. Fix missing commas between items
-        json_str = re.sub(r'(["\d\]}])\s*\n\s*"', r'\1,\n"', json_str)
-        
-        # 3. Fix unescaped quotes in strings (basic)
-        json_str = re.sub(r'(?<!\\)"(?=\s*[^:,}\]])', r'\\"', json_str)
-        
-        try:
-            return json.loads(json_str)
-        except json.JSONDecodeError as e2:
-            # Still failed, return minimal valid structure
-            print(f"[parse_resume] JSON repair failed, returning minimal schema")
-            return RESUME_SCHEMA.copy()
+_stats_lock = threading.Lock()
+_stats = {}
+
+
+def reset_parse_stats():
+    with _stats_lock:
+        _stats.clear()
+        _stats.update(
+            resumes=0, resumes_retried=0, llm_calls=0, call_retries=0, section_requests=0,
+            sections_defaulted=0, prompt_tokens=0, output_tokens=0, total_tokens=0,
+        )
+
+
+reset_parse_stats()
+
+
+def _add_stats(**counts):
+    with _stats_lock:
+        for name, count in counts.items():
+            _stats[name] += count
+
+
+def parse_stats() -> dict:
+    """
+    Counters since start (or reset_parse_stats) plus per-resume rates.
+
+    Returns:
+        dict: the counters, retry_rate (share of resumes that needed any
+        re-request), calls_per_resume and tokens_per_resume
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+    resumes = stats["resumes"] or 1
+    stats["retry_rate"] = round(stats["resumes_retried"] / resumes, 4)
+    stats["calls_per_resume"] = round(stats["llm_calls"] / resumes, 3)
+    stats["tokens_per_resume"] = {
+        "prompt": round(stats["prompt_tokens"] / resumes, 1),
+        "output": round(stats["output_tokens"] / resumes, 1),
+        "total": round(stats["total_tokens"] / resumes, 1),
+    }
+    return stats
 
 # ---------------- PARSER ---------------- #
 
-def parse_resume(resume_text: str) -> dict:
+def _generate(resume_text: str, sections, model: str, usage: dict):
+    """
+    One parse request for `sections`, retrying failed calls (network,
+    quota, empty answers) up to MAX_RETRIES.
+
+    Returns:
+        The decoded JSON, or None when every attempt failed
+    """
+    json_mode = supports_json_mode(model)
+    config = {"temperature": 0, "top_p": 1, "top_k": 1, "max_output_tokens": MAX_OUTPUT_TOKENS}
+    if json_mode:
+        config.update(response_mime_type="application/json", response_schema=response_schema(sections))
+
     for attempt in range(1, MAX_RETRIES + 1):
         try:
-            print(f"[parse_resume] Attempt {attempt}/{MAX_RETRIES}")
-            response = CLIENT.models.generate_content(
-                model=MODEL_NAME,
-                contents=build_prompt(resume_text),
-                config={
-                    "temperature": 0,
-                    "top_p": 1,
-                    "top_k": 1,
-                    "max_output_tokens": 2048,
-                },
+            usage["llm_calls"] += 1
+            response = get_genai_client().models.generate_content(
+                model=model,
+                contents=build_prompt(resume_text, sections, json_mode),
+                config=config,
             )
-
-            response_text = getattr(response, "text", "")
-            print(f"[parse_resume] Response length: {len(response_text)} chars")
-            
-            parsed_json = extract_json(response_text)
-            print(f"[parse_resume] Successfully parsed JSON with {len(parsed_json)} keys")
-            return parsed_json
+            metadata = getattr(response, "usage_metadata", None)
+            if metadata is not None:
+                usage["prompt_tokens"] += metadata.prompt_token_count or 0
+                usage["output_tokens"] += metadata.candidates_token_count or 0
+                usage["total_tokens"] += metadata.total_token_count or 0
+
+            response_text = getattr(response, "text", None) or ""
+            data = _load_json(response_text)
+            if data is None:
+                raise ValueError(f"No JSON object in {len(response_text)}-char response")
+            return data
 
         except Exception as e:
-            print(f"⚠️ Attempt {attempt} failed: {e}")
+            print(f"⚠️ Attempt {attempt}/{MAX_RETRIES} failed: {e}")
             if attempt < MAX_RETRIES:
-                print(f"[parse_resume] Retrying in {RETRY_DELAY}s...")
+                usage["call_retries"] += 1
                 time.sleep(RETRY_DELAY)
-            else:
-                print("❌ All retries exhausted, returning minimal schema")
-                return RESUME_SCHEMA.copy()
+    return None
+
+
+def parse_resume(resume_text: str) -> dict:
+    """
+    Parse resume text into the RESUME_SCHEMA structure.
+
+    The whole resume is requested once (native JSON mode with a compact
+    response schema on Gemini models, the in-prompt schema on Gemma), each
+    section is validated, and only the sections that fail are re-requested,
+    up to SECTION_RETRIES rounds. Sections still invalid after that are
+    returned empty, as is everything when all MAX_RETRIES attempts at the
+    first request fail. Tokens and retries are counted in parse_stats().
+    """
+    model = get_parser_model()
+    usage = {"llm_calls": 0, "call_retries": 0, "prompt_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+
+    data = _generate(resume_text, SECTIONS, model, usage)
+    resume, failed = validate_resume(data)
+    section_requests = 0
+    for _ in range(SECTION_RETRIES):
+        if not failed or data is None:  # no answer at all is not a section failure
+            break
+        print(f"[parse_resume] Re-requesting {len(failed)} invalid section(s): {', '.join(failed)}")
+        section_requests += len(failed)
+        fixed, failed = validate_resume(_generate(resume_text, failed, model, usage), failed)
+        resume.update(fixed)
+
+    if failed:
+        print(f"[parse_resume] Returning empty {', '.join(failed)}")
+    resume["embeddings"] = dict(RESUME_SCHEMA["embeddings"])
+
+    _add_stats(
+        resumes=1,
+        resumes_retried=int(bool(section_requests or usage["call_retries"])),
+        section_requests=section_requests,
+        sections_defaulted=len(failed),
+        **usage,
+    )
+    print(f"[parse_resume] Parsed with {usage['llm_calls']} call(s), {usage['total_tokens']} tokens")
+    return resume
 
 # ---------------- MAIN ---------------- #
 
@@ -222,3 +435,4 @@ if __name__ == "__main__":
 
     print("✅ Resume successfully parsed")
     print(f"📄 Output saved to {OUTPUT_FILE}")
+    print(f"📊 Usage: {json.dumps(parse_stats())}")
@@ -0,0 +1,285 @@
+import numpy as np
+from typing import Callable, Dict, List, Tuple
+
+# -------- CONFIG --------
+
+# Pass threshold of the semantic gate (SEMANTIC_THRESHOLDS["meaningful"][0])
+GATE_THRESHOLD = 0.35
+
+# Rows per block in the first pass; bounds the float32 temporary the int8
+# matmul needs to BLOCK_ROWS x dim instead of the whole corpus
+BLOCK_ROWS = 4096
+
+# -------- QUANTIZATION --------
+
+def quantize_embeddings(embeddings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Symmetric int8 scalar quantization with one scale per vector.
+
+    Formula:
+        scale_i = max|x_i| / 127
+        q_i = round(x_i / scale_i)
+
+    Args:
+        embeddings: (n, dim) float matrix
+
+    Returns:
+        Tuple[int8 codes (n, dim), float32 scales (n,)]
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    scales = np.abs(embeddings).max(axis=1) / 127.0
+    safe_scales = np.where(scales > 0, scales, 1.0)
+    codes = np.rint(embeddings / safe_scales[:, None]).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+class QuantizedEmbeddingMatrix:
+    """
+    Resident int8 copy of an embedding corpus for first-pass cosine similarity.
+
+    Stores 1 byte per dimension plus a float32 scale and norm per row, about
+    8x smaller than a float64 matrix. Every approximate similarity comes with
+    a worst-case error bound, so callers know exactly which rows need an
+    exact re-score to reproduce the exact gate decision.
+    """
+
+    def __init__(self, ids: List, codes: np.ndarray, scales: np.ndarray, norms: np.ndarray):
+        self.ids = list(ids)
+        self.codes = codes
+        self.scales = scales
+        self.norms = norms
+
+    @classmethod
+    def from_embeddings(cls, ids: List, embeddings) -> "QuantizedEmbeddingMatrix":
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if matrix.ndim != 2:
+            matrix = matrix.reshape(len(ids), -1)
+        codes, scales = quantize_embeddings(matrix)
+        norms = np.linalg.norm(matrix, axis=1).astype(np.float32)
+        return cls(ids, codes, scales, norms)
+
+    @classmethod
+    def from_chunks(cls, chunks) -> "QuantizedEmbeddingMatrix":
+        """
+        Build from an iterable of (ids, embeddings) chunks, quantizing each chunk
+        as it arrives so the full-precision corpus is never held at once.
+        """
+        ids, codes, scales, norms = [], [], [], []
+        for chunk_ids, chunk_embeddings in chunks:
+            if not len(chunk_ids):
+                continue
+            part = cls.from_embeddings(chunk_ids, chunk_embeddings)
+            ids.extend(part.ids)
+            codes.append(part.codes)
+            scales.append(part.scales)
+            norms.append(part.norms)
+        if not ids:
+            return cls([], np.zeros((0, 0), dtype=np.int8), np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.float32))
+        return cls(ids, np.vstack(codes), np.concatenate(scales), np.concatenate(norms))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + self.scales.nbytes + self.norms.nbytes
+
+    def similarities(self, query: list) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Approximate cosine similarity of every row to `query`, with error bounds.
+
+        The query stays in float32, so the only error is the rows' rounding
+        (at most scale_i / 2 per component):
+            |sim_i - approx_i| <= 0.5 * scale_i * ||q||_1 / (||x_i|| * ||q||)
+
+        Returns:
+            Tuple[approx similarities (n,), error bounds (n,)]
+        """
+        q = np.asarray(query, dtype=np.float32).reshape(-1)
+        q_norm = float(np.linalg.norm(q))
+        n = len(self.ids)
+        if n == 0 or q_norm == 0:
+            return np.zeros(n, dtype=np.float32), np.zeros(n, dtype=np.float32)
+
+        dots = np.empty(n, dtype=np.float32)
+        for start in range(0, n, BLOCK_ROWS):
+            block = self.codes[start:start + BLOCK_ROWS]
+            dots[start:start + BLOCK_ROWS] = block.astype(np.float32) @ q
+
+        denom = self.norms * q_norm
+        valid = denom > 0
+        safe_denom = np.where(valid, denom, 1.0)
+        approx = np.where(valid, dots * self.scales / safe_denom, 0.0).astype(np.float32)
+        bounds = np.where(valid, 0.5 * self.scales * float(np.abs(q).sum()) / safe_denom, 0.0).astype(np.float32)
+        return approx, bounds
+
+
+# -------- GATE WITH EXACT RE-SCORING --------
+
+def exact_cosine(query: list, vectors: np.ndarray) -> np.ndarray:
+    """Cosine similarity of each row to `query` (0 for zero vectors, like sklearn)."""
+    q = np.asarray(query, dtype=np.float64).reshape(-1)
+    vectors = np.asarray(vectors, dtype=np.float64)
+    if vectors.size == 0:
+        return np.zeros(0)
+    norms = np.linalg.norm(vectors, axis=1) * np.linalg.norm(q)
+    return np.where(norms > 0, (vectors @ q) / np.where(norms > 0, norms, 1.0), 0.0)
+
+
+def quantized_gate(
+    matrix: QuantizedEmbeddingMatrix,
+    query: list,
+    fetch_exact: Callable[[List], Dict],
+    threshold: float = GATE_THRESHOLD,
+    fallback_top_n: int = 0
+) -> Dict:
+    """
+    Semantic gate over the int8 matrix with exact re-scoring of survivors.
+
+    Rows whose approximate score plus error bound stays below the threshold
+    are provably rejected and never leave the int8 matrix. Every other row
+    (the threshold band and the clear passes) is re-scored from its exact
+    vector, so gate decisions and semantic scores equal the exact path.
+    When nothing passes and `fallback_top_n` is set, the exact top-N rows by
+    similarity are returned instead, again re-scoring only rows whose bound
+    reaches the N-th best lower bound.
+
+    Args:
+        matrix: Quantized corpus
+        query: Project embedding
+        fetch_exact: Callback mapping a list of ids to {id: exact vector}
+        threshold: Gate pass threshold
+        fallback_top_n: Size of the top-N fallback (0 disables it)
+
+    Returns:
+        dict: {"passes": [(id, similarity), ...] best first, "fallback": bool,
+               "rescored": rows re-scored exactly, "scanned": rows in the matrix}
+    """
+    approx, bounds = matrix.similarities(query)
+    candidates = np.flatnonzero(approx + bounds >= threshold)
+    scored = _rescore(matrix, query, fetch_exact, candidates)
+    passes = [(rid, sim) for rid, sim in scored if sim >= threshold]
+    rescored = len(scored)
+    fallback = False
+
+    if not passes and fallback_top_n > 0 and len(matrix) > 0:
+        fallback = True
+        k = min(fallback_top_n, len(matrix))
+        lower = approx - bounds
+        kth_lower = np.partition(lower, len(lower) - k)[len(lower) - k]
+        candidates = np.flatnonzero(approx + bounds >= kth_lower)
+        scored = _rescore(matrix, query, fetch_exact, candidates)
+        rescored += len(scored)
+        passes = scored[:k]
+
+    return {
+        "passes": passes,
+        "fallback": fallback,
+        "rescored": rescored,
+        "scanned": len(matrix),
+    }
+
+
+def _rescore(matrix: QuantizedEmbeddingMatrix, query: list, fetch_exact: Callable, rows: np.ndarray) -> List[Tuple]:
+    """Exact similarities for the given matrix rows, best first."""
+    if len(rows) == 0:
+        return []
+    ids = [matrix.ids[i] for i in rows]
+    exact_vectors = fetch_exact(ids)
+    ids = [rid for rid in ids if rid in exact_vectors]
+    sims = exact_cosine(query, np.array([exact_vectors[rid] for rid in ids], dtype=np.float64)) if ids else []
+    scored = [(rid, float(sim)) for rid, sim in zip(ids, sims)]
+    scored.sort(key=lambda item: item[1], reverse=True)
+    return scored
+
+
+# -------- MEASUREMENT --------
+
+def measure_quantization_agreement(
+    embeddings: np.ndarray,
+    queries: np.ndarray,
+    threshold: float = GATE_THRESHOLD,
+    k: int = 10
+) -> Dict:
+    """
+    Compare the int8 first pass (and the re-scored gate) with exact cosine.
+
+    Reports, averaged over `queries`:
+      - recall_at_k: overlap of the approximate and exact top-k
+      - first_pass_gate_agreement: share of rows where the approximate score
+        alone gives the same gate decision as the exact score
+      - gate_agreement: the same after band re-scoring (expected 1.0)
+      - rescored_fraction: share of rows that needed an exact re-score
+      - max_abs_error / bound_violations: observed error vs. the guarantee
+      - memory: bytes of float64, float32 and int8 representations
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float64)
+    ids = list(range(len(embeddings)))
+    matrix = QuantizedEmbeddingMatrix.from_embeddings(ids, embeddings)
+
+    def fetch_exact(wanted):
+        return {i: embeddings[i] for i in wanted}
+
+    recalls, first_pass, final, rescored, max_error, violations = [], [], [], [], 0.0, 0
+    for query in np.atleast_2d(queries):
+        exact = exact_cosine(query, embeddings)
+        approx, bounds = matrix.similarities(query)
+        errors = np.abs(exact - approx)
+        max_error = max(max_error, float(errors.max()))
+        violations += int((errors > bounds + 1e-6).sum())
+
+        top = min(k, len(ids))
+        exact_top = set(np.argsort(-exact)[:top])
+        approx_top = set(np.argsort(-approx)[:top])
+        recalls.append(len(exact_top & approx_top) / max(top, 1))
+
+        exact_pass = exact >= threshold
+        first_pass.append(float(np.mean((approx >= threshold) == exact_pass)))
+
+        gate = quantized_gate(matrix, query, fetch_exact, threshold)
+        gated = np.zeros(len(ids), dtype=bool)
+        gated[[rid for rid, _ in gate["passes"]]] = True
+        final.append(float(np.mean(gated == exact_pass)))
+        rescored.append(gate["rescored"] / max(len(ids), 1))
+
+    return {
+        "corpus_size": len(ids),
+        "queries": len(recalls),
+        "recall_at_k": round(float(np.mean(recalls)), 4),
+        "k": k,
+        "first_pass_gate_agreement": round(float(np.mean(first_pass)), 6),
+        "gate_agreement": round(float(np.mean(final)), 6),
+        "rescored_fraction": round(float(np.mean(rescored)), 4),
+        "max_abs_error": round(max_error, 6),
+        "bound_violations": violations,
+        "memory": {
+            "float64_bytes": embeddings.size * 8,
+            "float32_bytes": embeddings.size * 4,
+            "int8_bytes": matrix.nbytes,
+        },
+    }
+
+
+# -------- RUNNER --------
+if __name__ == "__main__":
+    import json
+    import os
+    import sys
+
+    from embedding_store import EmbeddingStore, STORE_DIR
+
+    # Measure on the offline pipeline's embeddings when present, else on a synthetic corpus
+    if os.path.isdir(STORE_DIR):
+        with EmbeddingStore(STORE_DIR) as store:
+            corpus = np.asarray(store.user_matrix()[1], dtype=np.float64)
+            queries = np.asarray(store.project_matrix()[1], dtype=np.float64)
+    if not os.path.isdir(STORE_DIR) or not len(corpus) or not len(queries):
+        n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+        rng = np.random.default_rng(0)
+        topic = rng.normal(size=768)
+        corpus = topic * rng.uniform(0, 1.5, size=(n, 1)) + rng.normal(size=(n, 768))
+        queries = topic + 0.5 * rng.normal(size=(20, 768))
+        print(f"No embedding files found; using a synthetic corpus of {n} vectors")
+
+    report = measure_quantization_agreement(corpus, queries)
+    print(json.dumps(report, indent=2))
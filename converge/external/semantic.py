@@ -1,4 +1,32 @@
+# Facets embedded separately (RESUME_SCHEMA's skill/project/interest embedding ids)
+FACETS = ("skills", "projects", "interests")
+
+
 def build_semantic_text(resume_json: dict) -> str:
+    sections = _skill_sections(resume_json) + _project_sections(resume_json) + _interest_sections(resume_json)
+
+    # -------- EXPERIENCE ORIENTATION (soft signal) --------
+    sections.extend(_experience_sections(resume_json))
+
+    # -------- FINAL SEMANTIC TEXT --------
+    return "\n\n".join(sections)
+
+
+def build_facet_texts(resume_json: dict) -> dict:
+    """
+    One text per facet, so a long project list cannot drown out the skills.
+    Experience orientation goes with the projects it comes from.
+
+    Returns: {"skills": str, "projects": str, "interests": str} (empty when absent)
+    """
+    return {
+        "skills": "\n\n".join(_skill_sections(resume_json)),
+        "projects": "\n\n".join(_project_sections(resume_json) + _experience_sections(resume_json)),
+        "interests": "\n\n".join(_interest_sections(resume_json)),
+    }
+
+
+def _skill_sections(resume_json: dict) -> list:
     sections = []
 
     # -------- SKILLS --------
@@ -25,6 +53,12 @@ def build_semantic_text(resume_json: dict) -> str:
             "CORE COMPUTER SCIENCE:\n" + ", ".join(sorted(set(core_cs)))
         )
 
+    return sections
+
+
+def _project_sections(resume_json: dict) -> list:
+    sections = []
+
     # -------- PROJECT EXPERIENCE --------
     projects = resume_json.get("projects", [])
     project_descriptions = []
@@ -55,6 +89,12 @@ def build_semantic_text(resume_json: dict) -> str:
             "PROJECT EXPERIENCE:\n" + "\n".join(project_descriptions)
         )
 
+    return sections
+
+
+def _interest_sections(resume_json: dict) -> list:
+    sections = []
+
     # -------- INTERESTS --------
     interests = resume_json.get("interests", {})
     interest_items = []
@@ -67,16 +107,15 @@ def build_semantic_text(resume_json: dict) -> str:
             "INTERESTS AND LEARNING GOALS:\n" + ", ".join(sorted(set(interest_items)))
         )
 
-    # -------- EXPERIENCE ORIENTATION (soft signal) --------
-    experience = resume_json.get("experience_level", {}).get("by_domain", {})
-    if experience:
-        exp_phrases = [
-            f"{level} experience in {domain.replace('_', ' ')}"
-            for domain, level in experience.items()
-        ]
-        sections.append(
-            "EXPERIENCE ORIENTATION:\n" + ", ".join(exp_phrases)
-        )
+    return sections
 
-    # -------- FINAL SEMANTIC TEXT --------
-    return "\n\n".join(sections)
+
+def _experience_sections(resume_json: dict) -> list:
+    experience = resume_json.get("experience_level", {}).get("by_domain", {})
+    if not experience:
+        return []
+    exp_phrases = [
+        f"{level} experience in {domain.replace('_', ' ')}"
+        for domain, level in experience.items()
+    ]
+    return ["EXPERIENCE ORIENTATION:\n" + ", ".join(exp_phrases)]
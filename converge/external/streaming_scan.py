@@ -0,0 +1,83 @@
+import heapq
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from external.match_users_to_projects import compute_semantic_similarities, semantic_gate_batch
+
+# -------- STREAMING TOP-K --------
+
+def _push_top(heap: List, k: int, entries: Iterable[Tuple[float, int, int]]):
+    """Keep the k largest (similarity, -position, id) entries in a min-heap."""
+    if k <= 0:
+        return
+    for entry in entries:
+        if len(heap) < k:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+
+
+def _chunk_best(sims: np.ndarray, rows: np.ndarray, k: int) -> np.ndarray:
+    """The (at most) k rows with the highest similarity, ties to the earlier row."""
+    if len(rows) <= k:
+        return rows
+    return rows[np.argsort(-sims[rows], kind="stable")[:k]]
+
+
+def streaming_semantic_top_k(
+    project_embedding: list,
+    chunks: Iterable[Tuple[List[int], List[list]]],
+    k: int,
+    fallback_n: int
+) -> Dict:
+    """
+    Semantic gate over a stream of embedding chunks in bounded memory.
+
+    Each chunk is scored as one NumPy block and then dropped; only a top-k
+    heap of gate passes and, until the first pass is seen, a top-fallback_n
+    heap of all rows survive between chunks. Peak memory is one chunk plus
+    O(k + fallback_n) entries however large the corpus is.
+
+    Args:
+        project_embedding: Project embedding vector
+        chunks: (resume_ids, embeddings) chunks in scan order
+        k: Gate passes to keep (by semantic score)
+        fallback_n: Rows to keep by semantic score in case nobody passes
+
+    Returns:
+        dict: {"passes": [(resume_id, semantic_score), ...] in scan order
+               (best first for the fallback), "passed": total gate passes,
+               "fallback": True when nobody passed and passes holds the
+               top fallback_n rows instead, "scanned": rows scored}
+    """
+    pass_heap, fallback_heap = [], []
+    passed = scanned = 0
+
+    for resume_ids, embeddings in chunks:
+        sims = compute_semantic_similarities(project_embedding, embeddings)
+        rows = np.flatnonzero(semantic_gate_batch(sims))
+        passed += len(rows)
+        if len(rows):
+            _push_top(pass_heap, k, (
+                (float(sims[i]), -(scanned + int(i)), resume_ids[i]) for i in _chunk_best(sims, rows, k)
+            ))
+        elif not passed:
+            _push_top(fallback_heap, fallback_n, (
+                (float(sims[i]), -(scanned + int(i)), resume_ids[i])
+                for i in _chunk_best(sims, np.arange(len(sims)), fallback_n)
+            ))
+        scanned += len(sims)
+
+    # Passes in scan order, as the exact path hands them to Phase 2 (so final
+    # score ties break the same way); the fallback best first, as there
+    if passed:
+        ranked = sorted(pass_heap, key=lambda entry: -entry[1])
+    else:
+        ranked = sorted(fallback_heap, reverse=True)
+    return {
+        "passes": [(resume_id, sim) for sim, _, resume_id in ranked],
+        "passed": passed,
+        "fallback": not passed,
+        "scanned": scanned,
+    }
@@ -0,0 +1,156 @@
+import heapq
+from typing import Dict, List, Tuple
+
+# -------- CONFIG --------
+
+# Objective weights: share of required skills covered by the team vs. the
+# members' mean final score (both in 0-1)
+TEAM_WEIGHTS = {
+    "coverage": 0.6,
+    "score": 0.4
+}
+
+# Candidates scored when nobody passes the semantic gate
+TEAM_FALLBACK_POOL = 50
+
+# -------- SKILL BITSETS --------
+
+def normalize_required_skills(required_skills: List[str]) -> List[str]:
+    """Lower-cased required skills, de-duplicated, in first-seen order (bit order)."""
+    return list(dict.fromkeys(s.lower() for s in required_skills))
+
+
+def skill_bitset(required: List[str], user_skills: Dict[str, list]) -> int:
+    """
+    Bitset of the required skills a user has (bit i = required[i]),
+    using the same case-insensitive exact match as score_skill_match.
+    """
+    all_user_skills = set()
+    for skill_list in user_skills.values():
+        if isinstance(skill_list, list):
+            all_user_skills.update(s.lower() for s in skill_list if isinstance(s, str))
+
+    bits = 0
+    for i, skill in enumerate(required):
+        if skill in all_user_skills:
+            bits |= 1 << i
+    return bits
+
+
+def bitset_skills(required: List[str], bits: int) -> List[str]:
+    return [skill for i, skill in enumerate(required) if bits >> i & 1]
+
+# -------- LAZY GREEDY --------
+
+def select_team(
+    bitsets: List[int],
+    final_scores: List[float],
+    required_count: int,
+    size: int
+) -> Tuple[List[Dict], Dict]:
+    """
+    Pick `size` candidates maximizing the monotone submodular objective
+        F(T) = w_c · |∪ bits_i| / |R| + w_s · Σ final_i / size
+    with lazy greedy: marginal gains only shrink as the team grows, so a
+    stale gain is an upper bound and a candidate is re-evaluated only when
+    it reaches the top of the heap. Greedy is within (1 - 1/e) of optimal.
+
+    Args:
+        bitsets: Required-skill bitset per candidate
+        final_scores: Final match score per candidate
+        required_count: |R| (0 means only the score term counts)
+        size: Team size
+
+    Returns:
+        Tuple[picks, summary]; picks are {"index", "marginal_gain",
+        "coverage_gain", "score_gain", "new_bits"} in selection order
+    """
+    size = min(size, len(bitsets))
+    w_cov = TEAM_WEIGHTS["coverage"] if required_count else 0.0
+    w_score = TEAM_WEIGHTS["score"] if required_count else 1.0
+
+    def gains(i, covered):
+        new_bits = bitsets[i] & ~covered
+        coverage_gain = w_cov * new_bits.bit_count() / required_count if required_count else 0.0
+        score_gain = w_score * final_scores[i] / size
+        return coverage_gain + score_gain, coverage_gain, score_gain, new_bits
+
+    covered = 0
+    # (-gain, index, team size when the gain was computed); index breaks ties toward better-ranked candidates
+    heap = [(-gains(i, 0)[0], i, 0) for i in range(len(bitsets))]
+    heapq.heapify(heap)
+    picks, evaluations = [], len(heap)
+
+    while heap and len(picks) < size:
+        neg_gain, i, stamp = heapq.heappop(heap)
+        if stamp == len(picks):
+            # Gain is current, and every other bound is no larger: take it
+            gain, coverage_gain, score_gain, new_bits = gains(i, covered)
+            covered |= new_bits
+            picks.append({
+                "index": i,
+                "marginal_gain": gain,
+                "coverage_gain": coverage_gain,
+                "score_gain": score_gain,
+                "new_bits": new_bits,
+            })
+            continue
+        evaluations += 1
+        heapq.heappush(heap, (-gains(i, covered)[0], i, len(picks)))
+
+    return picks, {
+        "covered_bits": covered,
+        "objective": sum(p["marginal_gain"] for p in picks),
+        "evaluations": evaluations,
+    }
+
+
+def form_team(
+    candidates: List[Dict],
+    required_skills: List[str],
+    size: int
+) -> Dict:
+    """
+    Complementary team from scored candidates.
+
+    Args:
+        candidates: [{"resume_id", "final_score", "skills"}, ...] best first
+        required_skills: Project's required skills
+        size: Team size
+
+    Returns:
+        dict: {"members": [...], "covered_skills", "missing_skills",
+               "coverage", "objective", "evaluations", "weights"}
+    """
+    required = normalize_required_skills(required_skills)
+    bitsets = [skill_bitset(required, c.get("skills") or {}) for c in candidates]
+    final_scores = [float(c["final_score"]) for c in candidates]
+
+    picks, summary = select_team(bitsets, final_scores, len(required), size)
+
+    members = []
+    for order, pick in enumerate(picks, 1):
+        c = candidates[pick["index"]]
+        members.append({
+            "pick": order,
+            "resume_id": c["resume_id"],
+            "final_score": final_scores[pick["index"]],
+            "skills_covered": bitset_skills(required, bitsets[pick["index"]]),
+            "explanation": {
+                "marginal_gain": round(pick["marginal_gain"], 4),
+                "coverage_gain": round(pick["coverage_gain"], 4),
+                "score_gain": round(pick["score_gain"], 4),
+                "new_skills": bitset_skills(required, pick["new_bits"]),
+            },
+        })
+
+    covered = summary["covered_bits"]
+    return {
+        "members": members,
+        "covered_skills": bitset_skills(required, covered),
+        "missing_skills": bitset_skills(required, ~covered & ((1 << len(required)) - 1)),
+        "coverage": round(covered.bit_count() / len(required), 4) if required else 1.0,
+        "objective": round(summary["objective"], 4),
+        "evaluations": summary["evaluations"],
+        "weights": dict(TEAM_WEIGHTS),
+    }
@@ -1,9 +1,13 @@
-import json
 from cluster_users import cluster_users
+from embedding_store import EmbeddingStore
 
 # Load embeddings
-with open("user_embeddings.json") as f:
-    user_records = json.load(f)
+with EmbeddingStore() as store:
+    user_ids, embeddings = store.user_matrix()
+user_records = [
+    {"user_id": user_id, "embedding": embedding}
+    for user_id, embedding in zip(user_ids, embeddings)
+]
 
 cluster_map, centroids = cluster_users(user_records)
 
@@ -7,25 +7,18 @@ echo "COLLABORATOR MATCHING SYSTEM - TEST SCRIPT"
 echo "==============================================="
 echo ""
 
-# Check if project_embeddings.json exists
-if [ ! -f "project_embeddings.json" ]; then
-    echo "❌ project_embeddings.json not found"
-    echo "Please run: python3 process_project.py or python3 batch_process_projects.py projects/"
+# Check if the embedding store exists (import old JSON files with: python3 embedding_store.py import)
+if [ ! -f "converge_store/store.sqlite3" ]; then
+    echo "❌ converge_store/ not found"
+    echo "Please run: python3 batch_process_projects.py projects/ and python3 batch_process_resumes.py resumes/"
     exit 1
 fi
 
-# Check if user_embeddings.json exists
-if [ ! -f "user_embeddings.json" ]; then
-    echo "❌ user_embeddings.json not found"
-    echo "Please run: python3 batch_process_resumes.py resumes/"
-    exit 1
-fi
-
-# Get first project ID from project_embeddings.json
-PROJECT_ID=$(python3 -c "import json; data = json.load(open('project_embeddings.json')); print(data[0]['project_id'] if data else '')")
+# Get first project ID from the store
+PROJECT_ID=$(python3 -c "import sqlite3; row = sqlite3.connect('converge_store/store.sqlite3').execute('SELECT project_id FROM projects ORDER BY rowid LIMIT 1').fetchone(); print(row[0] if row else '')")
 
 if [ -z "$PROJECT_ID" ]; then
-    echo "❌ No projects found in project_embeddings.json"
+    echo "❌ No projects found in converge_store/"
     exit 1
 fi
 
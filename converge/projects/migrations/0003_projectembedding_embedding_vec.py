@@ -0,0 +1,17 @@
+# Optional pgvector column for pushing the semantic gate into Postgres
+# (see converge/pgvector_index.py; a no-op without PostgreSQL + pgvector).
+
+from django.db import migrations
+
+from converge.pgvector_index import add_embedding_vec
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0002_projectjson'),
+    ]
+
+    operations = [
+        add_embedding_vec("project_embeddings"),
+    ]
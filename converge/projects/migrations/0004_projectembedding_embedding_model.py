@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-19 09:20
+
+from django.db import migrations, models
+
+# Every vector stored before this migration came from text-embedding-004
+LEGACY_EMBEDDING_MODEL = "models/text-embedding-004"
+
+
+def stamp_legacy_model(apps, schema_editor):
+    apps.get_model("projects", "ProjectEmbedding").objects.update(embedding_model=LEGACY_EMBEDDING_MODEL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0003_projectembedding_embedding_vec'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectembedding',
+            name='embedding_model',
+            field=models.CharField(blank=True, db_index=True, help_text='Embedding model that produced the vector', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='projectembedding',
+            name='pending_embedding',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='projectembedding',
+            name='pending_model',
+            field=models.CharField(blank=True, db_index=True, max_length=100),
+        ),
+        migrations.RunPython(stamp_legacy_model, migrations.RunPython.noop),
+    ]
@@ -5,10 +5,16 @@ class ProjectEmbedding(models.Model):
 	"""
 	Stores embeddings for projects parsed by Spring Boot backend.
 	Django generates semantic_text + embedding from parsed JSON.
+	When pgvector is available, migration 0003 adds a trigger-maintained
+	`embedding_vec vector(768)` column (not a model field) with an ANN index.
 	"""
 	project_id = models.IntegerField(unique=True, db_index=True, help_text="Foreign key to Spring Boot project table")
 	semantic_text = models.TextField(blank=True, help_text="Reduced semantic representation")
 	embedding = models.JSONField(default=list, help_text="768-dim embedding vector")
+	embedding_model = models.CharField(max_length=100, blank=True, db_index=True, help_text="Embedding model that produced the vector")
+	# Staged by `manage.py reembed`, swapped into the columns above once every row is done
+	pending_embedding = models.JSONField(null=True, blank=True)
+	pending_model = models.CharField(max_length=100, blank=True, db_index=True)
 	created_at = models.DateTimeField(auto_now_add=True)
 	updated_at = models.DateTimeField(auto_now=True)
 
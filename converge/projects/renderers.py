@@ -0,0 +1,25 @@
+import json
+from rest_framework.renderers import BaseRenderer
+
+
+class NDJSONRenderer(BaseRenderer):
+	"""
+	Newline-delimited JSON (one record per line).
+
+	Registering it lets `?format=ndjson` / `Accept: application/x-ndjson`
+	through DRF content negotiation; streaming views build the body
+	themselves, so this only renders plain (e.g. error) responses.
+	"""
+	media_type = "application/x-ndjson"
+	format = "ndjson"
+	charset = "utf-8"
+
+	def render(self, data, accepted_media_type=None, renderer_context=None):
+		if data is None:
+			return b""
+		return ndjson_line(data)
+
+
+def ndjson_line(record) -> bytes:
+	"""Serialize one record as a compact UTF-8 JSON line."""
+	return (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
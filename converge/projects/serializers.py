@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from converge.renderers import EmbeddingFormatMixin
 from .models import ProjectEmbedding, ProjectJSON
 
 
@@ -11,12 +12,12 @@ class ProjectEmbeddingInputSerializer(serializers.Serializer):
 #it simply takes project_id and parsed_json as input fields
 #from the incoming request in json format.
 
-class ProjectEmbeddingSerializer(serializers.ModelSerializer):
-	"""Output with embedding data"""
+class ProjectEmbeddingSerializer(EmbeddingFormatMixin, serializers.ModelSerializer):
+	"""Output with embedding data (vector format set by context["embedding_format"])"""
 	class Meta:
 		model = ProjectEmbedding
-		fields = ['project_id', 'semantic_text', 'embedding', 'created_at', 'updated_at']
-		read_only_fields = ['created_at', 'updated_at']
+		fields = ['project_id', 'semantic_text', 'embedding', 'embedding_model', 'created_at', 'updated_at']
+		read_only_fields = ['embedding_model', 'created_at', 'updated_at']
 
 
 class ProjectJSONSerializer(serializers.ModelSerializer):
@@ -1,3 +1,560 @@
-from django.test import TestCase
+import asyncio
+import math
+import os
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from converge.singleflight import SingleFlight, SingleFlightTimeout
+from external import match_users_to_projects as scoring
+from external import parallel_scoring
+from external.diversify import mmr_rerank
+from external.quantized_embeddings import QuantizedEmbeddingMatrix, quantized_gate
+from external.streaming_scan import streaming_semantic_top_k
+from ratings.models import Rating
+from resumes.models import ResumeEmbedding, ResumeJSON
+
+from .models import ProjectEmbedding, ProjectJSON
+
+# Cumulative `python -X importtime` budget for loading the URLconf (µs).
+# Loading it used to take ~1.6s with scikit-learn and google-genai on the path.
+URLCONF_IMPORT_BUDGET_US = 1_000_000
+
+# Modules that must only be imported on first use, never by the URLconf
+LAZY_MODULES = ("sklearn", "google.genai", "hdbscan")
+
+
+class URLConfImportTimeTests(SimpleTestCase):
+	"""Cold-start regression guard: worker boot and manage.py stay light."""
+
+	def _import_urlconf(self):
+		code = (
+			"import sys, django; django.setup(); import converge.urls; "
+			f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+		)
+		return subprocess.run(
+			[sys.executable, "-X", "importtime", "-c", code],
+			cwd=Path(__file__).resolve().parent.parent,
+			env=os.environ.copy(),
+			capture_output=True,
+			text=True,
+			check=True,
+		)
+
+	def test_heavy_modules_not_imported(self):
+		result = self._import_urlconf()
+		self.assertEqual(result.stdout.strip(), "", f"imported at URLconf load: {result.stdout.strip()}")
+
+	def test_urlconf_import_budget(self):
+		result = self._import_urlconf()
+		cumulative = None
+		for line in result.stderr.splitlines():
+			parts = [part.strip() for part in line.split("|")]
+			if len(parts) == 3 and parts[2] == "converge.urls":
+				cumulative = int(parts[1])
+		self.assertIsNotNone(cumulative, "converge.urls missing from -X importtime output")
+		self.assertLess(cumulative, URLCONF_IMPORT_BUDGET_US, f"converge.urls took {cumulative}µs to import")
+
+
+
+class MatchQueryValidationTests(TestCase):
+	"""Bad query parameters are rejected before any matching work."""
+
+	def test_top_must_be_positive(self):
+		for query in ("top=0", "top=-1&diversify=mmr"):
+			response = self.client.post(f"/api/project/match/1/?{query}")
+			self.assertEqual(response.status_code, 400, response.content)
+			response = self.client.post(f"/api/project/match/1/async/?{query}")
+			self.assertEqual(response.status_code, 400, response.content)
+
+	def test_shortlist_k_must_be_positive(self):
+		for url in ("/api/project/match/1/?retrieval=stream&k=-5", "/api/project/match/1/?retrieval=parallel&k=0", "/api/project/1/team/?k=0"):
+			response = self.client.post(url)
+			self.assertEqual(response.status_code, 400, response.content)
+
+	def test_mmr_rerank_clamps_k(self):
+		relevance, embeddings = np.array([0.9, 0.8]), np.eye(2)
+		self.assertEqual(len(mmr_rerank(relevance, embeddings, -1)["order"]), 0)
+		self.assertEqual(mmr_rerank(relevance, embeddings, 5)["order"].tolist(), [0, 1])
+
+
+class Phase2QueryCountTests(TestCase):
+	"""Phase 2 reads resume JSONs and ratings in bulk, not per candidate."""
+
+	def setUp(self):
+		ProjectEmbedding.objects.create(project_id=1, embedding=[1.0, 0.0, 0.0], embedding_model="test-model")
+		ProjectJSON.objects.create(project_id=1, project_json={"project_type": "hackathon", "required_skills": ["python"]})
+
+	def add_candidates(self, start, count):
+		for resume_id in range(start, start + count):
+			ResumeEmbedding.objects.create(resume_id=resume_id, embedding=[1.0, 0.1, 0.0], embedding_model="test-model")
+			ResumeJSON.objects.create(resume_id=resume_id, resume_json={"skills": {"programming_languages": ["Python"]}})
+			Rating.objects.create(rater_id=0, ratee_id=resume_id, project_id="p", category_scores={"overall": 4}, raw_rating=4.0, adjusted_rating=4.0)
+
+	def count_queries(self, url):
+		with CaptureQueriesContext(connection) as queries:
+			response = self.client.post(url)
+		self.assertEqual(response.status_code, 200, response.content)
+		return len(queries)
+
+	def test_query_count_does_not_grow_with_candidates(self):
+		for url in ("/api/project/1/team/?size=3", "/api/project/match/1/?top=3"):
+			for model in (ResumeEmbedding, ResumeJSON, Rating):
+				model.objects.all().delete()
+			self.add_candidates(100, 5)
+			few = self.count_queries(url)
+			self.add_candidates(200, 40)
+			self.assertEqual(self.count_queries(url), few, url)
+
+
+class ScoringCorpusLifetimeTests(SimpleTestCase):
+	"""Shared blocks outlive unlink() while a request still holds the corpus."""
+
+	def make_corpus(self):
+		return parallel_scoring.ScoringCorpus.from_records([
+			{"resume_id": 1, "embedding": [1.0, 0.0], "resume_json": {}, "global_rating": 4.0},
+			{"resume_id": 2, "embedding": [0.8, 0.6], "resume_json": {}, "global_rating": 2.0},
+		])
+
+	def attach(self, corpus):
+		parallel_scoring._attached["names"] = None
+		return parallel_scoring._attach(corpus.spec)
+
+	def test_unlink_waits_for_last_release(self):
+		corpus = self.make_corpus().acquire()
+		corpus.acquire()
+		corpus.unlink()
+		self.assertEqual(self.attach(corpus)["resume_ids"].tolist(), [1, 2])
+		corpus.release()
+		self.attach(corpus)
+		corpus.release()
+		with self.assertRaises(FileNotFoundError):
+			self.attach(corpus)
+
+	def test_unlink_without_users_is_immediate(self):
+		corpus = self.make_corpus()
+		corpus.unlink()
+		with self.assertRaises(FileNotFoundError):
+			self.attach(corpus)
+
+	def test_update_ratings_reorders_without_rebuilding(self):
+		corpus = self.make_corpus()
+		try:
+			ranked = parallel_scoring.parallel_top_k(corpus, [1.0, 0.3], [], "hackathon", 2, 2)
+			self.assertEqual([resume_id for resume_id, _ in ranked["passes"]], [1, 2])
+			spec = corpus.spec
+			corpus.update_ratings([1.0, 5.0])
+			self.assertIs(corpus.spec, spec)
+			ranked = parallel_scoring.parallel_top_k(corpus, [1.0, 0.3], [], "hackathon", 2, 2)
+			self.assertEqual([resume_id for resume_id, _ in ranked["passes"]], [2, 1])
+			with self.assertRaises(ValueError):
+				corpus.update_ratings([1.0])
+		finally:
+			corpus.unlink()
+
+
+class GenaiSettingsFallbackTests(SimpleTestCase):
+	"""Offline scripts only need the environment when Django settings cannot load."""
+
+	def test_environment_fallback(self):
+		env = {**os.environ, "DJANGO_SETTINGS_MODULE": "converge.missing_settings", "GEMINI_API_KEY": "env-key"}
+		env.pop("EMBEDDING_MODEL", None)
+		code = (
+			"from external import genai_client as g; "
+			"print(g.get_api_key(), g.get_embedding_model(), repr(g.get_base_url()))"
+		)
+		result = subprocess.run(
+			[sys.executable, "-c", code],
+			cwd=Path(__file__).resolve().parent.parent,
+			env=env,
+			capture_output=True,
+			text=True,
+		)
+		self.assertEqual(result.returncode, 0, result.stderr)
+		self.assertEqual(result.stdout.split()[:2], ["env-key", "models/text-embedding-004"])
+
+
+class SingleFlightTests(SimpleTestCase):
+	"""Followers share the leader's result or exception, and give up after their timeout."""
+
+	def start_leader(self, flight, fn):
+		"""Run a blocked leader for "key" in a thread; returns (release event, thread, outcome)."""
+		started, release, outcome = threading.Event(), threading.Event(), {}
+
+		def leader():
+			def blocked():
+				started.set()
+				release.wait(5)
+				return fn()
+			try:
+				outcome["value"] = flight.do("key", blocked)
+			except Exception as e:
+				outcome["error"] = e
+
+		thread = threading.Thread(target=leader)
+		thread.start()
+		self.assertTrue(started.wait(5))
+		return release, thread, outcome
+
+	def follow(self, flight, timeout=5):
+		"""Start a follower for "key" and return once it has joined the leader's call."""
+		outcome, joined = {}, threading.Event()
+		join = flight._join
+
+		def joining(key):
+			call, leader = join(key)
+			self.assertFalse(leader)
+			joined.set()
+			return call, leader
+
+		def follower():
+			try:
+				outcome["value"] = flight.do("key", lambda: "not the leader", timeout=timeout)
+			except Exception as e:
+				outcome["error"] = e
+
+		thread = threading.Thread(target=follower)
+		with mock.patch.object(flight, "_join", joining):
+			thread.start()
+			self.assertTrue(joined.wait(5))
+		return thread, outcome
+
+	def test_followers_share_result(self):
+		flight = SingleFlight()
+		release, leader, led = self.start_leader(flight, lambda: "result")
+		follower, followed = self.follow(flight)
+		release.set()
+		leader.join(5)
+		follower.join(5)
+		self.assertEqual(led["value"], ("result", False))
+		self.assertEqual(followed["value"], ("result", True))
+
+	def test_exception_reaches_every_caller(self):
+		flight = SingleFlight()
+		error = ValueError("boom")
+
+		def fail():
+			raise error
+
+		release, leader, led = self.start_leader(flight, fail)
+		follower, followed = self.follow(flight)
+		release.set()
+		leader.join(5)
+		follower.join(5)
+		self.assertIs(led["error"], error)
+		self.assertIs(followed["error"], error)
+		# Nothing is cached: the next call runs again
+		self.assertEqual(flight.do("key", lambda: "fresh"), ("fresh", False))
+
+	def test_follower_timeout(self):
+		flight = SingleFlight()
+		release, leader, led = self.start_leader(flight, lambda: "late")
+		follower, followed = self.follow(flight, timeout=0.05)
+		follower.join(5)
+		self.assertIsInstance(followed["error"], SingleFlightTimeout)
+		release.set()
+		leader.join(5)
+		self.assertEqual(led["value"], ("late", False))
+
+	def test_coroutine_followers(self):
+		flight = SingleFlight()
+
+		async def scenario():
+			gate = asyncio.Event()
+
+			async def leader_value():
+				await gate.wait()
+				return "async result"
+
+			async def leader_error():
+				await gate.wait()
+				raise KeyError("gone")
+
+			leader = asyncio.create_task(flight.ado("a", leader_value))
+			await asyncio.sleep(0)
+			follower = asyncio.create_task(flight.ado("a", leader_value))
+			timed_out = asyncio.create_task(flight.ado("a", leader_value, timeout=0.01))
+			with self.assertRaises(SingleFlightTimeout):
+				await timed_out
+			gate.set()
+			self.assertEqual(await leader, ("async result", False))
+			self.assertEqual(await follower, ("async result", True))
+
+			gate.clear()
+			leader = asyncio.create_task(flight.ado("b", leader_error))
+			await asyncio.sleep(0)
+			follower = asyncio.create_task(flight.ado("b", leader_error))
+			await asyncio.sleep(0)
+			gate.set()
+			for task in (leader, follower):
+				with self.assertRaises(KeyError):
+					await task
+
+			# A cancelled leader fails its waiters instead of cancelling them
+			gate.clear()
+			leader = asyncio.create_task(flight.ado("c", leader_value))
+			await asyncio.sleep(0)
+			follower = asyncio.create_task(flight.ado("c", leader_value))
+			await asyncio.sleep(0)
+			leader.cancel()
+			with self.assertRaises(RuntimeError):
+				await follower
+
+		asyncio.run(scenario())
+
+# -------- SCORING PARITY --------
+# Reference Layer 1 / Layer 2 / final scores: the scalar formulas the batch
+# scorer replaced, in plain Python (math.exp, round()).
+
+def _reference_scores(semantic, skills, experience, rating, completed, dropped, availability, project_type):
+	preferred = scoring.PROJECT_TYPE_EXPERIENCE.get(project_type, ["intermediate"])
+	level = experience.lower()
+	if level in preferred:
+		s_experience = 1.0
+	else:
+		value = scoring.EXPERIENCE_LEVELS.get(level, 2)
+		distance = min(abs(value - scoring.EXPERIENCE_LEVELS.get(p, 2)) for p in preferred)
+		s_experience = 1.0 if distance == 0 else 0.7 if distance == 1 else 0.3
+	capability = (
+		scoring.C_WEIGHTS["semantic"] * semantic +
+		scoring.C_WEIGHTS["skills"] * skills +
+		scoring.C_WEIGHTS["experience"] * s_experience
+	)
+	capability_score = round(min(1.0, capability), 4)
+
+	s_rating = 0.5 if rating == 0 else min(1.0, max(0.0, (rating - 1.0) / 4.0))
+	A = {"low": 0.3, "medium": 0.6, "high": 1.0}.get(availability.lower(), 0.6)
+	C = completed / (completed + dropped + scoring.EPSILON)
+	gamma = 1.0 - math.exp(-(completed + dropped) / scoring.COMPLETION_CONFIDENCE_CONSTANT)
+	s_reliability = round(min(1.0, max(0.0, gamma * (0.7 * C + 0.3 * A) + (1.0 - gamma) * scoring.RELIABILITY_PRIOR)), 4)
+	trust_score = round(min(1.0, scoring.T_WEIGHTS["rating"] * s_rating + scoring.T_WEIGHTS["reliability"] * s_reliability), 4)
+
+	alpha = scoring.PROJECT_TYPE_ALPHA.get(project_type, 0.65)
+	return {
+		"capability_score": capability_score,
+		"s_semantic": round(semantic, 4),
+		"s_skills": round(skills, 4),
+		"s_experience": round(s_experience, 4),
+		"trust_score": trust_score,
+		"s_rating": round(s_rating, 4),
+		"s_reliability": s_reliability,
+		"completion_ratio": round(C, 3),
+		"final_score": round(min(1.0, alpha * capability_score + (1.0 - alpha) * trust_score), 4),
+	}
+
+
+def _random_candidates(rng, n):
+	semantic = rng.uniform(-0.2, 1.0, n)
+	semantic[:8] = [0.42795, 0.12345, 0.55555, 0.30005, 0.99995, 0.00005, 0.35, 0.55]  # round() near-ties
+	return {
+		"semantic": semantic.tolist(),
+		"skills": [int(k) / int(m) for k, m in zip(rng.integers(0, 7, n), rng.integers(7, 10, n))],
+		"experience": rng.choice(["beginner", "intermediate", "advanced", "Advanced", "expert"], n).tolist(),
+		"rating": np.where(rng.random(n) < 0.2, 0.0, np.round(rng.uniform(1, 5, n), 3)).tolist(),
+		"completed": rng.integers(0, 9, n).tolist(),
+		"dropped": rng.integers(0, 4, n).tolist(),
+		"availability": rng.choice(["low", "medium", "high", "HIGH", "sometimes"], n).tolist(),
+	}
+
+
+class BatchScoringParityTests(SimpleTestCase):
+	"""score_candidates_batch must give exactly the scalar formulas' scores."""
+
+	def test_round_matches_python_round_on_near_ties(self):
+		values = [0.42795, 0.12345, 0.55555, 0.30005, 0.99995, 0.00005, 2.675, 1.0005, -0.42795]
+		self.assertEqual(scoring._round(np.array(values), 4).tolist(), [round(v, 4) for v in values])
+		self.assertEqual(scoring._round(np.array(values), 3).tolist(), [round(v, 3) for v in values])
+
+	def test_batch_matches_scalar_reference(self):
+		rng = np.random.default_rng(26)
+		c = _random_candidates(rng, 3000)
+		for project_type in ("hackathon", "research", "startup", "open_source", "unknown"):
+			batch = scoring.score_candidates_batch(
+				c["semantic"], c["skills"],
+				scoring.encode_experience_levels(c["experience"]),
+				c["rating"], c["completed"],
+				scoring.encode_availability_levels(c["availability"]),
+				project_type,
+				dropped_projects=c["dropped"],
+			)
+			columns = {**batch["capability"], **batch["trust"], "final_score": batch["final_score"]}
+			for i in range(len(c["semantic"])):
+				expected = _reference_scores(
+					c["semantic"][i], c["skills"][i], c["experience"][i], c["rating"][i],
+					c["completed"][i], c["dropped"][i], c["availability"][i], project_type
+				)
+				actual = {key: float(values[i]) for key, values in columns.items()}
+				self.assertEqual(actual, expected, f"{project_type} candidate {i}")
+
+
+# -------- RETRIEVAL PARITY --------
+# The quantized, streaming and parallel Phase 1 paths against the exact
+# per-row gate (semantic_relevance_filter over every resume, in scan order).
+
+def _random_corpus(rng, n, dim=64):
+	topics = rng.normal(size=(6, dim))
+	vectors = topics[rng.integers(6, size=n)] * rng.uniform(0.0, 2.0, (n, 1)) * np.sqrt(dim) / 8 + rng.normal(size=(n, dim))
+	project = topics[0] * np.sqrt(dim) / 4 + rng.normal(size=dim)
+	ids = [int(i) for i in rng.permutation(np.arange(1, 4 * n))[:n]]
+	return ids, vectors.tolist(), project.tolist()
+
+
+def _exact_gate(ids, embeddings, project):
+	rows = [(resume_id, *scoring.semantic_relevance_filter(project, embedding)[:2]) for resume_id, embedding in zip(ids, embeddings)]
+	return [(resume_id, sim) for resume_id, passes, sim in rows if passes], rows
+
+
+class ExactGateMixin:
+	"""A seeded topic-clustered corpus and its exact gate passes in scan order."""
+
+	def setUp(self):
+		rng = np.random.default_rng(43)
+		self.ids, self.embeddings, self.project = _random_corpus(rng, 1500)
+		self.passes, self.rows = _exact_gate(self.ids, self.embeddings, self.project)
+		self.assertTrue(0 < len(self.passes) < len(self.ids))
+
+	def assertSamePasses(self, actual, expected):
+		self.assertEqual([resume_id for resume_id, _ in actual], [resume_id for resume_id, _ in expected])
+		for (_, a), (_, e) in zip(actual, expected):
+			self.assertAlmostEqual(a, e, places=12)
+
+
+class QuantizedGateParityTests(ExactGateMixin, SimpleTestCase):
+	"""quantized_gate passes exactly the rows the float64 gate passes."""
+
+	def test_quantized_gate_matches_exact(self):
+		matrix = QuantizedEmbeddingMatrix.from_embeddings(self.ids, self.embeddings)
+		vectors = dict(zip(self.ids, self.embeddings))
+		gate = quantized_gate(matrix, self.project, lambda ids: {i: vectors[i] for i in ids}, fallback_top_n=5)
+		self.assertFalse(gate["fallback"])
+		self.assertSamePasses(sorted(gate["passes"], key=lambda p: p[0]), sorted(self.passes, key=lambda p: p[0]))
+
+	def test_strict_gate_falls_back_to_exact_top_n(self):
+		# Unclustered 256-dim noise: no cosine gets near the gate
+		rng = np.random.default_rng(28)
+		embeddings, project = rng.normal(size=(len(self.ids), 256)).tolist(), rng.normal(size=256).tolist()
+		passes, rows = _exact_gate(self.ids, embeddings, project)
+		self.assertEqual(passes, [])
+		matrix = QuantizedEmbeddingMatrix.from_embeddings(self.ids, embeddings)
+		vectors = dict(zip(self.ids, embeddings))
+		gate = quantized_gate(matrix, project, lambda ids: {i: vectors[i] for i in ids}, fallback_top_n=7)
+		self.assertTrue(gate["fallback"])
+		self.assertSamePasses(gate["passes"], [(resume_id, sim) for resume_id, _, sim in sorted(rows, key=lambda r: -r[2])[:7]])
+
+
+class StreamingTopKParityTests(ExactGateMixin, SimpleTestCase):
+	"""streaming_semantic_top_k keeps exactly the exact gate's best passes."""
+
+	def test_streaming_top_k_matches_exact(self):
+		chunks = [(self.ids[i:i + 128], self.embeddings[i:i + 128]) for i in range(0, len(self.ids), 128)]
+		everything = streaming_semantic_top_k(self.project, iter(chunks), len(self.ids), 5)
+		self.assertEqual(everything["passed"], len(self.passes))
+		self.assertSamePasses(everything["passes"], self.passes)
+
+		# Top k by semantic score (ties to the earlier row), handed over in scan order
+		k = 25
+		order = {resume_id: row for row, resume_id in enumerate(self.ids)}
+		best = sorted(self.passes, key=lambda p: (-p[1], order[p[0]]))[:k]
+		top = streaming_semantic_top_k(self.project, iter(chunks), k, 5)
+		self.assertSamePasses(top["passes"], sorted(best, key=lambda p: order[p[0]]))
+
+	def test_strict_gate_falls_back_to_exact_top_n(self):
+		rng = np.random.default_rng(43)
+		embeddings, project = rng.normal(size=(len(self.ids), 256)).tolist(), rng.normal(size=256).tolist()
+		passes, rows = _exact_gate(self.ids, embeddings, project)
+		self.assertEqual(passes, [])
+		chunks = [(self.ids[i:i + 128], embeddings[i:i + 128]) for i in range(0, len(self.ids), 128)]
+		ranked = streaming_semantic_top_k(project, iter(chunks), 25, 7)
+		self.assertTrue(ranked["fallback"])
+		self.assertEqual(ranked["scanned"], len(self.ids))
+		self.assertSamePasses(ranked["passes"], [(resume_id, sim) for resume_id, _, sim in sorted(rows, key=lambda r: -r[2])[:7]])
+
+
+class ParallelTopKParityTests(ExactGateMixin, SimpleTestCase):
+	"""parallel_top_k, in-process and sharded, against the exact gate scored with the scalar formulas."""
+
+	def test_parallel_top_k_matches_exact(self):
+		rng = np.random.default_rng(37)
+		c = _random_candidates(rng, len(self.ids))
+		skill_pool = ["Python", "Rust", "SQL", "Go", "React", "Django"]
+		records = []
+		for i, resume_id in enumerate(self.ids):
+			records.append({
+				"resume_id": resume_id,
+				"embedding": self.embeddings[i],
+				"global_rating": c["rating"][i],
+				"resume_json": {
+					"skills": {"programming_languages": rng.choice(skill_pool, 3, replace=False).tolist()},
+					"experience_level": {"overall": c["experience"][i]},
+					"profile": {"availability": c["availability"][i]},
+					"reputation_signals": {"completed_projects": c["completed"][i]},
+				},
+			})
+		required, project_type, k = ["python", "SQL", "Kotlin"], "research", 40
+
+		# Exact path: every gate pass scored with the scalar formulas, best final score first
+		by_id = {r["resume_id"]: (row, r) for row, r in enumerate(records)}
+		scored = []
+		for resume_id, sim in self.passes:
+			row, record = by_id[resume_id]
+			user = record["resume_json"]
+			final = _reference_scores(
+				sim, scoring.score_skill_match(required, user["skills"]), user["experience_level"]["overall"],
+				record["global_rating"], user["reputation_signals"]["completed_projects"], 0,
+				user["profile"]["availability"], project_type
+			)["final_score"]
+			scored.append((-final, row, resume_id, sim))
+		expected = [(resume_id, sim) for _, _, resume_id, sim in sorted(scored)[:k]]
+
+		corpus = parallel_scoring.ScoringCorpus.from_records(records)
+		try:
+			in_process = parallel_scoring.parallel_top_k(corpus, self.project, required, project_type, k, 5)
+			self.assertFalse(in_process["parallel"])
+			self.assertSamePasses(in_process["passes"], expected)
+
+			# Sharded merge, with threads standing in for the process pool. The
+			# threads share one worker-side attachment, so attach before they start
+			parallel_scoring._attach(corpus.spec)
+			with ThreadPoolExecutor(4) as pool, \
+					mock.patch.object(parallel_scoring, "PARALLEL_MIN_ROWS", 0), \
+					mock.patch.object(parallel_scoring, "SHARD_ROWS", 97), \
+					mock.patch.object(parallel_scoring, "get_pool", return_value=pool):
+				sharded = parallel_scoring.parallel_top_k(corpus, self.project, required, project_type, k, 5)
+			self.assertTrue(sharded["parallel"])
+			self.assertEqual(sharded["passed"], len(self.passes))
+			self.assertSamePasses(sharded["passes"], expected)
+		finally:
+			corpus.unlink()
+
+	def test_strict_gate_falls_back_to_exact_top_n(self):
+		rng = np.random.default_rng(37)
+		embeddings, project = rng.normal(size=(len(self.ids), 256)), rng.normal(size=256).tolist()
+		passes, rows = _exact_gate(self.ids, embeddings.tolist(), project)
+		self.assertEqual(passes, [])
+		records = [
+			{"resume_id": resume_id, "embedding": embedding, "resume_json": {}, "global_rating": 3.5}
+			for resume_id, embedding in zip(self.ids, embeddings)
+		]
+		expected = [(resume_id, sim) for resume_id, _, sim in sorted(rows, key=lambda r: -r[2])[:7]]
+		corpus = parallel_scoring.ScoringCorpus.from_records(records)
+		try:
+			ranked = parallel_scoring.parallel_top_k(corpus, project, [], "hackathon", 40, 7)
+			self.assertTrue(ranked["fallback"])
+			self.assertSamePasses(ranked["passes"], expected)
+			parallel_scoring._attach(corpus.spec)
+			with ThreadPoolExecutor(4) as pool, \
+					mock.patch.object(parallel_scoring, "PARALLEL_MIN_ROWS", 0), \
+					mock.patch.object(parallel_scoring, "SHARD_ROWS", 97), \
+					mock.patch.object(parallel_scoring, "get_pool", return_value=pool):
+				sharded = parallel_scoring.parallel_top_k(corpus, project, [], "hackathon", 40, 7)
+			self.assertSamePasses(sharded["passes"], expected)
+		finally:
+			corpus.unlink()
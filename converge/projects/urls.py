@@ -6,5 +6,8 @@ app_name = "projects"
 urlpatterns = [
 	path("embed/", views.generate_project_embedding, name="generate-embedding"),
 	path("match/<int:project_id>/", views.match_project, name="match"),
+	path("embed/async/", views.generate_project_embedding_async, name="generate-embedding-async"),
+	path("match/<int:project_id>/async/", views.match_project_async, name="match-async"),
+	path("<int:project_id>/team/", views.build_team, name="team"),
 ]
 
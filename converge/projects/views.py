@@ -1,40 +1,97 @@
+import json
+import time
+import numpy as np
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 from rest_framework import status
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, renderer_classes
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from .models import ProjectEmbedding, ProjectJSON
+from .renderers import NDJSONRenderer, ndjson_line
+from converge.renderers import FastJSONRenderer, fast_json_dumps, parse_embedding_format
+from converge.singleflight import SingleFlight, SingleFlightTimeout
 from .serializers import ProjectEmbeddingInputSerializer, ProjectEmbeddingSerializer, ProjectJSONSerializer
 from resumes.models import ResumeEmbedding, ResumeJSON
+from resumes.services import (
+	EMBEDDING_CHUNK_SIZE,
+	PGVECTOR_SHORTLIST_SIZE,
+	acount_resume_model_mismatches,
+	acquire_parallel_corpus,
+	aget_corpus_version,
+	count_pgvector_embeddings,
+	count_resume_model_mismatches,
+	embedding_write_fields,
+	fetch_resume_embeddings,
+	fetch_resume_facet_embeddings,
+	get_bm25_index,
+	get_corpus_version,
+	get_quantized_resume_matrix,
+	pgvector_available,
+	pgvector_shortlist,
+	streaming_shortlist,
+)
+from external.bm25_index import reciprocal_rank_fusion
+from external.diversify import MMR_LAMBDA, MMR_POOL_SIZE, mmr_rerank
+from external.parallel_scoring import parallel_top_k
+from external.quantized_embeddings import quantized_gate
+from external.team_formation import TEAM_FALLBACK_POOL, form_team
+from external.semantic import FACETS
 from external.semantic_project import build_semantic_text_project
-from external.embed_project import embed_semantic_text_project
+from external.embed_project import aembed_semantic_text_project, embed_semantic_text_project
+from external.genai_client import get_embedding_model
 from external.match_users_to_projects import (
 	semantic_relevance_filter,
-	compute_capability_score,
-	compute_trust_score,
-	compute_final_score,
-	PROJECT_TYPE_ALPHA
+	classify_semantic_similarity,
+	semantic_gate_batch,
+	compute_semantic_similarities,
+	compute_facet_similarities,
+	fuse_facet_similarities,
+	score_skill_match,
+	score_candidates_batch,
+	encode_experience_levels,
+	encode_availability_levels,
+	PROJECT_TYPE_ALPHA,
+	SEMANTIC_THRESHOLDS
 )
-from ratings.services import get_global_rating_data
+from ratings.services import aget_global_rating_data_bulk, get_global_rating_data_bulk
+
+# Coalesces concurrent identical match requests in this process
+match_flight = SingleFlight()
 
 
 @api_view(['POST'])
+@renderer_classes([FastJSONRenderer])
 def generate_project_embedding(request):
 	"""
 	Generate semantic text and embedding from parsed project JSON.
 	
-	POST /api/embed/project/
+	POST /api/embed/project/?embedding_format=none
 	Body: {
 		"project_id": 456,
 		"parsed_json": { ... parsed project data from Spring Boot ... }
 	}
 	
+	embedding_format (query or body): "none" (default) omits the vector,
+	"base64_f32" returns it as base64 little-endian float32, "json" as floats.
+	
 	Returns: {
 		"project_id": 456,
 		"semantic_text": "...",
-		"embedding": [768 floats],
+		"embedding": omitted | "<base64>" | [768 floats],
+		"embedding_format": "none" | "base64_f32" (absent for json),
+		"embedding_dim": 768 (absent for json),
 		"created_at": "...",
 		"updated_at": "..."
 	}
 	"""
+	try:
+		embedding_format = parse_embedding_format(request.query_params, request.data)
+	except ValueError as e:
+		return Response({"embedding_format": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+	
 	input_serializer = ProjectEmbeddingInputSerializer(data=request.data)
 	
 	if not input_serializer.is_valid():
@@ -54,18 +111,20 @@ def generate_project_embedding(request):
 		semantic_text = build_semantic_text_project(parsed_json)
 		
 		# Generate embedding
-		embedding = embed_semantic_text_project(semantic_text)
+		model = get_embedding_model()
+		embedding = embed_semantic_text_project(semantic_text, model=model)
 		
 		# Store or update
 		project_embedding, created = ProjectEmbedding.objects.update_or_create(
 			project_id=project_id,
 			defaults={
 				'semantic_text': semantic_text,
-				'embedding': embedding
+				'embedding': embedding,
+				**embedding_write_fields(model)
 			}
 		)
 		
-		output_serializer = ProjectEmbeddingSerializer(project_embedding)
+		output_serializer = ProjectEmbeddingSerializer(project_embedding, context={"embedding_format": embedding_format})
 		project_json_serializer = ProjectJSONSerializer(project_json_record)
 		return Response(
 			{
@@ -84,12 +143,40 @@ def generate_project_embedding(request):
 
 
 @api_view(['POST'])
+@renderer_classes([JSONRenderer, NDJSONRenderer])
 def match_project(request, project_id):
 	"""
 	Find top-N matching resumes for a project using two-layer scoring.
 	
 	POST /api/project/match/{project_id}/?top=5
 	
+	Optional: ?retrieval=pgvector&k=200 shortlists the k nearest resumes
+	above the semantic threshold in Postgres instead of scanning in Python.
+	?retrieval=quantized gates on a resident int8 embedding matrix and
+	re-scores only the rows that may pass from their stored vectors.
+	?retrieval=parallel&k=200 runs the gate and Layer 1 / Layer 2 over a
+	shared-memory copy of the corpus (sharded across a worker pool on large
+	corpora) and returns the k best candidates by final score.
+	?retrieval=hybrid&k=200 fuses the top k gate survivors by cosine with
+	the top k BM25 hits of the project's semantic text (reciprocal-rank
+	fusion), so exact technology names count even when the embedding
+	washes them out; the k best fused candidates go to Phase 2. BM25 hits
+	skip the semantic gate: their record's "retrieval" block carries
+	"gate_bypassed": true, stats.passed_filter still counts gate passes
+	only, and the top-N-by-semantic-score fallback runs only when neither
+	ranking found anyone.
+	?retrieval=stream&k=200 scans the embeddings in chunks and keeps only
+	the k best gate survivors by semantic score, in memory bounded by the
+	chunk size plus k (also the fallback when pgvector is not installed).
+	?format=ndjson streams newline-delimited JSON instead: a header record
+	(project metadata + stats), one record per ranked match, an end record.
+	?semantic=facets scores Layer 1 on the skills / projects / interests
+	facet embeddings fused with FACET_WEIGHTS[project_type] (the gate still
+	uses the whole-resume embedding; resumes without facets keep that score).
+	?diversify=mmr&lambda=0.7 fills the first `top` places with Maximal
+	Marginal Relevance picks from the MMR_POOL_SIZE best candidates (final
+	score vs. embedding similarity to earlier picks); the rest follow by score.
+	
 	Returns: {
 		"project_id": 456,
 		"matches": [
@@ -117,11 +204,69 @@ def match_project(request, project_id):
 		],
 		"count": 5
 	}
+	
+	Returns 409 while any resume embedding comes from a different embedding
+	model than the project's (see `manage.py reembed`).
+	
+	Concurrent identical requests (same project, query string and corpus
+	version, no request body) share one computation; callers that waited
+	on another's get `X-Coalesced: 1`. NDJSON streams are never coalesced.
 	"""
+	if request.accepted_renderer.format == 'ndjson' or request.data:
+		return _match_project(request, project_id)
+	
+	try:
+		key = ("match", project_id, _query_key(request.query_params), get_corpus_version())
+		(data, status_code), shared = match_flight.do(
+			key,
+			lambda: _response_payload(_match_project(request, project_id)),
+			timeout=settings.MATCH_COALESCE_TIMEOUT
+		)
+	except SingleFlightTimeout:
+		return Response(
+			{"error": "Timed out waiting for an identical in-flight match request"},
+			status=status.HTTP_503_SERVICE_UNAVAILABLE
+		)
+	except Exception as e:
+		import traceback
+		print(traceback.format_exc())
+		return Response(
+			{"error": f"Matching failed: {str(e)}"},
+			status=status.HTTP_500_INTERNAL_SERVER_ERROR
+		)
+	
+	response = Response(data, status=status_code)
+	response["X-Coalesced"] = "1" if shared else "0"
+	return response
+
+
+def _match_project(request, project_id):
+	"""match_project without coalescing (returns a Response or StreamingHttpResponse)."""
 	try:
 		top_n = int(request.query_params.get('top', 5))
 	except ValueError:
 		top_n = 5
+	if top_n < 1:
+		return Response({"error": "top must be at least 1"}, status=status.HTTP_400_BAD_REQUEST)
+	
+	# Phase 1 retrieval: "exact" scores every embedding in Python, "pgvector"
+	# runs the semantic gate in Postgres (falls back to stream when unavailable),
+	# "quantized" gates on the cached int8 matrix, "parallel" scores the
+	# shared-memory corpus and keeps the top k, "hybrid" fuses cosine and BM25,
+	# "stream" keeps the top k passes of a chunked scan in bounded memory
+	retrieval = request.query_params.get('retrieval', 'exact')
+	try:
+		shortlist_k = int(request.query_params.get('k', PGVECTOR_SHORTLIST_SIZE))
+	except ValueError:
+		shortlist_k = PGVECTOR_SHORTLIST_SIZE
+	if shortlist_k < 1:
+		return Response({"error": "k must be at least 1"}, status=status.HTTP_400_BAD_REQUEST)
+	semantic_mode = request.query_params.get('semantic', 'document')
+	diversify = request.query_params.get('diversify')
+	try:
+		mmr_lambda = min(1.0, max(0.0, float(request.query_params.get('lambda', MMR_LAMBDA))))
+	except ValueError:
+		mmr_lambda = MMR_LAMBDA
 	
 	try:
 		# Get project embedding
@@ -134,6 +279,11 @@ def match_project(request, project_id):
 				status=status.HTTP_400_BAD_REQUEST
 			)
 		
+		# Vectors from different embedding models are not comparable
+		mismatched = count_resume_model_mismatches(project_embedding_obj.embedding_model)
+		if mismatched:
+			return Response(_model_conflict(project_embedding_obj, mismatched), status=status.HTTP_409_CONFLICT)
+		
 		# Load stored project JSON; allow request body override if provided
 		stored_project_json = None
 		try:
@@ -151,10 +301,7 @@ def match_project(request, project_id):
 		project_type = proj_json.get("project_type", "hackathon")
 		required_skills = proj_json.get("required_skills", [])
 		
-		results = []
 		total_resumes = ResumeEmbedding.objects.count()
-		resumes_with_embeddings = 0
-		passed_gate = 0
 		
 		print(f"\n{'='*60}")
 		print(f"[matching] Two-layer matching for project_id={project_id}")
@@ -162,10 +309,635 @@ def match_project(request, project_id):
 		print(f"{'='*60}")
 		
 		# Phase 1: Semantic relevance filter
-		phase1_passes = []
-		semantic_candidates = []  # keep all with their scores for fallback if gate is too strict
+		phase1 = _run_phase1(
+			proj_emb, retrieval, shortlist_k, top_n, total_resumes, project_type, required_skills,
+			query_text=project_embedding_obj.semantic_text
+		)
+		phase1_passes = phase1["passes"]
+		stored_resume_jsons = phase1["resume_jsons"]  # pgvector retrieval returns the JSON with the shortlist
+		resumes_with_embeddings = phase1["with_embeddings"]
+		passed_gate = phase1["passed_gate"]
+		retrieval = phase1["retrieval"]
+			
+		#we have two phases to compute scores
+		#first one is based on the embeddings, gives semantic score
+
+		#second one has two layers capability and alignment, trust and execution
+		#-----------------------------------------------------------------------
+		
+		#phase1_passes contains resumes that passed the semantic filter
+		fused_count = 0
+		if semantic_mode == 'facets' and phase1_passes:
+			fused_count = _apply_facet_scores(phase1_passes, proj_emb, project_type)
+			print(f"[matching] Facet scoring: {fused_count}/{len(phase1_passes)} candidates have facet embeddings")
+		
+		# Fallback to request payload if provided (for backward compatibility/tests)
+		fallback_resume_jsons = request.data.get('resume_jsons', {})
+		
+		def run_phase2():
+			candidate_inputs, scores = _score_phase2(
+				phase1_passes,
+				stored_resume_jsons,
+				fallback_resume_jsons,
+				project_type,
+				required_skills
+			)
+			if diversify == 'mmr':
+				_apply_mmr_order(candidate_inputs, scores, top_n, mmr_lambda)
+			return candidate_inputs, scores
 		
-		for idx, resume_emb in enumerate(ResumeEmbedding.objects.all(), 1):
+		response_header = {
+			"project_id": project_id,
+			"project_type": project_type,
+			"alpha": PROJECT_TYPE_ALPHA.get(project_type, 0.65),
+			"top_n_requested": top_n,  # Include what was requested
+			"project_metadata": _project_metadata(proj_json),
+			"stats": {
+				"total_resumes": total_resumes,
+				"with_embeddings": resumes_with_embeddings,
+				"passed_filter": passed_gate,
+				"retrieval": retrieval,
+				"semantic": semantic_mode,
+				"facet_scored": fused_count,
+				"diversify": {"method": "mmr", "lambda": mmr_lambda} if diversify == 'mmr' else None
+			}
+		}
+		
+		if request.accepted_renderer.format == 'ndjson':
+			# Header goes out now; Phase 2 runs as the client starts reading
+			return StreamingHttpResponse(
+				_stream_matches_ndjson(response_header, run_phase2),
+				content_type=NDJSONRenderer.media_type
+			)
+		
+		# Phase 2: Two-layer scoring
+		candidate_inputs, scores = run_phase2()
+		results = list(_iter_ranked_matches(candidate_inputs, scores))
+		
+		print(f"\n{'='*60}")
+		print(f"[matching] Summary:")
+		print(f"  Total resumes: {total_resumes}")
+		print(f"  With embeddings: {resumes_with_embeddings}")
+		print(f"  Passed semantic gate: {passed_gate}")
+		print(f"  Final matches: {len(results)}")
+		print(f"{'='*60}\n")
+		
+		return Response({
+			"project_id": project_id,
+			"project_type": project_type,
+			"alpha": response_header["alpha"],
+			"matches": results,  # Return all matches, not limited to top_n
+			"count": len(results),
+			"top_n_requested": top_n,  # Include what was requested
+			"project_metadata": response_header["project_metadata"],
+			"stats": response_header["stats"]
+		}, status=status.HTTP_200_OK)
+		
+	except ProjectEmbedding.DoesNotExist:
+		return Response(
+			{"error": f"Project {project_id} not found or has no embedding"},
+			status=status.HTTP_404_NOT_FOUND
+		)
+	except Exception as e:
+		import traceback
+		print(traceback.format_exc())
+		return Response(
+			{"error": f"Matching failed: {str(e)}"},
+			status=status.HTTP_500_INTERNAL_SERVER_ERROR
+		)
+
+
+@csrf_exempt
+@require_POST
+async def generate_project_embedding_async(request):
+	"""
+	Async generate_project_embedding: same body and response, with the Gemini
+	call awaited and the ORM writes done through Django's async API.
+	
+	POST /api/project/embed/async/?embedding_format=none
+	"""
+	try:
+		data = json.loads(request.body or b"{}")
+	except ValueError:
+		return JsonResponse({"error": "Invalid JSON body"}, status=status.HTTP_400_BAD_REQUEST)
+	
+	try:
+		embedding_format = parse_embedding_format(request.GET, data)
+	except ValueError as e:
+		return JsonResponse({"embedding_format": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+	
+	input_serializer = ProjectEmbeddingInputSerializer(data=data)
+	
+	if not input_serializer.is_valid():
+		return JsonResponse(input_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+	
+	project_id = input_serializer.validated_data['project_id']
+	parsed_json = input_serializer.validated_data['parsed_json']
+	
+	try:
+		project_json_record, _ = await ProjectJSON.objects.aupdate_or_create(
+			project_id=project_id,
+			defaults={"project_json": parsed_json}
+		)
+		
+		semantic_text = build_semantic_text_project(parsed_json)
+		model = get_embedding_model()
+		embedding = await aembed_semantic_text_project(semantic_text, model=model)
+		
+		project_embedding, created = await ProjectEmbedding.objects.aupdate_or_create(
+			project_id=project_id,
+			defaults={
+				'semantic_text': semantic_text,
+				'embedding': embedding,
+				**embedding_write_fields(model)
+			}
+		)
+		
+		return HttpResponse(
+			fast_json_dumps({
+				"message": "Project JSON stored and embedding generated successfully",
+				"data": ProjectEmbeddingSerializer(project_embedding, context={"embedding_format": embedding_format}).data,
+				"project_json": ProjectJSONSerializer(project_json_record).data
+			}),
+			status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+			content_type="application/json"
+		)
+		
+	except Exception as e:
+		return JsonResponse(
+			{"error": f"Embedding generation failed: {str(e)}"},
+			status=status.HTTP_500_INTERNAL_SERVER_ERROR
+		)
+
+
+@csrf_exempt
+@require_POST
+async def match_project_async(request, project_id):
+	"""
+	Async match_project (exact retrieval, JSON response only).
+	
+	POST /api/project/match/{project_id}/async/?top=5
+	
+	Every query goes through Django's async ORM: embeddings are read with async
+	iteration and gated with one vectorized cosine, and the resume JSONs and
+	ratings of the survivors are fetched in two bulk queries. Response shape
+	is the same as match_project, and concurrent identical requests are
+	coalesced the same way.
+	"""
+	try:
+		top_n = int(request.GET.get('top', 5))
+	except ValueError:
+		top_n = 5
+	if top_n < 1:
+		return JsonResponse({"error": "top must be at least 1"}, status=status.HTTP_400_BAD_REQUEST)
+	
+	try:
+		data = json.loads(request.body or b"{}")
+	except ValueError:
+		return JsonResponse({"error": "Invalid JSON body"}, status=status.HTTP_400_BAD_REQUEST)
+	
+	try:
+		if data:
+			(payload, status_code), shared = await _amatch_project(project_id, top_n, data), False
+		else:
+			key = ("match_async", project_id, _query_key(request.GET), await aget_corpus_version())
+			(payload, status_code), shared = await match_flight.ado(
+				key,
+				lambda: _amatch_project(project_id, top_n, data),
+				timeout=settings.MATCH_COALESCE_TIMEOUT
+			)
+	except SingleFlightTimeout:
+		return JsonResponse(
+			{"error": "Timed out waiting for an identical in-flight match request"},
+			status=status.HTTP_503_SERVICE_UNAVAILABLE
+		)
+	except Exception as e:
+		import traceback
+		print(traceback.format_exc())
+		return JsonResponse(
+			{"error": f"Matching failed: {str(e)}"},
+			status=status.HTTP_500_INTERNAL_SERVER_ERROR
+		)
+	
+	response = JsonResponse(payload, status=status_code, json_dumps_params={"ensure_ascii": False})
+	response["X-Coalesced"] = "1" if shared else "0"
+	return response
+
+
+async def _amatch_project(project_id, top_n, data):
+	"""match_project_async without coalescing; returns (payload, status)."""
+	try:
+		project_embedding_obj = await ProjectEmbedding.objects.aget(project_id=project_id)
+		proj_emb = project_embedding_obj.embedding
+		
+		if not proj_emb:
+			return {"error": f"Project {project_id} has no embedding"}, status.HTTP_400_BAD_REQUEST
+		
+		mismatched = await acount_resume_model_mismatches(project_embedding_obj.embedding_model)
+		if mismatched:
+			return _model_conflict(project_embedding_obj, mismatched), status.HTTP_409_CONFLICT
+		
+		stored_project_json = await ProjectJSON.objects.filter(project_id=project_id).values_list('project_json', flat=True).afirst()
+		proj_json = data.get('project_json') or stored_project_json or {}
+		
+		if not proj_json:
+			return {"error": "project JSON not found; provide project_json or store it first"}, status.HTTP_400_BAD_REQUEST
+		
+		project_type = proj_json.get("project_type", "hackathon")
+		required_skills = proj_json.get("required_skills", [])
+		total_resumes = await ResumeEmbedding.objects.acount()
+		
+		# Phase 1: Semantic relevance filter over all embeddings at once
+		resume_ids, embeddings = [], []
+		async for resume_id, embedding in ResumeEmbedding.objects.values_list('resume_id', 'embedding'):
+			if embedding:
+				resume_ids.append(resume_id)
+				embeddings.append(embedding)
+		
+		sims = compute_semantic_similarities(proj_emb, embeddings)
+		phase1_passes = [
+			{"resume_id": resume_id, "semantic_score": float(sim)}
+			for resume_id, sim in zip(resume_ids, sims)
+			if classify_semantic_similarity(float(sim))[0]
+		]
+		passed_gate = len(phase1_passes)
+		print(f"[matching] Phase 1 (async): {passed_gate}/{len(resume_ids)} passed semantic filter")
+		
+		# Fallback: if no one passed the semantic gate, take the top-N by semantic score
+		if not phase1_passes and resume_ids:
+			phase1_passes = [
+				{"resume_id": resume_ids[i], "semantic_score": float(sims[i])}
+				for i in np.argsort(-sims, kind="stable")[:top_n]
+			]
+			print(f"[matching] Fallback: semantic gate strict; proceeding with top {len(phase1_passes)} by semantic score")
+		
+		# Phase 2: bulk-fetch what the scorer needs, then score in one batch
+		candidate_ids = [c["resume_id"] for c in phase1_passes]
+		stored_resume_jsons = {
+			resume_id: resume_json or {}
+			async for resume_id, resume_json in ResumeJSON.objects.filter(resume_id__in=candidate_ids).values_list('resume_id', 'resume_json')
+		}
+		ratings_by_id = await aget_global_rating_data_bulk(candidate_ids)
+		
+		candidate_inputs, scores = _score_phase2(
+			phase1_passes,
+			stored_resume_jsons,
+			data.get('resume_jsons', {}),
+			project_type,
+			required_skills,
+			ratings_by_id=ratings_by_id
+		)
+		results = list(_iter_ranked_matches(candidate_inputs, scores))
+		
+		return {
+			"project_id": project_id,
+			"project_type": project_type,
+			"alpha": PROJECT_TYPE_ALPHA.get(project_type, 0.65),
+			"matches": results,
+			"count": len(results),
+			"top_n_requested": top_n,
+			"project_metadata": _project_metadata(proj_json),
+			"stats": {
+				"total_resumes": total_resumes,
+				"with_embeddings": len(resume_ids),
+				"passed_filter": passed_gate,
+				"retrieval": "exact",
+				"semantic": "document",
+				"facet_scored": 0,
+				"diversify": None
+			}
+		}, status.HTTP_200_OK
+		
+	except ProjectEmbedding.DoesNotExist:
+		return {"error": f"Project {project_id} not found or has no embedding"}, status.HTTP_404_NOT_FOUND
+	except Exception as e:
+		import traceback
+		print(traceback.format_exc())
+		return {"error": f"Matching failed: {str(e)}"}, status.HTTP_500_INTERNAL_SERVER_ERROR
+
+
+def _model_conflict(project_embedding_obj, mismatched):
+	"""409 body when resume vectors come from another embedding model than the project's."""
+	return {
+		"error": (
+			f"{mismatched} resume embeddings were not produced by {project_embedding_obj.embedding_model or 'an unrecorded model'} "
+			f"(project {project_embedding_obj.project_id}); run `manage.py reembed` to move all vectors to one model"
+		),
+		"embedding_model": project_embedding_obj.embedding_model,
+		"mismatched_resumes": mismatched,
+	}
+
+
+def _query_key(query_params):
+	"""Hashable, order-independent form of a QueryDict for coalescing keys."""
+	return tuple(sorted((name, tuple(values)) for name, values in query_params.lists()))
+
+
+def _response_payload(response):
+	"""(data, status) of a non-streaming DRF Response, shareable across requests."""
+	return response.data, response.status_code
+
+
+def _project_metadata(proj_json):
+	return {
+		"title": proj_json.get("title"),
+		"description": proj_json.get("description"),
+		"required_skills": proj_json.get("required_skills", []),
+		"preferred_technologies": proj_json.get("preferred_technologies", []),
+		"domains": proj_json.get("domains", []),
+		"project_type": proj_json.get("project_type"),
+	}
+
+
+@api_view(['POST'])
+def build_team(request, project_id):
+	"""
+	Pick a complementary team for a project instead of a top-N list.
+	
+	POST /api/project/{project_id}/team/?size=5
+	
+	Candidates are the semantic gate's survivors (same ?retrieval= and ?k=
+	options as match_project), scored with the two-layer model. Lazy greedy
+	then maximizes required-skill coverage plus the members' final scores
+	(TEAM_WEIGHTS) over skill bitsets, so five people with the same skills
+	lose to a team that covers the brief.
+	
+	Returns: {
+		"project_id": 456,
+		"team": [
+			{
+				"pick": 1,
+				"resume_id": 123,
+				"final_score": 0.85,
+				"skills_covered": ["python", "sql"],
+				"explanation": {"marginal_gain": 0.41, "coverage_gain": 0.3, "score_gain": 0.11, "new_skills": [...]},
+				"profile": {...}
+			},
+			...
+		],
+		"covered_skills": [...],
+		"missing_skills": [...],
+		"coverage": 0.67,
+		"objective": 0.93,
+		"stats": {...}
+	}
+	"""
+	try:
+		size = int(request.query_params.get('size', 5))
+	except ValueError:
+		size = 5
+	if size < 1:
+		return Response({"error": "size must be at least 1"}, status=status.HTTP_400_BAD_REQUEST)
+	
+	retrieval = request.query_params.get('retrieval', 'exact')
+	try:
+		shortlist_k = int(request.query_params.get('k', PGVECTOR_SHORTLIST_SIZE))
+	except ValueError:
+		shortlist_k = PGVECTOR_SHORTLIST_SIZE
+	if shortlist_k < 1:
+		return Response({"error": "k must be at least 1"}, status=status.HTTP_400_BAD_REQUEST)
+	
+	try:
+		project_embedding_obj = ProjectEmbedding.objects.get(project_id=project_id)
+		proj_emb = project_embedding_obj.embedding
+		if not proj_emb:
+			return Response(
+				{"error": f"Project {project_id} has no embedding"},
+				status=status.HTTP_400_BAD_REQUEST
+			)
+		
+		mismatched = count_resume_model_mismatches(project_embedding_obj.embedding_model)
+		if mismatched:
+			return Response(_model_conflict(project_embedding_obj, mismatched), status=status.HTTP_409_CONFLICT)
+		
+		stored_project_json = ProjectJSON.objects.filter(project_id=project_id).values_list('project_json', flat=True).first()
+		proj_json = request.data.get('project_json') or stored_project_json or {}
+		if not proj_json:
+			return Response(
+				{"error": "project JSON not found; provide project_json or store it first"},
+				status=status.HTTP_400_BAD_REQUEST
+			)
+		
+		project_type = proj_json.get("project_type", "hackathon")
+		required_skills = proj_json.get("required_skills", [])
+		total_resumes = ResumeEmbedding.objects.count()
+		
+		print(f"[team] Team of {size} for project_id={project_id}, Skills: {required_skills}")
+		
+		phase1 = _run_phase1(
+			proj_emb, retrieval, shortlist_k, max(size, TEAM_FALLBACK_POOL), total_resumes, project_type, required_skills,
+			query_text=project_embedding_obj.semantic_text
+		)
+		candidate_inputs, scores = _score_phase2(
+			phase1["passes"],
+			phase1["resume_jsons"],
+			request.data.get('resume_jsons', {}),
+			project_type,
+			required_skills
+		)
+		
+		# Best-first candidate list, so greedy ties go to the better individual
+		order = np.argsort(-scores["final_score"], kind="stable")
+		candidates = [
+			{
+				"resume_id": candidate_inputs[i]["resume_id"],
+				"final_score": float(scores["final_score"][i]),
+				"skills": candidate_inputs[i]["skills"],
+				"profile": candidate_inputs[i]["profile"],
+				"availability": candidate_inputs[i]["availability"],
+			}
+			for i in order
+		]
+		
+		start = time.perf_counter()
+		team = form_team(candidates, required_skills, size)
+		selection_ms = (time.perf_counter() - start) * 1000
+		print(f"[team] Selected {len(team['members'])}/{len(candidates)} candidates in {selection_ms:.2f}ms, coverage={team['coverage']}")
+		
+		by_id = {c["resume_id"]: c for c in candidates}
+		for member in team["members"]:
+			c = by_id[member["resume_id"]]
+			member["profile"] = {
+				"name": c["profile"].get("name", "Unknown"),
+				"year": c["profile"].get("year", "Unknown"),
+				"availability": c["availability"]
+			}
+		
+		return Response({
+			"project_id": project_id,
+			"project_type": project_type,
+			"size_requested": size,
+			"team": team["members"],
+			"covered_skills": team["covered_skills"],
+			"missing_skills": team["missing_skills"],
+			"coverage": team["coverage"],
+			"objective": team["objective"],
+			"weights": team["weights"],
+			"stats": {
+				"total_resumes": total_resumes,
+				"with_embeddings": phase1["with_embeddings"],
+				"passed_filter": phase1["passed_gate"],
+				"candidates": len(candidates),
+				"gain_evaluations": team["evaluations"],
+				"selection_ms": round(selection_ms, 3),
+				"retrieval": phase1["retrieval"]
+			}
+		}, status=status.HTTP_200_OK)
+	
+	except ProjectEmbedding.DoesNotExist:
+		return Response(
+			{"error": f"Project {project_id} not found or has no embedding"},
+			status=status.HTTP_404_NOT_FOUND
+		)
+	except Exception as e:
+		import traceback
+		print(traceback.format_exc())
+		return Response(
+			{"error": f"Team formation failed: {str(e)}"},
+			status=status.HTTP_500_INTERNAL_SERVER_ERROR
+		)
+
+
+def _run_phase1(proj_emb, retrieval, shortlist_k, top_n, total_resumes, project_type="hackathon", required_skills=(), query_text=""):
+	"""
+	Phase 1: semantic gate over all resumes with the requested retrieval mode.
+	When nobody passes, the top_n resumes by semantic score are used instead.
+	Parallel retrieval also scores the survivors (hence project_type and
+	required_skills) to keep only the shortlist_k best; hybrid retrieval
+	searches BM25 with query_text.
+	
+	Returns: {"passes", "resume_jsons" (None unless retrieval returned them),
+	          "with_embeddings", "passed_gate", "retrieval" (mode actually used)}
+	"""
+	resumes_with_embeddings = 0
+	passed_gate = 0
+	
+	# Phase 1: Semantic relevance filter
+	phase1_passes = []
+	semantic_candidates = []  # keep all with their scores for fallback if gate is too strict
+	stored_resume_jsons = None  # pgvector retrieval returns the JSON with the shortlist
+	
+	if retrieval == 'pgvector' and not pgvector_available():
+		print("[matching] pgvector column not installed; falling back to streaming retrieval")
+		retrieval = 'stream'
+	
+	if retrieval == 'pgvector':
+		# Gate and ranking run in Postgres; only the shortlist comes back
+		resumes_with_embeddings = count_pgvector_embeddings()
+		shortlist = pgvector_shortlist(proj_emb, SEMANTIC_THRESHOLDS["meaningful"][0], shortlist_k)
+		shortlist = [row for row in shortlist if classify_semantic_similarity(row["semantic_score"])[0]]
+		passed_gate = len(shortlist)
+		print(f"[matching] Phase 1 (pgvector): {passed_gate}/{resumes_with_embeddings} passed semantic filter (k={shortlist_k})")
+		
+		# Fallback: nobody passed, take the top-N by semantic score
+		if not shortlist:
+			shortlist = pgvector_shortlist(proj_emb, None, top_n)
+			print(f"[matching] Fallback: semantic gate strict; proceeding with top {len(shortlist)} by semantic score")
+		
+		phase1_passes = [
+			{"resume_id": row["resume_id"], "semantic_score": row["semantic_score"]}
+			for row in shortlist
+		]
+		stored_resume_jsons = {row["resume_id"]: row["resume_json"] for row in shortlist}
+	elif retrieval == 'quantized':
+		# First pass on the resident int8 matrix; rows that may pass are re-scored exactly
+		matrix = get_quantized_resume_matrix()
+		resumes_with_embeddings = len(matrix)
+		gate = quantized_gate(
+			matrix,
+			proj_emb,
+			fetch_resume_embeddings,
+			threshold=SEMANTIC_THRESHOLDS["meaningful"][0],
+			fallback_top_n=top_n
+		)
+		passed_gate = 0 if gate["fallback"] else len(gate["passes"])
+		print(f"[matching] Phase 1 (quantized): {passed_gate}/{resumes_with_embeddings} passed semantic filter ({gate['rescored']} re-scored exactly)")
+		if gate["fallback"]:
+			print(f"[matching] Fallback: semantic gate strict; proceeding with top {len(gate['passes'])} by semantic score")
+		
+		phase1_passes = [
+			{"resume_id": resume_id, "semantic_score": sem_score}
+			for resume_id, sem_score in gate["passes"]
+		]
+	elif retrieval == 'hybrid':
+		# Cosine over every embedding in one product, BM25 from the inverted index, fused by rank
+		resume_ids, embeddings = [], []
+		for resume_id, embedding in ResumeEmbedding.objects.values_list('resume_id', 'embedding').iterator(chunk_size=EMBEDDING_CHUNK_SIZE):
+			if embedding:
+				resume_ids.append(resume_id)
+				embeddings.append(embedding)
+		resumes_with_embeddings = len(resume_ids)
+		sims = compute_semantic_similarities(proj_emb, embeddings)
+		position = {resume_id: i for i, resume_id in enumerate(resume_ids)}
+		
+		gate = semantic_gate_batch(sims)
+		cosine_rows = [i for i in np.argsort(-sims, kind="stable") if gate[i]][:shortlist_k]
+		cosine_ranking = [resume_ids[i] for i in cosine_rows]
+		bm25_hits = [(resume_id, score) for resume_id, score in get_bm25_index().search(query_text, shortlist_k) if resume_id in position]
+		bm25_ranking = [resume_id for resume_id, _ in bm25_hits]
+		fused = reciprocal_rank_fusion([cosine_ranking, bm25_ranking])[:shortlist_k]
+		
+		cosine_rank = {resume_id: rank for rank, resume_id in enumerate(cosine_ranking, 1)}
+		bm25_rank = {resume_id: (rank, score) for rank, (resume_id, score) in enumerate(bm25_hits, 1)}
+		phase1_passes = [
+			{
+				"resume_id": resume_id,
+				"semantic_score": float(sims[position[resume_id]]),
+				"hybrid": {
+					"rrf_score": round(rrf_score, 6),
+					"cosine_rank": cosine_rank.get(resume_id),
+					"bm25_rank": bm25_rank.get(resume_id, (None, 0.0))[0],
+					"bm25_score": round(bm25_rank.get(resume_id, (None, 0.0))[1], 4),
+					"gate_bypassed": not gate[position[resume_id]],
+				},
+			}
+			for resume_id, rrf_score in fused
+		]
+		passed_gate = int(gate.sum())
+		print(f"[matching] Phase 1 (hybrid): {passed_gate}/{resumes_with_embeddings} passed semantic filter; {len(cosine_ranking)} cosine + {len(bm25_ranking)} BM25 -> {len(phase1_passes)} fused (k={shortlist_k})")
+		
+		# BM25 hits count as candidates, so the semantic fallback only runs when neither ranking found anyone
+		if not phase1_passes and resume_ids:
+			phase1_passes = [
+				{"resume_id": resume_ids[i], "semantic_score": float(sims[i])}
+				for i in np.argsort(-sims, kind="stable")[:top_n]
+			]
+			print(f"[matching] Fallback: semantic gate strict; proceeding with top {len(phase1_passes)} by semantic score")
+	elif retrieval == 'stream':
+		# One chunked pass over (resume_id, embedding); only the top k passes are kept
+		ranked = streaming_shortlist(proj_emb, shortlist_k, top_n)
+		resumes_with_embeddings = ranked["scanned"]
+		passed_gate = ranked["passed"]
+		print(f"[matching] Phase 1 (stream): {passed_gate}/{resumes_with_embeddings} passed semantic filter (k={shortlist_k})")
+		if ranked["fallback"]:
+			print(f"[matching] Fallback: semantic gate strict; proceeding with top {len(ranked['passes'])} by semantic score")
+		
+		phase1_passes = [
+			{"resume_id": resume_id, "semantic_score": sem_score}
+			for resume_id, sem_score in ranked["passes"]
+		]
+	elif retrieval == 'parallel':
+		# Gate + Layer 1 / Layer 2 per shard over the shared-memory corpus; Phase 2 re-scores the top k
+		corpus = acquire_parallel_corpus()
+		try:
+			resumes_with_embeddings = corpus.size
+			ranked = parallel_top_k(corpus, proj_emb, list(required_skills), project_type, shortlist_k, top_n)
+		finally:
+			corpus.release()
+		passed_gate = ranked["passed"]
+		mode = f"{ranked['shards']} shards on the worker pool" if ranked["parallel"] else "in-process"
+		print(f"[matching] Phase 1 (parallel, {mode}): {passed_gate}/{resumes_with_embeddings} passed semantic filter (k={shortlist_k})")
+		if ranked["fallback"]:
+			print(f"[matching] Fallback: semantic gate strict; proceeding with top {len(ranked['passes'])} by semantic score")
+		
+		phase1_passes = [
+			{"resume_id": resume_id, "semantic_score": sem_score}
+			for resume_id, sem_score in ranked["passes"]
+		]
+	else:
+		# Only the two columns needed, streamed: no semantic_text, no result cache
+		resume_embs = ResumeEmbedding.objects.only('resume_id', 'embedding').iterator(chunk_size=EMBEDDING_CHUNK_SIZE)
+		for idx, resume_emb in enumerate(resume_embs, 1):
 			if not resume_emb.embedding:
 				print(f"[{idx}/{total_resumes}] resume_id={resume_emb.resume_id}: ❌ No embedding")
 				continue
@@ -181,7 +953,6 @@ def match_project(request, project_id):
 			print(f"[{idx}/{total_resumes}] resume_id={resume_emb.resume_id}: semantic={sem_score:.4f} ({interpretation}), passes={passes}")
 			semantic_candidates.append({
 				"resume_id": resume_emb.resume_id,
-				"embedding": resume_emb.embedding,
 				"semantic_score": sem_score,
 				"interpretation": interpretation,
 				"passed": passes,
@@ -193,7 +964,6 @@ def match_project(request, project_id):
 			passed_gate += 1
 			phase1_passes.append({
 				'resume_id': resume_emb.resume_id,
-				'embedding': resume_emb.embedding,
 				'semantic_score': sem_score
 			})
 		
@@ -206,143 +976,214 @@ def match_project(request, project_id):
 			phase1_passes = [
 				{
 					"resume_id": c["resume_id"],
-					"embedding": c["embedding"],
 					"semantic_score": c["semantic_score"],
 				}
 				for c in top_semantic
 			]
 			print(f"[matching] Fallback: semantic gate strict; proceeding with top {len(phase1_passes)} by semantic score")
-		
-		#we have two phases to compute scores
-		#first one is based on the embeddings, gives semantic score
+	
+	return {
+		"passes": phase1_passes,
+		"resume_jsons": stored_resume_jsons,
+		"with_embeddings": resumes_with_embeddings,
+		"passed_gate": passed_gate,
+		"retrieval": retrieval,
+	}
 
-		#second one has two layers capability and alignment, trust and execution
-		#-----------------------------------------------------------------------
-		
-		# Phase 2: Two-layer scoring
-		# Fetch stored resume JSONs for candidates we will score
-		resume_ids = [candidate['resume_id'] for candidate in phase1_passes]
+
+def _apply_facet_scores(phase1_passes, proj_emb, project_type):
+	"""
+	Swap each candidate's semantic score for its fused facet score.
+	All candidates' facets are scored with one tensor contraction; resumes
+	stored before facet embeddings existed keep their whole-resume score.
+	
+	Returns: number of candidates scored on facets
+	"""
+	dim = len(proj_emb)
+	facets_by_id = fetch_resume_facet_embeddings([c['resume_id'] for c in phase1_passes])
+	faceted = [
+		c for c in phase1_passes
+		if len(facets_by_id.get(c['resume_id']) or []) == len(FACETS)
+		and all(len(row) == dim for row in facets_by_id[c['resume_id']])
+	]
+	if not faceted:
+		return 0
+	
+	tensor = np.array([facets_by_id[c['resume_id']] for c in faceted], dtype=np.float64)
+	facet_sims = compute_facet_similarities(proj_emb, tensor)
+	fused = fuse_facet_similarities(facet_sims, tensor, project_type)
+	
+	for candidate, sims, score in zip(faceted, facet_sims, fused):
+		candidate['semantic_score'] = float(score)
+		candidate['facet_scores'] = {facet: round(float(sim), 4) for facet, sim in zip(FACETS, sims)}
+	return len(faceted)
+
+
+def _score_phase2(phase1_passes, stored_resume_jsons, fallback_resume_jsons, project_type, required_skills, ratings_by_id=None):
+	"""
+	Phase 2: gather per-candidate inputs, then score Layer 1 / Layer 2 in one batch.
+	The semantic score from Phase 1 is reused rather than recomputed.
+	`ratings_by_id` supplies prefetched rating data (the async view has no
+	synchronous ORM access); otherwise ratings for all candidates are read
+	in one GROUP BY query.
+	
+	Returns: (candidate_inputs, score_candidates_batch result)
+	"""
+	resume_ids = [candidate['resume_id'] for candidate in phase1_passes]
+	
+	# Fetch stored resume JSONs for candidates we will score
+	if stored_resume_jsons is None:
 		stored_resume_jsons = {
 			record.resume_id: record.resume_json or {}
 			for record in ResumeJSON.objects.filter(resume_id__in=resume_ids)
 		}
-		# Fallback to request payload if provided (for backward compatibility/tests)
-		fallback_resume_jsons = request.data.get('resume_jsons', {})
+	
+	if ratings_by_id is None:
+		try:
+			ratings_by_id = get_global_rating_data_bulk(resume_ids)
+		except Exception:
+			# If ratings service unavailable, use the defaults below
+			ratings_by_id = {}
+	
+	candidate_inputs = []
+	for candidate in phase1_passes:
+		resume_id = candidate['resume_id']
+		
+		# Get resume JSON from local store, fallback to provided body
+		user_json = stored_resume_jsons.get(resume_id) or fallback_resume_jsons.get(str(resume_id), {}) or {}
+		
+		# Extract data
+		profile = user_json.get("profile", {})
+		skills = user_json.get("skills", {})
+		experience = user_json.get("experience_level", {})
+		reputation = user_json.get("reputation_signals", {})
+		
+		# Layer 2 inputs: fetch ratings and fall back to neutral defaults if unavailable
+		global_rating_data = {
+			"global_rating": reputation.get("average_rating", 3.5),
+			"ratings_count": 0,
+		}
+		global_rating_data = ratings_by_id.get(resume_id, global_rating_data)
+		
+		candidate_inputs.append({
+			"resume_id": resume_id,
+			"profile": profile,
+			"semantic_score": candidate['semantic_score'],
+			"facet_scores": candidate.get('facet_scores'),
+			"hybrid": candidate.get('hybrid'),
+			"skills": skills,
+			"s_skills": score_skill_match(required_skills, skills),
+			"experience": experience.get("overall", "beginner"),
+			"global_rating_data": global_rating_data,
+			"global_rating": global_rating_data.get("global_rating", reputation.get("average_rating", 3.5)),
+			"completed_projects": reputation.get("completed_projects", 0),
+			"dropped_projects": 0,  # TODO: from project history
+			"availability": profile.get("availability", "medium"),
+		})
+	
+	scores = score_candidates_batch(
+		[c["semantic_score"] for c in candidate_inputs],
+		[c["s_skills"] for c in candidate_inputs],
+		encode_experience_levels([c["experience"] for c in candidate_inputs]),
+		[c["global_rating"] for c in candidate_inputs],
+		[c["completed_projects"] for c in candidate_inputs],
+		encode_availability_levels([c["availability"] for c in candidate_inputs]),
+		project_type,
+		dropped_projects=[c["dropped_projects"] for c in candidate_inputs],
+	)
+	return candidate_inputs, scores
 
-		#phase1_passes contains resumes that passed the semantic filter
 
-		for candidate in phase1_passes:
-			resume_id = candidate['resume_id']
-			
-			# Get resume JSON from local store, fallback to provided body
-			user_json = stored_resume_jsons.get(resume_id) or fallback_resume_jsons.get(str(resume_id), {}) or {}
-			
-			# Extract data
-			profile = user_json.get("profile", {})
-			skills = user_json.get("skills", {})
-			experience = user_json.get("experience_level", {})
-			reputation = user_json.get("reputation_signals", {})
-			
-			# Layer 1: Capability and Alignment
-			capability_data = compute_capability_score(
-				proj_emb,
-				candidate['embedding'],
-				project_type,
-				required_skills,
-				skills,
-				experience.get("overall", "beginner")
-			)
-			
-			# Layer 2: Trust and Execution
-			# Fetch ratings and fall back to neutral defaults if unavailable
-			global_rating_data = {
-				"global_rating": reputation.get("average_rating", 3.5),
-				"ratings_count": 0,
-			}
-			try:
-				global_rating_data = get_global_rating_data(int(resume_id))
-			except Exception:
-				# If ratings service unavailable, use defaults above
-				pass
-			global_rating = global_rating_data.get("global_rating", reputation.get("average_rating", 3.5))
-			completed_projects = reputation.get("completed_projects", 0)
-			dropped_projects = 0  # TODO: from project history
-			availability = profile.get("availability", "medium")
-			
-			trust_data = compute_trust_score(
-				global_rating,
-				completed_projects,
-				dropped_projects,
-				availability
-			)
-			
-			# Final score
-			final_score_data = compute_final_score(
-				capability_data["capability_score"],
-				trust_data["trust_score"],
-				project_type
-			)
-			
-			print(f"    └─ resume_id={resume_id}: Final={final_score_data['final_score']:.4f} (C={capability_data['capability_score']:.4f}, T={trust_data['trust_score']:.4f})")
-			
-			results.append({
-				"resume_id": resume_id,
-				"final_score": final_score_data["final_score"],
-				"layer1_capability": capability_data,
-				"layer2_trust": trust_data,
-				"scoring_formula": final_score_data,
-				"ratings": global_rating_data,
-				"profile": {
-					"name": profile.get("name", "Unknown"),
-					"year": profile.get("year", "Unknown"),
-					"availability": availability
-				}
-			})
-		
-		# Sort by final score
-		results.sort(key=lambda r: r["final_score"], reverse=True)
+def _apply_mmr_order(candidate_inputs, scores, top_n, lam):
+	"""
+	Re-rank for diversity: MMR picks the first top_n places from the
+	MMR_POOL_SIZE best candidates by final score; everyone else keeps
+	final-score order. Sets scores["order"] and each pick's "diversity".
+	"""
+	order = np.argsort(-scores["final_score"], kind="stable")
+	pool = order[:MMR_POOL_SIZE]
+	embeddings_by_id = fetch_resume_embeddings([candidate_inputs[i]["resume_id"] for i in pool])
+	pool = [i for i in pool if embeddings_by_id.get(candidate_inputs[i]["resume_id"])]
+	if not pool:
+		return
+	
+	mmr = mmr_rerank(
+		scores["final_score"][pool],
+		[embeddings_by_id[candidate_inputs[i]["resume_id"]] for i in pool],
+		top_n,
+		lam
+	)
+	picks = [pool[j] for j in mmr["order"]]
+	for pick, mmr_score, max_sim in zip(picks, mmr["mmr_score"], mmr["max_similarity"]):
+		candidate_inputs[pick]["diversity"] = {
+			"mmr_score": round(float(mmr_score), 4),
+			"max_similarity_to_previous": round(float(max_sim), 4),
+		}
+	picked = set(picks)
+	scores["order"] = np.array(picks + [i for i in order if i not in picked], dtype=np.int64)
+
+
+def _iter_ranked_matches(candidate_inputs, scores):
+	"""
+	Yield match records best first (stable for ties), building each
+	nested dict only when it is consumed. A precomputed scores["order"]
+	(e.g. MMR diversification) takes precedence over final-score order.
+	"""
+	alpha = scores["alpha"]
+	order = scores.get("order")
+	if order is None:
+		order = np.argsort(-scores["final_score"], kind="stable")
+	
+	for i in order:
+		c = candidate_inputs[i]
+		capability_data = {key: float(values[i]) for key, values in scores["capability"].items()}
+		trust_data = {key: float(values[i]) for key, values in scores["trust"].items()}
+		if c.get("facet_scores"):
+			capability_data["s_facets"] = c["facet_scores"]
+		final_score = float(scores["final_score"][i])
+		capability_score = capability_data["capability_score"]
+		trust_score = trust_data["trust_score"]
 		
-		print(f"\n{'='*60}")
-		print(f"[matching] Summary:")
-		print(f"  Total resumes: {total_resumes}")
-		print(f"  With embeddings: {resumes_with_embeddings}")
-		print(f"  Passed semantic gate: {passed_gate}")
-		print(f"  Final matches: {len(results)}")
-		print(f"{'='*60}\n")
+		print(f"    └─ resume_id={c['resume_id']}: Final={final_score:.4f} (C={capability_score:.4f}, T={trust_score:.4f})")
 		
-		return Response({
-			"project_id": project_id,
-			"project_type": project_type,
-			"alpha": PROJECT_TYPE_ALPHA.get(project_type, 0.65),
-			"matches": results,  # Return all matches, not limited to top_n
-			"count": len(results),
-			"top_n_requested": top_n,  # Include what was requested
-			"project_metadata": {
-				"title": proj_json.get("title"),
-				"description": proj_json.get("description"),
-				"required_skills": proj_json.get("required_skills", []),
-				"preferred_technologies": proj_json.get("preferred_technologies", []),
-				"domains": proj_json.get("domains", []),
-				"project_type": proj_json.get("project_type"),
+		record = {
+			"resume_id": c["resume_id"],
+			"final_score": final_score,
+			"layer1_capability": capability_data,
+			"layer2_trust": trust_data,
+			"scoring_formula": {
+				"final_score": final_score,
+				"alpha": alpha,
+				"formula": f"{alpha:.2f} × {capability_score:.4f} + {(1-alpha):.2f} × {trust_score:.4f}"
 			},
-			"stats": {
-				"total_resumes": total_resumes,
-				"with_embeddings": resumes_with_embeddings,
-				"passed_filter": passed_gate
+			"ratings": c["global_rating_data"],
+			"profile": {
+				"name": c["profile"].get("name", "Unknown"),
+				"year": c["profile"].get("year", "Unknown"),
+				"availability": c["availability"]
 			}
-		}, status=status.HTTP_200_OK)
-		
-	except ProjectEmbedding.DoesNotExist:
-		return Response(
-			{"error": f"Project {project_id} not found or has no embedding"},
-			status=status.HTTP_404_NOT_FOUND
-		)
+		}
+		if c.get("hybrid"):
+			record["retrieval"] = c["hybrid"]
+		if c.get("diversity"):
+			record["diversity"] = c["diversity"]
+		yield record
+
+
+def _stream_matches_ndjson(header, run_phase2):
+	"""
+	NDJSON body for match_project: a header record, one record per ranked
+	match, then an end record with the count. Errors after the header has
+	been sent are reported as an error record.
+	"""
+	yield ndjson_line({"type": "header", **header})
+	try:
+		candidate_inputs, scores = run_phase2()
+		count = 0
+		for count, match in enumerate(_iter_ranked_matches(candidate_inputs, scores), 1):
+			yield ndjson_line({"type": "match", "rank": count, **match})
+		yield ndjson_line({"type": "end", "count": count})
 	except Exception as e:
 		import traceback
 		print(traceback.format_exc())
-		return Response(
-			{"error": f"Matching failed: {str(e)}"},
-			status=status.HTTP_500_INTERNAL_SERVER_ERROR
-		)
-
-
+		yield ndjson_line({"type": "error", "error": f"Matching failed: {str(e)}"})
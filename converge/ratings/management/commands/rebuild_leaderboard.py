@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from ratings.services import rebuild_leaderboard
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the rating leaderboard from all ratings and save it to settings.LEADERBOARD_PATH. "
+        "Running servers pick the new file up within LEADERBOARD_SYNC_INTERVAL seconds."
+    )
+
+    def handle(self, *args, **options):
+        board = rebuild_leaderboard()
+        self.stdout.write(self.style.SUCCESS(
+            f"Leaderboard: {len(board)} rated users saved to {settings.LEADERBOARD_PATH}"
+        ))
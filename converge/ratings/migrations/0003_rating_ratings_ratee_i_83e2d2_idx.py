@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-19 09:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ratings', '0002_alter_rating_ratee_id_alter_rating_rater_id'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='rating',
+            index=models.Index(fields=['ratee_id', 'project_id'], name='ratings_ratee_i_83e2d2_idx'),
+        ),
+    ]
@@ -17,6 +17,7 @@ class Rating(models.Model):
 			models.Index(fields=["ratee_id"]),
 			models.Index(fields=["rater_id"]),
 			models.Index(fields=["project_id"]),
+			models.Index(fields=["ratee_id", "project_id"]),
 		]
 
 	def __str__(self):
@@ -1,6 +1,9 @@
 from rest_framework import serializers
 from .models import Rating
 
+# Largest team review accepted by /api/ratings/submit/bulk/ (a 22-person team rating everyone)
+BULK_RATING_LIMIT = 500
+
 
 class RatingSerializer(serializers.ModelSerializer):
 	class Meta:
@@ -32,3 +35,41 @@ class SubmitRatingSerializer(serializers.Serializer):
 		if 'ratee_id' in data and isinstance(data['ratee_id'], str):
 			data['ratee_id'] = int(data['ratee_id'])
 		return super().to_internal_value(data)
+
+	def validate_category_scores(self, value):
+		if not isinstance(value, dict) or not value:
+			raise serializers.ValidationError("Expected a non-empty object of category scores.")
+		for category, score in value.items():
+			if isinstance(score, bool) or not isinstance(score, (int, float)):
+				raise serializers.ValidationError(f"Score for '{category}' must be a number.")
+		return value
+
+
+class BulkRatingItemSerializer(SubmitRatingSerializer):
+	"""One rating of a bulk submission; project_id may come from the envelope."""
+	project_id = serializers.CharField(max_length=64, required=False)
+
+	def to_internal_value(self, data):
+		"""Skip the parent's int() coercion: IntegerField converts numeric strings and reports the rest per item."""
+		return serializers.Serializer.to_internal_value(self, data)
+
+
+class BulkSubmitRatingSerializer(serializers.Serializer):
+	project_id = serializers.CharField(max_length=64, required=False)
+	ratings = BulkRatingItemSerializer(many=True, allow_empty=False, max_length=BULK_RATING_LIMIT)
+
+	def validate(self, attrs):
+		"""Fill in the envelope project_id and reject missing projects and repeated (rater, ratee, project)."""
+		seen = set()
+		errors = [{} for _ in attrs["ratings"]]
+		for index, item in enumerate(attrs["ratings"]):
+			item.setdefault("project_id", attrs.get("project_id"))
+			key = (item["rater_id"], item["ratee_id"], item["project_id"])
+			if not item["project_id"]:
+				errors[index] = {"project_id": ["This field is required (here or at the top level)."]}
+			elif key in seen:
+				errors[index] = {"non_field_errors": [f"Duplicate rating {key[0]} -> {key[1]} for project {key[2]}."]}
+			seen.add(key)
+		if any(errors):
+			raise serializers.ValidationError({"ratings": errors})
+		return attrs
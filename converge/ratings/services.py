@@ -1,5 +1,11 @@
-from typing import Dict
-from django.db.models import Avg, Count, Sum
+import os
+import threading
+import time
+from typing import Dict, List, Tuple
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Avg, Count, F, FloatField, Func, Max, Min, Sum
+from external.leaderboard import Leaderboard
 from .models import Rating
 
 CATEGORY_WEIGHTS = {
@@ -12,6 +18,17 @@ CATEGORY_WEIGHTS = {
 PRIOR_MEAN = 3.5
 PRIOR_WEIGHT = 3
 
+# Seconds between saves of the in-process leaderboard to settings.LEADERBOARD_PATH
+LEADERBOARD_SAVE_INTERVAL = 60.0
+# Seconds between reconciliations of the leaderboard with the ratings table
+# (ratings submitted through other processes, deletions, a rebuilt file)
+LEADERBOARD_SYNC_INTERVAL = 30.0
+# Largest page served by /api/ratings/leaderboard/
+LEADERBOARD_PAGE_LIMIT = 100
+
+_leaderboard_lock = threading.Lock()
+_leaderboard_cache = {"board": None, "mtime": None, "dirty": False, "saved_at": 0.0, "synced_at": 0.0}
+
 
 def calculate_raw_rating(category_scores: Dict[str, float]) -> float:
     total = 0.0
@@ -24,7 +41,7 @@ def calculate_raw_rating(category_scores: Dict[str, float]) -> float:
 def submit_rating_record(rater_id: int, ratee_id: int, project_id: str, category_scores: Dict[str, float]) -> Rating:
     raw = calculate_raw_rating(category_scores)
     adjusted = raw  # placeholder for rater reliability multiplier
-    return Rating.objects.create(
+    record = Rating.objects.create(
         rater_id=rater_id,
         ratee_id=ratee_id,
         project_id=project_id,
@@ -32,13 +49,275 @@ def submit_rating_record(rater_id: int, ratee_id: int, project_id: str, category
         raw_rating=raw,
         adjusted_rating=adjusted,
     )
+    transaction.on_commit(lambda: update_leaderboard([ratee_id]))
+    return record
+
+
+def submit_rating_records_bulk(ratings: List[Dict]) -> Tuple[List[Rating], Dict[int, Dict]]:
+    """
+    Store a whole team's ratings at once.
+
+    All rows go in with one bulk_create inside a transaction (all or none),
+    then the ratees' global ratings are recomputed once each, in one
+    GROUP BY query, rather than once per rating.
+
+    Args:
+        ratings: [{"rater_id", "ratee_id", "project_id", "category_scores"}, ...] (validated)
+
+    Returns:
+        Tuple[created Rating rows, {ratee_id: global rating data}]
+    """
+    rows = []
+    for item in ratings:
+        raw = calculate_raw_rating(item["category_scores"])
+        rows.append(Rating(
+            rater_id=item["rater_id"],
+            ratee_id=item["ratee_id"],
+            project_id=item["project_id"],
+            category_scores=item["category_scores"],
+            raw_rating=raw,
+            adjusted_rating=raw,  # placeholder for rater reliability multiplier
+        ))
+    with transaction.atomic():
+        records = Rating.objects.bulk_create(rows)
+    ratee_ids = sorted({record.ratee_id for record in records})
+    ratees = get_global_rating_data_bulk(ratee_ids)
+    transaction.on_commit(lambda: update_leaderboard(ratee_ids, ratees))
+    return records, ratees
+
+
+def bayesian_rating_data(count: int, sum_adj: float) -> Dict:
+    """Bayesian-smoothed global rating from a ratee's rating count and adjusted sum."""
+    if count == 0:
+        return {"global_rating": PRIOR_MEAN, "ratings_count": 0}
+    global_rating = (PRIOR_MEAN * PRIOR_WEIGHT + (sum_adj or 0.0)) / (PRIOR_WEIGHT + count)
+    return {"global_rating": round(global_rating, 3), "ratings_count": count}
 
 
 def get_global_rating_data(ratee_id: int) -> Dict:
     qs = Rating.objects.filter(ratee_id=ratee_id)
     count = qs.count()
     if count == 0:
-        return {"global_rating": PRIOR_MEAN, "ratings_count": 0}
+        return bayesian_rating_data(0, 0.0)
     sum_adj = qs.aggregate(total=Sum("adjusted_rating"))['total'] or 0.0
-    global_rating = (PRIOR_MEAN * PRIOR_WEIGHT + sum_adj) / (PRIOR_WEIGHT + count)
-    return {"global_rating": round(global_rating, 3), "ratings_count": count}
+    return bayesian_rating_data(count, sum_adj)
+
+
+def _rating_totals_query(ratee_ids):
+    return (
+        Rating.objects.filter(ratee_id__in=ratee_ids)
+        .values("ratee_id")
+        .annotate(count=Count("id"), total=Sum("adjusted_rating"))
+        .values_list("ratee_id", "count", "total")
+    )
+
+
+def get_global_rating_data_bulk(ratee_ids) -> Dict[int, Dict]:
+    """get_global_rating_data for many ratees in one GROUP BY query."""
+    totals = {ratee_id: (count, total) for ratee_id, count, total in _rating_totals_query(ratee_ids)}
+    return {
+        ratee_id: bayesian_rating_data(*totals.get(ratee_id, (0, 0.0)))
+        for ratee_id in ratee_ids
+    }
+
+
+async def aget_global_rating_data_bulk(ratee_ids) -> Dict[int, Dict]:
+    """Async get_global_rating_data_bulk (Django async ORM iteration)."""
+    totals = {ratee_id: (count, total) async for ratee_id, count, total in _rating_totals_query(ratee_ids)}
+    return {
+        ratee_id: bayesian_rating_data(*totals.get(ratee_id, (0, 0.0)))
+        for ratee_id in ratee_ids
+    }
+
+
+class _JSONNumber(Func):
+    """A JSON object's key as a float, NULL unless the stored value is a JSON number."""
+    output_field = FloatField()
+
+    def __init__(self, field: str, key: str):
+        super().__init__(F(field))
+        self.key = key
+
+    def as_sql(self, compiler, connection, **extra_context):
+        sql, params = compiler.compile(self.source_expressions[0])
+        return (
+            f"CASE WHEN jsonb_typeof({sql} -> %s) = 'number' THEN ({sql} ->> %s)::double precision END",
+            (*params, self.key, *params, self.key),
+        )
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        sql, params = compiler.compile(self.source_expressions[0])
+        path = f'$."{self.key}"'
+        return (
+            f"CASE WHEN json_type({sql}, %s) IN ('integer', 'real') THEN json_extract({sql}, %s) END",
+            (*params, path, *params, path),
+        )
+
+
+def get_user_ratings_summary(ratee_id: int) -> Dict:
+    """
+    Per-category and per-project rating statistics for one user, computed in
+    the database (two queries, both served by the (ratee_id, project_id) index).
+
+    Category scores are read with JSON key extraction and aggregated with
+    AVG/MIN/MAX/COUNT; values that are not JSON numbers (strings, booleans
+    stored before submissions were validated) are skipped. Projects are a
+    GROUP BY project_id over the adjusted ratings.
+
+    Returns: {"user_id", "total_ratings", "category_stats": {category: {"average",
+              "count", "min", "max"}}, "projects": {project_id: {"rating", "raters"}},
+              "global_rating", "ratings_count"}
+    """
+    qs = Rating.objects.filter(ratee_id=ratee_id)
+
+    aggregates = {"total": Count("id"), "sum_adj": Sum("adjusted_rating")}
+    for cat in CATEGORY_WEIGHTS:
+        score = _JSONNumber("category_scores", cat)
+        aggregates.update({
+            f"{cat}__avg": Avg(score),
+            f"{cat}__count": Count(score),
+            f"{cat}__min": Min(score),
+            f"{cat}__max": Max(score),
+        })
+    totals = qs.aggregate(**aggregates)
+
+    category_stats = {
+        cat: {
+            "average": round(totals[f"{cat}__avg"], 3),
+            "count": totals[f"{cat}__count"],
+            "min": totals[f"{cat}__min"],
+            "max": totals[f"{cat}__max"],
+        }
+        for cat in CATEGORY_WEIGHTS
+        if totals[f"{cat}__count"]
+    }
+
+    projects = {}
+    if totals["total"]:
+        project_rows = (
+            qs.values("project_id")
+            .annotate(rating=Avg("adjusted_rating"), raters=Count("id"))
+            .order_by("project_id")
+            .values_list("project_id", "rating", "raters")
+        )
+        projects = {
+            project_id: {"rating": round(rating, 3), "raters": raters}
+            for project_id, rating, raters in project_rows
+        }
+
+    return {
+        "user_id": ratee_id,
+        "total_ratings": totals["total"],
+        "category_stats": category_stats,
+        "projects": projects,
+        **bayesian_rating_data(totals["total"], totals["sum_adj"] or 0.0),
+    }
+
+
+def get_leaderboard() -> Leaderboard:
+    """
+    Process-wide rating leaderboard.
+
+    Loaded from settings.LEADERBOARD_PATH (or built from the ratings table)
+    on first use. Ratings submitted through this process update it as they
+    commit (update_leaderboard), so reads normally touch neither the
+    database nor the file system. Every LEADERBOARD_SYNC_INTERVAL seconds a
+    read reconciles it instead: it reloads the file if
+    `manage.py rebuild_leaderboard` replaced it, and re-rates the ratees of
+    ratings stored since its (count, max id) watermark, which covers other
+    processes. Deleted or late-committed ratings make the counts disagree
+    and trigger a full rebuild. Changes are saved at most every
+    LEADERBOARD_SAVE_INTERVAL seconds.
+    """
+    with _leaderboard_lock:
+        board = _leaderboard_cache["board"]
+        if board is not None and time.monotonic() - _leaderboard_cache["synced_at"] < LEADERBOARD_SYNC_INTERVAL:
+            return board
+        mtime = _leaderboard_mtime()
+        if board is None or (mtime is not None and mtime != _leaderboard_cache["mtime"]):
+            board = Leaderboard.load(settings.LEADERBOARD_PATH) or _build_leaderboard()
+            _leaderboard_cache.update(board=board, mtime=mtime, dirty=mtime is None)
+        _leaderboard_cache.update(board=_sync_leaderboard(board), synced_at=time.monotonic())
+        _save_leaderboard()
+        return _leaderboard_cache["board"]
+
+
+def update_leaderboard(ratee_ids, ratees: Dict[int, Dict] = None):
+    """
+    Move just-rated users on this process' leaderboard (called once their
+    ratings commit). `ratees` is their global rating data when the caller
+    already has it; otherwise it is read in one GROUP BY query. A process
+    that has not loaded the board yet skips this: the first read builds it
+    from the table.
+    """
+    with _leaderboard_lock:
+        board = _leaderboard_cache["board"]
+        if board is None:
+            return
+        for ratee_id, data in (ratees or get_global_rating_data_bulk(ratee_ids)).items():
+            board.update(ratee_id, data["global_rating"], data["ratings_count"])
+        _leaderboard_cache["dirty"] = True
+        _save_leaderboard()
+
+
+def rebuild_leaderboard() -> Leaderboard:
+    """Build the leaderboard from scratch, save it and make it this process' board."""
+    with _leaderboard_lock:
+        _leaderboard_cache.update(board=_build_leaderboard(), dirty=True, synced_at=time.monotonic())
+        _save_leaderboard(force=True)
+        return _leaderboard_cache["board"]
+
+
+def _rating_watermark() -> List:
+    agg = Rating.objects.aggregate(count=Count("id"), max_id=Max("id"))
+    return [agg["count"], agg["max_id"] or 0]
+
+
+def _build_leaderboard() -> Leaderboard:
+    watermark = _rating_watermark()
+    board = Leaderboard.build(
+        (ratee_id, bayesian_rating_data(count, total)["global_rating"], count)
+        for ratee_id, count, total in (
+            Rating.objects.values("ratee_id")
+            .annotate(count=Count("id"), total=Sum("adjusted_rating"))
+            .values_list("ratee_id", "count", "total")
+            .iterator(chunk_size=5000)
+        )
+    )
+    board.watermark = watermark
+    return board
+
+
+def _sync_leaderboard(board: Leaderboard) -> Leaderboard:
+    count, max_id = _rating_watermark()
+    seen_count, seen_max_id = board.watermark or (0, 0)
+    if (count, max_id) == (seen_count, seen_max_id):
+        return board
+
+    new_rows = Rating.objects.filter(id__gt=seen_max_id, id__lte=max_id)
+    ratee_ids = sorted(set(new_rows.values_list("ratee_id", flat=True)))
+    if seen_count + new_rows.count() != count:
+        _leaderboard_cache["dirty"] = True
+        return _build_leaderboard()
+
+    for ratee_id, data in get_global_rating_data_bulk(ratee_ids).items():
+        board.update(ratee_id, data["global_rating"], data["ratings_count"])
+    board.watermark = [count, max_id]
+    _leaderboard_cache["dirty"] = True
+    return board
+
+
+def _leaderboard_mtime():
+    try:
+        return os.path.getmtime(settings.LEADERBOARD_PATH)
+    except OSError:
+        return None
+
+
+def _save_leaderboard(force: bool = False):
+    if not _leaderboard_cache["dirty"]:
+        return
+    if not force and time.monotonic() - _leaderboard_cache["saved_at"] < LEADERBOARD_SAVE_INTERVAL:
+        return
+    _leaderboard_cache["board"].save(settings.LEADERBOARD_PATH)
+    _leaderboard_cache.update(mtime=_leaderboard_mtime(), dirty=False, saved_at=time.monotonic())
@@ -1,3 +1,199 @@
-from django.test import TestCase
+import os
+import random
+import tempfile
 
-# Create your tests here.
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from external.leaderboard import Leaderboard
+
+from . import services
+from .models import Rating
+from .services import CATEGORY_WEIGHTS, bayesian_rating_data
+
+
+class BulkSubmitRatingTests(TestCase):
+	url = "/api/ratings/submit/bulk/"
+
+	def post(self, body):
+		return self.client.post(self.url, body, content_type="application/json")
+
+	def test_malformed_batch_is_rejected_without_storing(self):
+		valid = {"rater_id": 1, "ratee_id": 2, "category_scores": {"technical": 4}}
+		for ratings in (
+			[valid, "oops"],
+			[valid, {"rater_id": "abc", "ratee_id": 3, "category_scores": {"technical": 4}}],
+			[valid, {"rater_id": 1, "ratee_id": 3, "category_scores": {"technical": "high"}}],
+		):
+			response = self.post({"project_id": "proj_1", "ratings": ratings})
+			self.assertEqual(response.status_code, 400, response.content)
+			errors = response.json()["ratings"]
+			self.assertEqual(len(errors), 2)
+			self.assertFalse(errors[0])
+			self.assertTrue(errors[1])
+		self.assertEqual(Rating.objects.count(), 0)
+
+
+class SubmitRatingValidationTests(TestCase):
+	url = "/api/ratings/submit/"
+
+	def test_non_numeric_scores_are_rejected(self):
+		for scores in ({"technical": True}, {"technical": "high"}, {"technical": None}, {}, [4]):
+			response = self.client.post(
+				self.url,
+				{"rater_id": 1, "ratee_id": 2, "project_id": "proj_1", "category_scores": scores},
+				content_type="application/json",
+			)
+			self.assertEqual(response.status_code, 400, scores)
+			self.assertIn("category_scores", response.json())
+		self.assertEqual(Rating.objects.count(), 0)
+
+
+class UserRatingSummaryTests(TestCase):
+	"""The database-side summary against the same statistics computed in Python."""
+
+	def test_summary_matches_python_reference(self):
+		rng = random.Random(46)
+		ratee_id = 7
+		for rater_id in range(40):
+			scores = {cat: rng.choice([1, 2, 3, 4, 5, 2.5, 4.75]) for cat in CATEGORY_WEIGHTS if rng.random() < 0.8}
+			if rater_id % 9 == 0:
+				# Stored before submissions were validated: never aggregated
+				scores.update(technical=True, communication="4", initiative=None)
+			adjusted = round(rng.uniform(1, 5), 3)
+			Rating.objects.create(
+				rater_id=rater_id, ratee_id=ratee_id, project_id=f"proj_{rater_id % 3}",
+				category_scores=scores, raw_rating=adjusted, adjusted_rating=adjusted,
+			)
+		Rating.objects.create(rater_id=1, ratee_id=8, project_id="proj_0", category_scores={"technical": 1}, raw_rating=1, adjusted_rating=1)
+
+		ratings = list(Rating.objects.filter(ratee_id=ratee_id))
+		expected_categories = {}
+		for cat in CATEGORY_WEIGHTS:
+			values = [
+				r.category_scores[cat] for r in ratings
+				if isinstance(r.category_scores.get(cat), (int, float)) and not isinstance(r.category_scores[cat], bool)
+			]
+			if values:
+				expected_categories[cat] = {
+					"average": round(sum(values) / len(values), 3),
+					"count": len(values),
+					"min": min(values),
+					"max": max(values),
+				}
+		expected_projects = {}
+		for project_id in sorted({r.project_id for r in ratings}):
+			adjusted = [r.adjusted_rating for r in ratings if r.project_id == project_id]
+			expected_projects[project_id] = {"rating": round(sum(adjusted) / len(adjusted), 3), "raters": len(adjusted)}
+
+		response = self.client.get(f"/api/ratings/user/{ratee_id}/summary/")
+		self.assertEqual(response.status_code, 200, response.content)
+		summary = response.json()
+		self.assertEqual(summary["total_ratings"], len(ratings))
+		self.assertEqual(summary["category_stats"], expected_categories)
+		self.assertEqual(summary["projects"], expected_projects)
+		expected_global = bayesian_rating_data(len(ratings), sum(r.adjusted_rating for r in ratings))
+		self.assertAlmostEqual(summary["global_rating"], expected_global["global_rating"], places=9)
+		self.assertEqual(summary["ratings_count"], expected_global["ratings_count"])
+
+
+def _reference_standing(ratings, ratee_id):
+	"""rank / percentile / top_percent from a {ratee_id: rating} dict by counting."""
+	mine, n = ratings[ratee_id], len(ratings)
+	rank = 1 + sum(r > mine for r in ratings.values())
+	below = sum(r < mine for r in ratings.values())
+	return {
+		"rank": rank,
+		"of": n,
+		"percentile": round(100.0 * below / (n - 1), 2) if n > 1 else 100.0,
+		"top_percent": round(100.0 * rank / n, 2),
+	}
+
+
+class LeaderboardTests(SimpleTestCase):
+	"""Incremental updates rank like counting over the current ratings, ties sharing a rank."""
+
+	def test_updates_match_reference(self):
+		rng = random.Random(47)
+		board, ratings, counts = Leaderboard(), {}, {}
+		for _ in range(600):
+			ratee_id = rng.randrange(60)
+			count = rng.choice([0, 1, 2, 5])  # 0 takes the user off the board
+			rating = rng.choice([2.5, 3.0, 3.5, 3.875, 4.0])  # few values: many ties
+			board.update(ratee_id, rating, count)
+			if count:
+				ratings[ratee_id], counts[ratee_id] = rating, count
+			else:
+				ratings.pop(ratee_id, None)
+				counts.pop(ratee_id, None)
+
+		self.assertEqual(len(board), len(ratings))
+		for ratee_id in range(60):
+			standing = board.standing(ratee_id)
+			if ratee_id not in ratings:
+				self.assertIsNone(standing)
+				continue
+			expected = _reference_standing(ratings, ratee_id)
+			expected.update(global_rating=ratings[ratee_id], ratings_count=counts[ratee_id])
+			self.assertEqual(standing, expected)
+
+		page = board.page(0, len(board))
+		self.assertEqual([row["ratee_id"] for row in page], sorted(ratings, key=lambda r: (-ratings[r], r)))
+		for row in page:
+			self.assertEqual(row["rank"], _reference_standing(ratings, row["ratee_id"])["rank"])
+		self.assertEqual(board.page(5, 3), page[5:8])
+
+		rebuilt = Leaderboard.build((r, ratings[r], counts[r]) for r in ratings)
+		self.assertEqual(rebuilt.keys, board.keys)
+
+	def test_single_user_and_save_load(self):
+		board = Leaderboard()
+		board.update(1, 4.2, 3)
+		self.assertEqual(board.standing(1)["percentile"], 100.0)
+		self.assertEqual(board.standing(1)["top_percent"], 100.0)
+		board.update(2, 4.2, 1)
+		board.update(3, 3.1, 2)
+		board.watermark = [6, 6]
+		with tempfile.TemporaryDirectory() as tmp:
+			path = os.path.join(tmp, "leaderboard.npz")
+			self.assertIsNone(Leaderboard.load(path))
+			board.save(path)
+			loaded = Leaderboard.load(path)
+			self.assertEqual(os.listdir(tmp), ["leaderboard.npz"])
+		self.assertEqual((loaded.keys, loaded.entries, loaded.watermark), (board.keys, board.entries, [6, 6]))
+		self.assertEqual([board.standing(r)["rank"] for r in (1, 2, 3)], [1, 1, 3])
+
+
+class LeaderboardWriteThroughTests(TestCase):
+	"""A committed rating moves its ratee on the loaded board before any reconcile."""
+
+	def setUp(self):
+		tmp = tempfile.TemporaryDirectory()
+		self.addCleanup(tmp.cleanup)
+		settings_override = override_settings(LEADERBOARD_PATH=os.path.join(tmp.name, "leaderboard.npz"))
+		settings_override.enable()
+		self.addCleanup(settings_override.disable)
+		services._leaderboard_cache.update(board=None, mtime=None, dirty=False, saved_at=0.0, synced_at=0.0)
+		self.addCleanup(services._leaderboard_cache.update, board=None, mtime=None, dirty=False, saved_at=0.0, synced_at=0.0)
+
+	def submit(self, ratee_id, score):
+		with self.captureOnCommitCallbacks(execute=True):
+			response = self.client.post(
+				"/api/ratings/submit/",
+				{"rater_id": 99, "ratee_id": ratee_id, "project_id": "proj_1", "category_scores": {c: score for c in CATEGORY_WEIGHTS}},
+				content_type="application/json",
+			)
+		self.assertEqual(response.status_code, 201, response.content)
+
+	def test_submission_updates_loaded_board(self):
+		self.submit(1, 5)
+		board = services.get_leaderboard()
+		self.assertEqual(board.standing(1)["rank"], 1)
+
+		with self.assertNumQueries(2):  # the INSERT and the ratee's GROUP BY
+			self.submit(2, 1)
+		with self.assertNumQueries(0):
+			board = services.get_leaderboard()
+		self.assertEqual(board.standing(2), {
+			"rank": 2, "of": 2, "percentile": 0.0, "top_percent": 100.0,
+			"global_rating": bayesian_rating_data(1, 1.0)["global_rating"], "ratings_count": 1,
+		})
@@ -5,5 +5,9 @@ app_name = "ratings"
 
 urlpatterns = [
 	path("submit/", views.submit_rating, name="submit"),
+	path("submit/bulk/", views.submit_ratings_bulk, name="submit-bulk"),
+	path("leaderboard/", views.leaderboard, name="leaderboard"),
+	path("user/<int:ratee_id>/percentile/", views.user_rating_percentile, name="user-rating-percentile"),
+	path("user/<int:ratee_id>/summary/", views.user_rating_summary, name="user-rating-summary"),
 	path("user/<str:ratee_id>/", views.user_rating, name="user-rating"),
 ]
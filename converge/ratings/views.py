@@ -1,8 +1,15 @@
 from rest_framework import status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
-from .serializers import SubmitRatingSerializer, RatingSerializer
-from .services import submit_rating_record, get_global_rating_data
+from .serializers import BulkSubmitRatingSerializer, SubmitRatingSerializer, RatingSerializer
+from .services import (
+	LEADERBOARD_PAGE_LIMIT,
+	submit_rating_record,
+	submit_rating_records_bulk,
+	get_global_rating_data,
+	get_user_ratings_summary,
+	get_leaderboard,
+)
 
 
 @api_view(['POST', 'OPTIONS'])
@@ -36,6 +43,48 @@ def submit_rating(request):
 		)
 
 
+@api_view(['POST', 'OPTIONS'])
+def submit_ratings_bulk(request):
+	"""
+	Submit a whole team's end-of-project ratings in one request.
+
+	POST /api/ratings/submit/bulk/
+	Body: {
+		"project_id": "proj_42",          (optional default for every rating)
+		"ratings": [
+			{"rater_id": 1, "ratee_id": 2, "category_scores": {"technical": 4, ...}},
+			...
+		]
+	}
+	Every rating is validated before anything is stored; one invalid or
+	duplicate rating rejects the batch (400, errors keyed by position).
+
+	Returns: {"created": n, "ratings": [...], "ratees": {ratee_id: {"global_rating", "ratings_count"}}}
+	"""
+	if request.method == 'OPTIONS':
+		return Response(status=status.HTTP_200_OK)
+	try:
+		serializer = BulkSubmitRatingSerializer(data=request.data)
+		if not serializer.is_valid():
+			print(f"[ratings] Bulk validation errors: {serializer.errors}")
+			return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+		records, ratees = submit_rating_records_bulk(serializer.validated_data['ratings'])
+		print(f"[ratings] Bulk stored {len(records)} ratings for {len(ratees)} ratees")
+		return Response({
+			"created": len(records),
+			"ratings": RatingSerializer(records, many=True).data,
+			"ratees": ratees,
+		}, status=status.HTTP_201_CREATED)
+	except Exception as e:
+		import traceback
+		print(f"[ratings] Exception: {e}")
+		print(traceback.format_exc())
+		return Response(
+			{"error": str(e)},
+			status=status.HTTP_500_INTERNAL_SERVER_ERROR
+		)
+
+
 @api_view(['GET', 'OPTIONS'])
 def user_rating(request, ratee_id):
 	"""Get global rating for a user (Bayesian smoothed)."""
@@ -43,3 +92,78 @@ def user_rating(request, ratee_id):
 		return Response(status=status.HTTP_200_OK)
 	data = get_global_rating_data(ratee_id)
 	return Response(data, status=status.HTTP_200_OK)
+
+
+@api_view(['GET', 'OPTIONS'])
+def user_rating_summary(request, ratee_id):
+	"""
+	Rating breakdown for a user: per-category min/avg/max and per-project averages.
+
+	GET /api/ratings/user/{ratee_id}/summary/
+	Computed in the database in two queries.
+	"""
+	if request.method == 'OPTIONS':
+		return Response(status=status.HTTP_200_OK)
+	try:
+		return Response(get_user_ratings_summary(ratee_id), status=status.HTTP_200_OK)
+	except Exception as e:
+		return Response(
+			{"error": str(e)},
+			status=status.HTTP_500_INTERNAL_SERVER_ERROR
+		)
+
+
+@api_view(['GET', 'OPTIONS'])
+def leaderboard(request):
+	"""
+	Top collaborators by Bayesian global rating.
+
+	GET /api/ratings/leaderboard/?limit=20&offset=0
+	Served from a precomputed leaderboard, updated as ratings are submitted
+	and reconciled with the ratings table every LEADERBOARD_SYNC_INTERVAL seconds.
+	"""
+	if request.method == 'OPTIONS':
+		return Response(status=status.HTTP_200_OK)
+	try:
+		limit = min(max(int(request.query_params.get('limit', 20)), 1), LEADERBOARD_PAGE_LIMIT)
+		offset = max(int(request.query_params.get('offset', 0)), 0)
+	except ValueError:
+		return Response({"error": "limit and offset must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+	try:
+		board = get_leaderboard()
+		return Response({
+			"total": len(board),
+			"offset": offset,
+			"limit": limit,
+			"results": board.page(offset, limit),
+		}, status=status.HTTP_200_OK)
+	except Exception as e:
+		return Response(
+			{"error": str(e)},
+			status=status.HTTP_500_INTERNAL_SERVER_ERROR
+		)
+
+
+@api_view(['GET', 'OPTIONS'])
+def user_rating_percentile(request, ratee_id):
+	"""
+	A user's leaderboard standing: rank, percentile and "top X%".
+
+	GET /api/ratings/user/{ratee_id}/percentile/
+	404 until the user has been rated.
+	"""
+	if request.method == 'OPTIONS':
+		return Response(status=status.HTTP_200_OK)
+	try:
+		standing = get_leaderboard().standing(ratee_id)
+		if standing is None:
+			return Response(
+				{"error": f"User {ratee_id} has no ratings yet"},
+				status=status.HTTP_404_NOT_FOUND
+			)
+		return Response({"user_id": ratee_id, **standing}, status=status.HTTP_200_OK)
+	except Exception as e:
+		return Response(
+			{"error": str(e)},
+			status=status.HTTP_500_INTERNAL_SERVER_ERROR
+		)
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from resumes.services import flush_bm25_index, rebuild_bm25_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Bring the persisted BM25 index over resume semantic_text up to date, compact it "
+        "and save it. Pass --rebuild to build it from scratch."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rebuild", action="store_true", help="Rebuild the index from all resumes")
+
+    def handle(self, *args, **options):
+        index = rebuild_bm25_index() if options["rebuild"] else flush_bm25_index()
+        self.stdout.write(self.style.SUCCESS(
+            f"BM25 index: {len(index)} resumes, {len(index.vocab)} terms"
+        ))
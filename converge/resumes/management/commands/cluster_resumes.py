@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from resumes.services import update_resume_clusters
+
+
+class Command(BaseCommand):
+    help = (
+        "Cluster resume embeddings into the persisted HDBSCAN model. New resumes are "
+        "assigned with approximate_predict; pass --refit to rebuild the clusters."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--refit", action="store_true", help="Refit HDBSCAN on all resumes")
+
+    def handle(self, *args, **options):
+        result = update_resume_clusters(refit=options["refit"])
+        action = "Fitted" if result["fitted"] else "Assigned"
+        self.stdout.write(self.style.SUCCESS(
+            f"{action} {result['assigned']} resumes; "
+            f"{result['total']} cached assignments across {result['clusters']} clusters"
+        ))
@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from resumes.services import (
+    REEMBED_BATCH_SIZE,
+    REEMBED_REQUESTS_PER_MINUTE,
+    stage_reembedding,
+    swap_reembedding,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-embed every resume and project not yet on --model (default: settings.EMBEDDING_MODEL). "
+        "New vectors are staged in pending columns, batched and rate limited; an interrupted run "
+        "resumes from the staged rows. Once every row is staged, all vectors are swapped in one "
+        "transaction. To switch models: run with --model NEW, set EMBEDDING_MODEL=NEW, then run "
+        "again to pick up anything written in between."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--model", default=None, help="Target embedding model")
+        parser.add_argument("--batch-size", type=int, default=REEMBED_BATCH_SIZE, help="Rows per batch")
+        parser.add_argument("--rpm", type=float, default=REEMBED_REQUESTS_PER_MINUTE, help="Provider calls per minute")
+        parser.add_argument("--no-swap", action="store_true", help="Only stage; swap on a later run")
+
+    def handle(self, *args, **options):
+        model = options["model"] or settings.EMBEDDING_MODEL
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1")
+
+        self.stdout.write(f"Re-embedding onto {model}")
+        staged = stage_reembedding(
+            model,
+            batch_size=options["batch_size"],
+            requests_per_minute=options["rpm"],
+            log=self.stdout.write,
+        )
+        self.stdout.write(
+            f"Staged {staged['resumes']} resumes and {staged['projects']} projects "
+            f"({staged['skipped']} changed mid-batch)"
+        )
+        if options["no_swap"]:
+            return
+
+        result = swap_reembedding(model)
+        if not result["swapped"]:
+            raise CommandError(f"{result['remaining']} rows are not staged yet; run the command again")
+        self.stdout.write(self.style.SUCCESS(
+            f"Swapped {result['resumes']} resume and {result['projects']} project embeddings onto {model}"
+        ))
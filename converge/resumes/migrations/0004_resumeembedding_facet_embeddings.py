@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 09:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0003_resumeembedding_embedding_vec'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumeembedding',
+            name='facet_embeddings',
+            field=models.JSONField(blank=True, default=list, help_text='3x768 facet matrix (skills, projects, interests)'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.7 on 2026-10-19 09:20
+
+from django.db import migrations, models
+
+# Every vector stored before this migration came from text-embedding-004
+LEGACY_EMBEDDING_MODEL = "models/text-embedding-004"
+
+
+def stamp_legacy_model(apps, schema_editor):
+    apps.get_model("resumes", "ResumeEmbedding").objects.update(embedding_model=LEGACY_EMBEDDING_MODEL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0004_resumeembedding_facet_embeddings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumeembedding',
+            name='embedding_model',
+            field=models.CharField(blank=True, db_index=True, help_text='Embedding model that produced the vectors', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='resumeembedding',
+            name='pending_embedding',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='resumeembedding',
+            name='pending_facet_embeddings',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='resumeembedding',
+            name='pending_model',
+            field=models.CharField(blank=True, db_index=True, max_length=100),
+        ),
+        migrations.RunPython(stamp_legacy_model, migrations.RunPython.noop),
+    ]
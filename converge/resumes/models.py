@@ -5,10 +5,18 @@ class ResumeEmbedding(models.Model):
 	"""
 	Stores embeddings for resumes parsed by Spring Boot backend.
 	Django generates semantic_text + embedding from parsed JSON.
+	When pgvector is available, migration 0003 adds a trigger-maintained
+	`embedding_vec vector(768)` column (not a model field) with an ANN index.
 	"""
 	resume_id = models.IntegerField(unique=True, db_index=True, help_text="Foreign key to Spring Boot resume table")
 	semantic_text = models.TextField(blank=True, help_text="Reduced semantic representation")
 	embedding = models.JSONField(default=list, help_text="768-dim embedding vector")
+	facet_embeddings = models.JSONField(default=list, blank=True, help_text="3x768 facet matrix (skills, projects, interests)")
+	embedding_model = models.CharField(max_length=100, blank=True, db_index=True, help_text="Embedding model that produced the vectors")
+	# Staged by `manage.py reembed`, swapped into the columns above once every row is done
+	pending_embedding = models.JSONField(null=True, blank=True)
+	pending_facet_embeddings = models.JSONField(null=True, blank=True)
+	pending_model = models.CharField(max_length=100, blank=True, db_index=True)
 	created_at = models.DateTimeField(auto_now_add=True)
 	updated_at = models.DateTimeField(auto_now=True)
 
@@ -1,13 +1,14 @@
 from rest_framework import serializers
+from converge.renderers import EmbeddingFormatMixin
 from .models import ResumeEmbedding, ResumeJSON
 
 
-class ResumeEmbeddingSerializer(serializers.ModelSerializer):
-	"""Output with embedding data"""
+class ResumeEmbeddingSerializer(EmbeddingFormatMixin, serializers.ModelSerializer):
+	"""Output with embedding data (vector format set by context["embedding_format"])"""
 	class Meta:
 		model = ResumeEmbedding
-		fields = ['resume_id', 'semantic_text', 'embedding', 'created_at', 'updated_at']
-		read_only_fields = ['created_at', 'updated_at']
+		fields = ['resume_id', 'semantic_text', 'embedding', 'embedding_model', 'created_at', 'updated_at']
+		read_only_fields = ['embedding_model', 'created_at', 'updated_at']
 
 
 class ResumeJSONInputSerializer(serializers.Serializer):
@@ -0,0 +1,577 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, F, Max
+from django.db.models.functions import Now
+from django.utils.dateparse import parse_datetime
+from converge.pgvector_index import IVFFLAT_PROBES
+from external.bm25_index import BM25Index
+from external.cluster_users import assign_users, fit_cluster_model, load_cluster_model, save_cluster_model
+from external.embed_resume import EMBED_BATCH_LIMIT, embed_texts, resume_embedding_texts
+from external.knn import UnitEmbeddingMatrix
+from external.parallel_scoring import ScoringCorpus
+from external.quantized_embeddings import QuantizedEmbeddingMatrix
+from external.streaming_scan import streaming_semantic_top_k
+from ratings.models import Rating
+from external.semantic import FACETS
+from projects.models import ProjectEmbedding
+from ratings.services import get_global_rating_data_bulk
+from .models import ResumeEmbedding, ResumeJSON
+
+# Candidates fetched by the pgvector shortlist when the caller gives no k
+PGVECTOR_SHORTLIST_SIZE = 200
+# hnsw.ef_search must be at least LIMIT for the index scan to return k rows
+HNSW_EF_SEARCH_MAX = 1000
+
+# Rows per chunk when streaming embeddings out of the database
+EMBEDDING_CHUNK_SIZE = 2000
+
+# /api/resume/<id>/similar/: largest k, cached neighbour lists per corpus version
+SIMILAR_MAX_K = 200
+SIMILAR_CACHE_SIZE = 4096
+
+# BM25 index: rows re-read behind the sync watermark (commit lag), seconds between saves
+BM25_SYNC_OVERLAP = timedelta(seconds=5)
+BM25_SAVE_INTERVAL = 60.0
+
+# manage.py reembed: rows per batch, provider calls per minute, retries per call
+REEMBED_BATCH_SIZE = 25
+REEMBED_REQUESTS_PER_MINUTE = 150
+REEMBED_MAX_RETRIES = 5
+
+_pgvector_ready: Optional[bool] = None
+
+_quantized_lock = threading.Lock()
+_quantized_cache = {"version": None, "matrix": None}
+
+_parallel_lock = threading.Lock()
+_parallel_cache = {"version": None, "ratings_version": None, "corpus": None}
+
+_similar_lock = threading.Lock()
+_similar_cache = {"version": None, "matrix": None, "results": OrderedDict()}
+
+_bm25_lock = threading.Lock()
+_bm25_cache = {"index": None, "dirty": False, "saved_at": 0.0}
+
+_cluster_lock = threading.Lock()
+_cluster_cache = {"mtime": None, "model": None}
+
+
+def pgvector_available() -> bool:
+    """True when the optional `embedding_vec` column (pgvector) is installed."""
+    global _pgvector_ready
+    if _pgvector_ready is None:
+        if connection.vendor != "postgresql":
+            _pgvector_ready = False
+        else:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT 1 FROM information_schema.columns WHERE table_name = %s AND column_name = %s",
+                    [ResumeEmbedding._meta.db_table, "embedding_vec"],
+                )
+                _pgvector_ready = cursor.fetchone() is not None
+    return _pgvector_ready
+
+
+def to_pgvector_literal(embedding: List[float]) -> str:
+    """Format an embedding as pgvector's text input, e.g. '[0.1,0.2]'."""
+    return "[" + ",".join(repr(float(x)) for x in embedding) + "]"
+
+
+def pgvector_shortlist(query_embedding: List[float], min_similarity: Optional[float], limit: int) -> List[Dict]:
+    """
+    Nearest resumes by cosine similarity, computed in Postgres.
+
+    Runs `ORDER BY embedding_vec <=> q LIMIT k` against the HNSW/IVFFlat index
+    (search breadth raised for the transaction: hnsw.ef_search, ivfflat.probes),
+    dropping rows below `min_similarity` in SQL (no threshold when None). Only
+    the shortlisted rows and their stored resume JSON come back.
+
+    Returns: [{"resume_id", "semantic_score", "resume_json"}, ...] best first
+    """
+    query = to_pgvector_literal(query_embedding)
+    threshold_sql = ""
+    params = [query]
+    if min_similarity is not None:
+        threshold_sql = "AND (e.embedding_vec <=> %s::vector) <= %s"
+        params += [query, 1.0 - min_similarity]
+    params += [query, limit]
+
+    sql = f"""
+        SELECT e.resume_id, 1 - (e.embedding_vec <=> %s::vector) AS similarity, j.resume_json
+        FROM {ResumeEmbedding._meta.db_table} e
+        LEFT JOIN {ResumeJSON._meta.db_table} j ON j.resume_id = e.resume_id
+        WHERE e.embedding_vec IS NOT NULL {threshold_sql}
+        ORDER BY e.embedding_vec <=> %s::vector
+        LIMIT %s
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("SELECT set_config('hnsw.ef_search', %s, true)", [str(min(max(limit, 40), HNSW_EF_SEARCH_MAX))])
+        cursor.execute("SELECT set_config('ivfflat.probes', %s, true)", [str(IVFFLAT_PROBES)])
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    # Django's psycopg backend leaves jsonb undecoded for raw queries
+    return [
+        {
+            "resume_id": resume_id,
+            "semantic_score": float(similarity),
+            "resume_json": (json.loads(resume_json) if isinstance(resume_json, str) else resume_json) or {},
+        }
+        for resume_id, similarity, resume_json in rows
+    ]
+
+
+def count_pgvector_embeddings() -> int:
+    """Number of resumes with a populated `embedding_vec`."""
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT COUNT(*) FROM {ResumeEmbedding._meta.db_table} WHERE embedding_vec IS NOT NULL")
+        return cursor.fetchone()[0]
+
+
+def get_corpus_version() -> Tuple:
+    """
+    Cheap fingerprint of the resume embedding table.
+
+    Changes whenever a resume embedding is inserted, updated or deleted, so it
+    can key any in-process cache derived from the corpus.
+    """
+    agg = ResumeEmbedding.objects.aggregate(**_CORPUS_VERSION_AGGREGATES)
+    return _corpus_version(agg)
+
+
+async def aget_corpus_version() -> Tuple:
+    """Async get_corpus_version."""
+    agg = await ResumeEmbedding.objects.aaggregate(**_CORPUS_VERSION_AGGREGATES)
+    return _corpus_version(agg)
+
+
+_CORPUS_VERSION_AGGREGATES = {"count": Count("id"), "max_id": Max("id"), "last_update": Max("updated_at")}
+
+
+def _corpus_version(agg) -> Tuple:
+    last_update = agg["last_update"].isoformat() if agg["last_update"] else None
+    return (agg["count"], agg["max_id"], last_update)
+
+
+def get_quantized_resume_matrix() -> QuantizedEmbeddingMatrix:
+    """
+    Process-wide int8 copy of all resume embeddings, rebuilt when the corpus changes.
+    """
+    version = get_corpus_version()
+    with _quantized_lock:
+        if _quantized_cache["version"] != version:
+            _quantized_cache["matrix"] = QuantizedEmbeddingMatrix.from_chunks(_iter_embedding_chunks())
+            _quantized_cache["version"] = version
+        return _quantized_cache["matrix"]
+
+
+def acquire_parallel_corpus() -> ScoringCorpus:
+    """
+    Process-wide shared-memory scoring corpus for the parallel scorer, held
+    for the caller: release() it once parallel_top_k returns.
+
+    The shared blocks (unit embeddings plus the resume JSON fields Layer 1
+    needs) are rebuilt only when embeddings or resume JSON change. New
+    ratings just re-read the small global-rating array. A replaced corpus
+    is unlinked when the last request still scoring on it releases it.
+    """
+    json_agg = ResumeJSON.objects.aggregate(count=Count("id"), last_update=Max("updated_at"))
+    rating_agg = Rating.objects.aggregate(count=Count("id"), max_id=Max("id"))
+    version = (
+        get_corpus_version(),
+        (json_agg["count"], json_agg["last_update"].isoformat() if json_agg["last_update"] else None),
+    )
+    ratings_version = (rating_agg["count"], rating_agg["max_id"])
+    with _parallel_lock:
+        if _parallel_cache["version"] != version:
+            records = []
+            for chunk_ids, chunk_embeddings in _iter_embedding_chunks():
+                resume_jsons = dict(ResumeJSON.objects.filter(resume_id__in=chunk_ids).values_list("resume_id", "resume_json"))
+                ratings = get_global_rating_data_bulk(chunk_ids)
+                records.extend(
+                    {
+                        "resume_id": resume_id,
+                        "embedding": embedding,
+                        "resume_json": resume_jsons.get(resume_id) or {},
+                        "global_rating": ratings[resume_id]["global_rating"],
+                    }
+                    for resume_id, embedding in zip(chunk_ids, chunk_embeddings)
+                )
+            if _parallel_cache["corpus"] is not None:
+                _parallel_cache["corpus"].unlink()
+            _parallel_cache["corpus"] = ScoringCorpus.from_records(records, version)
+            _parallel_cache["version"] = version
+            _parallel_cache["ratings_version"] = ratings_version
+        elif _parallel_cache["ratings_version"] != ratings_version:
+            corpus = _parallel_cache["corpus"]
+            corpus.update_ratings(_read_global_ratings(corpus.arrays["resume_ids"].tolist()))
+            _parallel_cache["ratings_version"] = ratings_version
+        return _parallel_cache["corpus"].acquire()
+
+
+def _read_global_ratings(resume_ids: List[int]) -> np.ndarray:
+    """Global rating per resume id, one GROUP BY query per EMBEDDING_CHUNK_SIZE ids."""
+    global_rating = np.empty(len(resume_ids), dtype=np.float64)
+    for start in range(0, len(resume_ids), EMBEDDING_CHUNK_SIZE):
+        chunk_ids = resume_ids[start:start + EMBEDDING_CHUNK_SIZE]
+        ratings = get_global_rating_data_bulk(chunk_ids)
+        global_rating[start:start + len(chunk_ids)] = [ratings[resume_id]["global_rating"] for resume_id in chunk_ids]
+    return global_rating
+
+
+def similar_resumes(resume_id: int, k: int) -> Tuple[Optional[List[Tuple[int, float]]], bool]:
+    """
+    The k nearest resumes to `resume_id` by embedding cosine similarity.
+
+    Answered from a resident unit-vector matrix; neighbour lists are kept
+    (LRU, SIMILAR_CACHE_SIZE) until the corpus version changes, which also
+    rebuilds the matrix.
+
+    Returns: (neighbours or None when the resume has no embedding, cached)
+    """
+    version = get_corpus_version()
+    with _similar_lock:
+        if _similar_cache["version"] != version:
+            _similar_cache["matrix"] = UnitEmbeddingMatrix.from_chunks(_iter_embedding_chunks())
+            _similar_cache["results"] = OrderedDict()
+            _similar_cache["version"] = version
+        matrix, results = _similar_cache["matrix"], _similar_cache["results"]
+        neighbours = results.get((resume_id, k))
+        if neighbours is not None:
+            results.move_to_end((resume_id, k))
+            return neighbours, True
+
+    if resume_id not in matrix.rows:
+        return None, False
+    neighbours = matrix.nearest(resume_id, k)
+    with _similar_lock:
+        if _similar_cache["results"] is results:
+            results[(resume_id, k)] = neighbours
+            if len(results) > SIMILAR_CACHE_SIZE:
+                results.popitem(last=False)
+    return neighbours, False
+
+
+def _iter_embedding_chunks():
+    """Yield (resume_ids, embeddings) chunks of non-empty embeddings with a consistent dimension."""
+    rows = ResumeEmbedding.objects.values_list("resume_id", "embedding").iterator(chunk_size=EMBEDDING_CHUNK_SIZE)
+    dim = None
+    ids, vectors = [], []
+    for resume_id, embedding in rows:
+        if not embedding:
+            continue
+        dim = dim or len(embedding)
+        if len(embedding) != dim:
+            continue
+        ids.append(resume_id)
+        vectors.append(embedding)
+        if len(ids) == EMBEDDING_CHUNK_SIZE:
+            yield ids, vectors
+            ids, vectors = [], []
+    if ids:
+        yield ids, vectors
+
+
+def streaming_shortlist(query_embedding: List[float], k: int, fallback_n: int) -> Dict:
+    """
+    Semantic-gate shortlist from one streaming pass over the embeddings table.
+
+    Rows arrive EMBEDDING_CHUNK_SIZE at a time (a server-side cursor on
+    Postgres) and only the top k passes survive each chunk, so memory stays
+    bounded by the chunk size plus k whatever the corpus size.
+    """
+    return streaming_semantic_top_k(query_embedding, _iter_embedding_chunks(), k, fallback_n)
+
+
+def fetch_resume_embeddings(resume_ids: List[int]) -> Dict[int, list]:
+    """Full-precision embeddings for the given resumes, keyed by resume_id."""
+    return dict(ResumeEmbedding.objects.filter(resume_id__in=resume_ids).values_list("resume_id", "embedding"))
+
+
+def fetch_resume_facet_embeddings(resume_ids: List[int]) -> Dict[int, list]:
+    """Stacked facet embeddings (FACETS x dim) for the given resumes, keyed by resume_id."""
+    return dict(ResumeEmbedding.objects.filter(resume_id__in=resume_ids).values_list("resume_id", "facet_embeddings"))
+
+
+def get_bm25_index() -> BM25Index:
+    """
+    Process-wide BM25 index over resume semantic_text.
+
+    Loaded from settings.BM25_INDEX_PATH on first use, then caught up with
+    every row updated since its watermark (so other workers' upserts show
+    up too); deleted resumes are dropped when the counts disagree. Changes
+    are saved at most every BM25_SAVE_INTERVAL seconds.
+    """
+    with _bm25_lock:
+        index = _bm25_cache["index"]
+        if index is None:
+            index = BM25Index.load(settings.BM25_INDEX_PATH) or BM25Index()
+            _bm25_cache["index"] = index
+        _sync_bm25_index(index)
+        _save_bm25_index(index)
+        return index
+
+
+def index_resume_text(resume_id: int, semantic_text: str):
+    """Upsert hook: re-index one resume if this process has the index loaded."""
+    with _bm25_lock:
+        index = _bm25_cache["index"]
+        if index is not None and index.add(resume_id, semantic_text):
+            _bm25_cache["dirty"] = True
+
+
+def rebuild_bm25_index() -> BM25Index:
+    """Build the index from scratch, save it and make it this process' index."""
+    with _bm25_lock:
+        index = BM25Index()
+        _sync_bm25_index(index)
+        _bm25_cache["index"] = index
+        _save_bm25_index(index, force=True)
+        return index
+
+
+def flush_bm25_index() -> BM25Index:
+    """Catch the index up, compact it and save it now."""
+    index = get_bm25_index()
+    with _bm25_lock:
+        index.compact()
+        _save_bm25_index(index, force=True)
+    return index
+
+
+def _sync_bm25_index(index: BM25Index):
+    rows = ResumeEmbedding.objects.values_list("resume_id", "semantic_text", "updated_at")
+    watermark = parse_datetime(index.watermark) if index.watermark else None
+    if watermark is not None:
+        rows = rows.filter(updated_at__gte=watermark - BM25_SYNC_OVERLAP)
+
+    latest = watermark
+    for resume_id, semantic_text, updated_at in rows.order_by("updated_at").iterator(chunk_size=EMBEDDING_CHUNK_SIZE):
+        if index.add(resume_id, semantic_text):
+            _bm25_cache["dirty"] = True
+        latest = max(latest, updated_at) if latest else updated_at
+
+    if len(index) != ResumeEmbedding.objects.count():
+        live = set(ResumeEmbedding.objects.values_list("resume_id", flat=True))
+        for resume_id in [doc_id for doc_id in index.doc_rows if doc_id not in live]:
+            index.remove(resume_id)
+        _bm25_cache["dirty"] = True
+    if latest is not None:
+        index.watermark = latest.isoformat()
+
+
+def _save_bm25_index(index: BM25Index, force: bool = False):
+    now = time.monotonic()
+    if force or (_bm25_cache["dirty"] and now - _bm25_cache["saved_at"] >= BM25_SAVE_INTERVAL):
+        index.save(settings.BM25_INDEX_PATH)
+        _bm25_cache["dirty"] = False
+        _bm25_cache["saved_at"] = now
+
+
+def update_resume_clusters(refit: bool = False) -> Dict:
+    """
+    Cluster resume embeddings into the persisted model at settings.CLUSTER_MODEL_PATH.
+
+    Fits HDBSCAN when there is no model yet (or refit=True); otherwise only
+    resumes the model has not seen are placed with approximate_predict.
+
+    Returns: {"fitted": bool, "assigned": int, "total": int, "clusters": int}
+    """
+    model = None if refit else load_cluster_model(settings.CLUSTER_MODEL_PATH)
+    fitted = model is None
+
+    records = []
+    for chunk_ids, chunk_embeddings in _iter_embedding_chunks():
+        records.extend(
+            {"user_id": resume_id, "embedding": embedding}
+            for resume_id, embedding in zip(chunk_ids, chunk_embeddings)
+            if fitted or resume_id not in model["assignments"]
+        )
+
+    if fitted:
+        if not records:
+            return {"fitted": False, "assigned": 0, "total": 0, "clusters": 0}
+        model = fit_cluster_model(records)
+    else:
+        assign_users(model, records)
+
+    save_cluster_model(model, settings.CLUSTER_MODEL_PATH)
+    return {
+        "fitted": fitted,
+        "assigned": len(records),
+        "total": len(model["assignments"]),
+        "clusters": len(model["centroid_ids"]),
+    }
+
+
+def get_cluster_model() -> Optional[Dict]:
+    """The persisted cluster model, reloaded only when the file changes."""
+    path = settings.CLUSTER_MODEL_PATH
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    with _cluster_lock:
+        if _cluster_cache["mtime"] != mtime:
+            _cluster_cache["model"] = load_cluster_model(path)
+            _cluster_cache["mtime"] = mtime
+        return _cluster_cache["model"]
+
+
+def embedding_write_fields(model: str, facets: bool = False) -> Dict:
+    """
+    Fields every embedding write sets besides the vectors: the model that
+    produced them, and a cleared re-embed stage (a vector staged from the
+    previous text must not be swapped in later).
+    """
+    fields = {"embedding_model": model, "pending_embedding": None, "pending_model": ""}
+    if facets:
+        fields["pending_facet_embeddings"] = None
+    return fields
+
+
+def count_resume_model_mismatches(model: str) -> int:
+    """Resume embeddings produced by a model other than `model` (the matcher refuses to mix them)."""
+    return ResumeEmbedding.objects.exclude(embedding_model=model).count()
+
+
+async def acount_resume_model_mismatches(model: str) -> int:
+    return await ResumeEmbedding.objects.exclude(embedding_model=model).acount()
+
+
+class _RateLimiter:
+    """Spaces calls at least 60 / requests_per_minute seconds apart."""
+
+    def __init__(self, requests_per_minute: float):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self.next_at = 0.0
+
+    def wait(self):
+        now = time.monotonic()
+        if now < self.next_at:
+            time.sleep(self.next_at - now)
+            now = self.next_at
+        self.next_at = now + self.interval
+
+
+def _embed_batched(texts: List[str], model: str, limiter: _RateLimiter) -> List[list]:
+    """embed_texts in provider-sized calls, rate limited, retrying with exponential backoff."""
+    rows = []
+    for start in range(0, len(texts), EMBED_BATCH_LIMIT):
+        chunk = texts[start:start + EMBED_BATCH_LIMIT]
+        for attempt in range(REEMBED_MAX_RETRIES + 1):
+            limiter.wait()
+            try:
+                rows.extend(embed_texts(chunk, model=model))
+                break
+            except Exception as e:
+                if attempt == REEMBED_MAX_RETRIES:
+                    raise
+                delay = 2 ** attempt
+                print(f"[reembed] provider call failed ({e}); retrying in {delay}s")
+                time.sleep(delay)
+    return rows
+
+
+def stage_reembedding(
+    model: str,
+    batch_size: int = REEMBED_BATCH_SIZE,
+    requests_per_minute: float = REEMBED_REQUESTS_PER_MINUTE,
+    log: Callable[[str], None] = print
+) -> Dict:
+    """
+    Embed every resume and project not yet on `model` into the pending columns.
+
+    Rows are streamed with .iterator(); staged rows are the checkpoint, so an
+    interrupted run resumes where it stopped. A row rewritten by the API while
+    its batch was in flight is left unstaged (its updated_at moved).
+
+    Returns: {"resumes": staged, "projects": staged, "skipped": changed mid-batch}
+    """
+    limiter = _RateLimiter(requests_per_minute)
+    counts = {"resumes": 0, "projects": 0, "skipped": 0}
+
+    def stage(Model, id_field, key, embed_batch, pending_fields):
+        todo = Model.objects.exclude(embedding_model=model).exclude(pending_model=model)
+        total = todo.count()
+        batch = []
+        rows = todo.only("id", id_field, "semantic_text", "updated_at").order_by("id").iterator(chunk_size=batch_size)
+        for row in rows:
+            batch.append(row)
+            if len(batch) == batch_size:
+                _stage_batch(batch, embed_batch(batch), pending_fields, model, key, counts)
+                log(f"[reembed] {key}: {counts[key]}/{total} staged")
+                batch = []
+        if batch:
+            _stage_batch(batch, embed_batch(batch), pending_fields, model, key, counts)
+            log(f"[reembed] {key}: {counts[key]}/{total} staged")
+
+    def embed_resumes(batch):
+        resume_jsons = dict(ResumeJSON.objects.filter(resume_id__in=[r.resume_id for r in batch]).values_list("resume_id", "resume_json"))
+        texts = []
+        for row in batch:
+            texts.extend(resume_embedding_texts(row.semantic_text, resume_jsons.get(row.resume_id) or {}))
+        vectors = _embed_batched(texts, model, limiter)
+        step = 1 + len(FACETS)
+        return [
+            {"pending_embedding": vectors[i * step], "pending_facet_embeddings": vectors[i * step + 1:(i + 1) * step]}
+            for i in range(len(batch))
+        ]
+
+    def embed_projects(batch):
+        vectors = _embed_batched([row.semantic_text for row in batch], model, limiter)
+        return [{"pending_embedding": vector} for vector in vectors]
+
+    stage(ResumeEmbedding, "resume_id", "resumes", embed_resumes, ("pending_embedding", "pending_facet_embeddings"))
+    stage(ProjectEmbedding, "project_id", "projects", embed_projects, ("pending_embedding",))
+    return counts
+
+
+def _stage_batch(batch, staged_rows, pending_fields, model, key, counts):
+    for row, staged in zip(batch, staged_rows):
+        # Conditional on updated_at: skip rows the API rewrote meanwhile
+        updated = type(row).objects.filter(id=row.id, updated_at=row.updated_at).update(
+            pending_model=model, **{field: staged[field] for field in pending_fields}
+        )
+        counts[key if updated else "skipped"] += 1
+
+
+def swap_reembedding(model: str) -> Dict:
+    """
+    Move staged vectors into place for every resume and project in one transaction.
+
+    Refuses (returns {"swapped": False, "remaining": n}) while any row is neither
+    on `model` nor staged for it, so the matcher never sees a half-migrated corpus.
+    """
+    with transaction.atomic():
+        remaining = sum(
+            Model.objects.exclude(embedding_model=model).exclude(pending_model=model).count()
+            for Model in (ResumeEmbedding, ProjectEmbedding)
+        )
+        if remaining:
+            return {"swapped": False, "remaining": remaining, "resumes": 0, "projects": 0}
+
+        # updated_at moves so corpus-version keyed caches (quantized, parallel) rebuild
+        resumes = ResumeEmbedding.objects.filter(pending_model=model).exclude(embedding_model=model).update(
+            embedding=F("pending_embedding"),
+            facet_embeddings=F("pending_facet_embeddings"),
+            updated_at=Now(),
+            **embedding_write_fields(model, facets=True)
+        )
+        projects = ProjectEmbedding.objects.filter(pending_model=model).exclude(embedding_model=model).update(
+            embedding=F("pending_embedding"),
+            updated_at=Now(),
+            **embedding_write_fields(model)
+        )
+        # Anything still staged was rewritten on `model` by the API meanwhile; keep its fresh vectors
+        ResumeEmbedding.objects.exclude(pending_model="").update(pending_embedding=None, pending_facet_embeddings=None, pending_model="")
+        ProjectEmbedding.objects.exclude(pending_model="").update(pending_embedding=None, pending_model="")
+    return {"swapped": True, "remaining": 0, "resumes": resumes, "projects": projects}
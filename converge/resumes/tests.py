@@ -1,3 +1,346 @@
-from django.test import TestCase
+import math
+import multiprocessing
+import os
+import random
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.test import SimpleTestCase, TestCase
+
+from external import embed_resume
+from external import knn
+from external.embedding_store import EmbeddingStore
+from external import parse_resume
+
+from external.bm25_index import BM25_B, BM25_K1, BM25Index, reciprocal_rank_fusion, tokenize
+from ratings.models import Rating
+
+from . import services
+from .models import ResumeEmbedding, ResumeJSON
+
+
+class ParallelCorpusCacheTests(TestCase):
+	"""New ratings refresh the rating array; only embedding or JSON changes rebuild the corpus."""
+
+	def setUp(self):
+		for resume_id in (1, 2):
+			ResumeEmbedding.objects.create(resume_id=resume_id, embedding=[1.0, float(resume_id)])
+			ResumeJSON.objects.create(resume_id=resume_id, resume_json={})
+		services._parallel_cache.update(version=None, ratings_version=None, corpus=None)
+
+	def tearDown(self):
+		if services._parallel_cache["corpus"] is not None:
+			services._parallel_cache["corpus"].unlink()
+
+	def test_rating_refreshes_without_rebuild(self):
+		corpus = services.acquire_parallel_corpus()
+		corpus.release()
+		before = corpus.global_rating.copy()
+
+		Rating.objects.create(rater_id=1, ratee_id=2, project_id="p", category_scores={"overall": 5}, raw_rating=5.0, adjusted_rating=5.0)
+		refreshed = services.acquire_parallel_corpus()
+		refreshed.release()
+		self.assertIs(refreshed, corpus)
+		self.assertEqual(refreshed.global_rating[0], before[0])
+		self.assertGreater(refreshed.global_rating[1], before[1])
+
+		ResumeEmbedding.objects.create(resume_id=3, embedding=[0.0, 1.0])
+		rebuilt = services.acquire_parallel_corpus()
+		rebuilt.release()
+		self.assertIsNot(rebuilt, corpus)
+		self.assertEqual(rebuilt.size, 3)
+
+
+class UpsertEmbeddingCallTests(TestCase):
+	"""Both upsert views embed the semantic text and the facets in one provider call."""
+
+	resume_json = {
+		"skills": {"programming_languages": ["Python", "Go"]},
+		"projects": [{"title": "Matcher", "description": "Team matching service"}],
+		"interests": {"technical": ["distributed systems"]},
+	}
+
+	def fake_client(self):
+		def embed_content(model, contents, config):
+			rows = [mock.Mock(values=[float(i + 1)] * 768) for i in range(len(contents))]
+			return mock.Mock(embeddings=rows)
+
+		client = mock.Mock()
+		client.models.embed_content.side_effect = embed_content
+		client.aio.models.embed_content = mock.AsyncMock(side_effect=embed_content)
+		return client
+
+	def test_one_embedding_call_per_upsert(self):
+		for resume_id, url, calls in (
+			(1, "/api/resume/json/", lambda client: client.models.embed_content),
+			(2, "/api/resume/json/async/", lambda client: client.aio.models.embed_content),
+		):
+			client = self.fake_client()
+			with mock.patch.object(embed_resume, "get_genai_client", return_value=client):
+				response = self.client.post(
+					url, {"resume_id": resume_id, "resume_json": self.resume_json}, content_type="application/json"
+				)
+			self.assertEqual(response.status_code, 201, url)
+			self.assertEqual(calls(client).call_count, 1, url)
+			self.assertEqual(len(calls(client).call_args.kwargs["contents"]), 4, url)
+
+			stored = ResumeEmbedding.objects.get(resume_id=resume_id)
+			self.assertEqual(stored.embedding[0], 1.0)
+			self.assertEqual([row[0] for row in stored.facet_embeddings], [2.0, 3.0, 4.0])
+
+
+def _reference_bm25(documents, query, k):
+	"""BM25 over {doc_id: text} recomputed from scratch."""
+	tokens = {doc_id: tokenize(text) for doc_id, text in documents.items()}
+	if not tokens:
+		return []
+	avgdl = sum(len(t) for t in tokens.values()) / len(tokens) or 1.0
+	scores = {}
+	for term in set(tokenize(query)):
+		df = sum(term in t for t in tokens.values())
+		if not df:
+			continue
+		idf = math.log(1.0 + (len(tokens) - df + 0.5) / (df + 0.5))
+		for doc_id, t in tokens.items():
+			tf = t.count(term)
+			if tf:
+				norm = BM25_K1 * (1.0 - BM25_B + BM25_B * len(t) / avgdl)
+				scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (BM25_K1 + 1.0) / (tf + norm)
+	return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+
+
+class BM25IndexTests(SimpleTestCase):
+	"""Incremental adds, replacements and removals score like a from-scratch BM25."""
+
+	VOCABULARY = ["python", "django", "c++", "node.js", "react", "sql", "rust", "ml", "ros2", "go", "kafka", "docker"]
+	QUERIES = ["python django", "c++ ros2", "node.js react sql", "kafka", "haskell"]
+
+	def random_text(self, rng):
+		return " ".join(rng.choice(self.VOCABULARY) for _ in range(rng.randint(1, 12)))
+
+	def assertMatchesReference(self, index, documents):
+		self.assertEqual(len(index), len(documents))
+		for query in self.QUERIES:
+			actual = index.search(query, 10)
+			expected = _reference_bm25(documents, query, 10)
+			self.assertEqual([doc_id for doc_id, _ in actual], [doc_id for doc_id, _ in expected], query)
+			for (_, a), (_, e) in zip(actual, expected):
+				self.assertAlmostEqual(a, e, places=9)
+
+	def test_tokenize_keeps_technology_names(self):
+		self.assertEqual(tokenize("C++, Node.js and scikit-learn; ROS2."), ["c++", "node.js", "and", "scikit-learn", "ros2"])
+
+	def test_add_remove_compact_round_trip(self):
+		rng = random.Random(41)
+		index, documents = BM25Index(), {}
+		for _ in range(400):
+			doc_id = rng.randrange(120)
+			if rng.random() < 0.2:
+				index.remove(doc_id)
+				documents.pop(doc_id, None)
+			else:
+				text = self.random_text(rng)
+				index.add(doc_id, text)
+				documents[doc_id] = text
+		self.assertGreater(index.dead_rows, 0)
+		self.assertMatchesReference(index, documents)
+
+		doc_id, text = next(iter(documents.items()))
+		self.assertFalse(index.add(doc_id, text))  # unchanged text is a no-op
+
+		with tempfile.TemporaryDirectory() as tmp:
+			path = os.path.join(tmp, "bm25.npz")
+			index.watermark = {"synced": "2026-01-01T00:00:00"}
+			index.save(path)  # over COMPACT_DEAD_RATIO: compacted on save
+			self.assertEqual(index.dead_rows, 0)
+			loaded = BM25Index.load(path)
+			self.assertEqual(loaded.watermark, index.watermark)
+			self.assertMatchesReference(loaded, documents)
+
+			# A few dead rows survive a save below the ratio and still score as removed
+			loaded.remove(doc_id)
+			documents.pop(doc_id)
+			loaded.save(path)
+			self.assertEqual(loaded.dead_rows, 1)
+			reloaded = BM25Index.load(path)
+			self.assertEqual(reloaded.dead_rows, 1)
+			self.assertMatchesReference(reloaded, documents)
+
+			reloaded.add(999, "python python kafka")
+			documents[999] = "python python kafka"
+			reloaded.compact()
+			self.assertMatchesReference(reloaded, documents)
+			self.assertEqual(os.listdir(tmp), ["bm25.npz"])
+
+		self.assertIsNone(BM25Index.load(os.path.join(tmp, "missing.npz")))
+
+	def test_reciprocal_rank_fusion(self):
+		fused = reciprocal_rank_fusion([[1, 2, 3], [3, 1]], k=60)
+		self.assertEqual([doc_id for doc_id, _ in fused], [1, 3, 2])
+		self.assertAlmostEqual(fused[0][1], 1 / 61 + 1 / 62)
+
+
+class UnitEmbeddingMatrixTests(SimpleTestCase):
+	"""nearest() against a brute-force float32 cosine ranking (ties by resume id)."""
+
+	def setUp(self):
+		rng = np.random.default_rng(44)
+		embeddings = rng.normal(size=(300, 16))
+		embeddings[50:60] = embeddings[10]        # exact ties, including across the k cut-off
+		embeddings[70:75] = 3.0 * embeddings[20]  # same direction, different length
+		embeddings[99] = 0.0
+		self.ids = [int(i) for i in rng.permutation(np.arange(1000, 2000))[:300]]
+		self.embeddings = embeddings
+		chunks = [(self.ids[i:i + 64], embeddings[i:i + 64].tolist()) for i in range(0, 300, 64)]
+		self.matrix = knn.UnitEmbeddingMatrix.from_chunks(chunks)
+
+	def reference(self, row, k):
+		units = self.embeddings.astype(np.float32)
+		norms = np.linalg.norm(units, axis=1)
+		norms[norms == 0] = 1.0
+		units /= norms[:, None]
+		sims = units @ units[row]
+		ranked = sorted((-sims[i], self.ids[i]) for i in range(len(self.ids)) if i != row)
+		return [(resume_id, -neg) for neg, resume_id in ranked[:k]]
+
+	def assertSameNeighbours(self, actual, expected):
+		self.assertEqual([resume_id for resume_id, _ in actual], [resume_id for resume_id, _ in expected])
+		for (_, a), (_, e) in zip(actual, expected):
+			self.assertAlmostEqual(a, e, places=5)
+
+	def test_nearest_matches_brute_force(self):
+		with mock.patch.object(knn, "BLOCK_ROWS", 37):
+			for row in (0, 10, 20, 55, 99, 299):
+				for k in (1, 5, 12, 299, 500):
+					self.assertSameNeighbours(self.matrix.nearest(self.ids[row], k), self.reference(row, k))
+
+	def test_edge_cases(self):
+		self.assertEqual(self.matrix.nearest(self.ids[0], 0), [])
+		with self.assertRaises(KeyError):
+			self.matrix.nearest(1, 5)
+		single = knn.UnitEmbeddingMatrix.from_chunks([([7], [[1.0, 0.0]])])
+		self.assertEqual(single.nearest(7, 5), [])
+		empty = knn.UnitEmbeddingMatrix.from_chunks([])
+		self.assertEqual(len(empty), 0)
+
+	def test_shared_skills(self):
+		shared = knn.shared_skills(
+			{"skills": {"languages": ["Python", "Go", "python"], "tools": ["Docker", "Git"], "notes": "n/a"}},
+			{"skills": {"stack": ["python", "docker"], "other": None}},
+		)
+		self.assertEqual(shared, {"count": 2, "by_category": {"languages": ["Python"], "tools": ["Docker"]}})
+
+
+class ResumeValidationTests(SimpleTestCase):
+	"""_check / validate_resume: coerce what is unambiguous, fail the section otherwise."""
+
+	def check(self, value, schema):
+		return parse_resume._check(value, schema)
+
+	def test_scalar_coercion(self):
+		integer, number, string = parse_resume._INT, {"type": "NUMBER"}, parse_resume._STR
+		level = parse_resume._LEVEL
+		cases = [
+			(None, integer, (True, 0)),
+			("4", integer, (True, 4)),
+			(4.0, integer, (True, 4)),
+			("4.5", integer, (False, None)),
+			(True, integer, (False, None)),
+			("many", integer, (False, None)),
+			("4.5", number, (True, 4.5)),
+			(False, number, (False, None)),
+			(None, number, (True, 0.0)),
+			(2024, string, (True, "2024")),
+			(True, string, (False, None)),
+			(["a"], string, (False, None)),
+			(" Advanced ", level, (True, "advanced")),
+			("", level, (True, "")),
+			(None, level, (True, "")),
+			("expert", level, (False, "expert")),
+		]
+		for value, schema, expected in cases:
+			self.assertEqual(self.check(value, schema), expected, (value, schema))
+
+	def test_containers(self):
+		project = parse_resume.RESPONSE_SCHEMA["properties"]["projects"]
+		ok, projects = self.check([{"title": "Bot", "team_size": "3", "completion_status": "Completed", "extra": 1}], project)
+		self.assertTrue(ok)
+		self.assertEqual(projects[0]["team_size"], 3)
+		self.assertEqual(projects[0]["completion_status"], "completed")
+		self.assertEqual(projects[0]["technologies"], [])  # missing -> default
+		self.assertNotIn("extra", projects[0])
+		self.assertEqual(self.check({"title": "Bot"}, project), (False, None))  # not a list
+		self.assertEqual(self.check([{"team_size": "three"}], project), (False, None))  # one bad item fails the array
+		self.assertEqual(self.check(["python", 3], parse_resume._STRS), (True, ["python", "3"]))
+
+	def test_validate_resume_reports_failed_sections(self):
+		data = {
+			"profile": {"name": "Ada", "availability": "HIGH"},
+			"skills": {"programming_languages": "Python"},  # a string, not a list
+			"reputation_signals": {"completed_projects": "2", "average_rating": "4.5", "peer_endorsements": None},
+		}
+		resume, failed = parse_resume.validate_resume(data)
+		self.assertEqual(resume["profile"]["availability"], "high")
+		self.assertEqual(resume["reputation_signals"], {"completed_projects": 2, "average_rating": 4.5, "peer_endorsements": 0})
+		self.assertEqual(resume["skills"], parse_resume._default(parse_resume.RESPONSE_SCHEMA["properties"]["skills"]))
+		self.assertEqual(set(failed), set(parse_resume.SECTIONS) - {"profile", "reputation_signals"})
+		self.assertEqual(list(resume), parse_resume.SECTIONS)
+
+		resume, failed = parse_resume.validate_resume(["not", "a", "dict"], ["profile", "skills"])
+		self.assertEqual((list(resume), failed), (["profile", "skills"], ["profile", "skills"]))
+
+	def test_load_json(self):
+		self.assertEqual(parse_resume._load_json('{"a": 1}'), {"a": 1})
+		self.assertEqual(parse_resume._load_json('Here you go:\n```json\n{"a": [1, 2,],}\n```'), {"a": [1, 2]})
+		self.assertIsNone(parse_resume._load_json("no json here"))
+
+	def test_only_failed_sections_are_re_requested(self):
+		first = {name: {} for name in parse_resume.SECTIONS if name != "projects"}
+		first["skills"] = {"programming_languages": 42}
+		requests = []
+
+		def generate(resume_text, sections, model, usage):
+			requests.append(list(sections))
+			usage["llm_calls"] += 1
+			if len(requests) == 1:
+				return first
+			return {"skills": {"programming_languages": ["Go"]}, "projects": []}
+
+		with mock.patch.object(parse_resume, "_generate", side_effect=generate), \
+				mock.patch.object(parse_resume, "get_parser_model", return_value="models/gemini-test"):
+			resume = parse_resume.parse_resume("resume text")
+		self.assertEqual(requests, [parse_resume.SECTIONS, ["skills", "projects"]])
+		self.assertEqual(resume["skills"]["programming_languages"], ["Go"])
+		self.assertEqual(resume["projects"], [])
+		self.assertIn("embeddings", resume)
+
+
+def _upsert_users(root, worker, count):
+	with EmbeddingStore(root) as store:
+		for i in range(count):
+			store.upsert_user(f"w{worker}_{i}", [float(worker), float(i), 1.0])
+
+
+class EmbeddingStoreConcurrencyTests(SimpleTestCase):
+	"""Processes sharing a store must not hand two users the same vector row."""
+
+	def test_concurrent_upserts_keep_their_own_vectors(self):
+		workers, count = 4, 150
+		with tempfile.TemporaryDirectory() as root:
+			context = multiprocessing.get_context("fork")
+			processes = [context.Process(target=_upsert_users, args=(root, w, count)) for w in range(workers)]
+			for process in processes:
+				process.start()
+			for process in processes:
+				process.join(60)
+				self.assertEqual(process.exitcode, 0)
+
+			with EmbeddingStore(root) as store:
+				ids, matrix = store.user_matrix()
+				self.assertEqual(len(ids), workers * count)
+				for user_id, vector in zip(ids, matrix):
+					worker, i = user_id[1:].split("_")
+					self.assertEqual(vector.tolist(), [float(worker), float(i), 1.0])
+				store.compact()
+				self.assertEqual(store.get_user("w3_149")["embedding"], [3.0, 149.0, 1.0])
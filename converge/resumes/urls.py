@@ -5,5 +5,9 @@ app_name = "resumes"
 
 urlpatterns = [
 	path("json/", views.upsert_resume_json, name="upsert-json"),
+	path("json/async/", views.upsert_resume_json_async, name="upsert-json-async"),
+	path("clusters/", views.resume_clusters, name="clusters"),
+	path("<int:resume_id>/cluster/", views.resume_cluster, name="cluster"),
+	path("<int:resume_id>/similar/", views.resume_similar, name="similar"),
 ]
 
@@ -1,5 +1,9 @@
+import json
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 from rest_framework import status
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, renderer_classes
 from rest_framework.response import Response
 from .models import ResumeEmbedding, ResumeJSON
 from .serializers import (
@@ -7,22 +11,42 @@ from .serializers import (
 	ResumeJSONInputSerializer,
 	ResumeJSONSerializer,
 )
+from .services import (
+	SIMILAR_MAX_K,
+	embedding_write_fields,
+	get_cluster_model,
+	index_resume_text,
+	similar_resumes,
+)
+from converge.renderers import FastJSONRenderer, fast_json_dumps, parse_embedding_format
 from external.semantic import build_semantic_text
-from external.embed_resume import embed_semantic_text
+from external.embed_resume import aembed_texts, embed_texts, resume_embedding_texts
+from external.cluster_users import assign_users
+from external.knn import shared_skills
+from external.genai_client import get_embedding_model
 
 
 @api_view(['POST'])
+@renderer_classes([FastJSONRenderer])
 def upsert_resume_json(request):
 	"""
 	Store/update canonical resume JSON and generate/update its embedding in one step.
 	Accepts either `resume_json` or `parsed_json` for convenience.
 
-	POST /api/resume/json/
+	POST /api/resume/json/?embedding_format=none
 	Body: {
 		"resume_id": 123,
 		"resume_json" | "parsed_json": { ... }
 	}
+
+	embedding_format (query or body): "none" (default) omits the vector,
+	"base64_f32" returns it as base64 little-endian float32, "json" as floats.
 	"""
+	try:
+		embedding_format = parse_embedding_format(request.query_params, request.data)
+	except ValueError as e:
+		return Response({"embedding_format": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
 	input_serializer = ResumeJSONInputSerializer(data=request.data)
 
 	if not input_serializer.is_valid():
@@ -38,19 +62,24 @@ def upsert_resume_json(request):
 		)
 
 		# Generate semantic text and embedding immediately
+		model = get_embedding_model()
 		semantic_text = build_semantic_text(resume_json)
-		embedding = embed_semantic_text(semantic_text)
+		# Semantic text plus the skills / projects / interests facets in one provider call
+		embedding, *facet_embeddings = embed_texts(resume_embedding_texts(semantic_text, resume_json), model=model)
 
 		resume_embedding, emb_created = ResumeEmbedding.objects.update_or_create(
 			resume_id=resume_id,
 			defaults={
 				"semantic_text": semantic_text,
 				"embedding": embedding,
+				"facet_embeddings": facet_embeddings,
+				**embedding_write_fields(model, facets=True),
 			}
 		)
+		index_resume_text(resume_id, semantic_text)
 
 		output_serializer = ResumeJSONSerializer(resume_record)
-		embedding_serializer = ResumeEmbeddingSerializer(resume_embedding)
+		embedding_serializer = ResumeEmbeddingSerializer(resume_embedding, context={"embedding_format": embedding_format})
 		return Response(
 			{
 				"message": "Resume JSON and embedding stored successfully",
@@ -66,3 +95,195 @@ def upsert_resume_json(request):
 		)
 
 
+@csrf_exempt
+@require_POST
+async def upsert_resume_json_async(request):
+	"""
+	Async upsert_resume_json: same body and response, but the embedding call is
+	awaited on the event loop and the ORM writes use Django's async API, so an
+	ASGI worker keeps serving other requests while Gemini responds.
+
+	POST /api/resume/json/async/?embedding_format=none
+	"""
+	try:
+		data = json.loads(request.body or b"{}")
+	except ValueError:
+		return JsonResponse({"error": "Invalid JSON body"}, status=status.HTTP_400_BAD_REQUEST)
+
+	try:
+		embedding_format = parse_embedding_format(request.GET, data)
+	except ValueError as e:
+		return JsonResponse({"embedding_format": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+	input_serializer = ResumeJSONInputSerializer(data=data)
+
+	if not input_serializer.is_valid():
+		return JsonResponse(input_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+	resume_id = input_serializer.validated_data['resume_id']
+	resume_json = input_serializer.validated_data['resume_json']
+
+	try:
+		resume_record, created = await ResumeJSON.objects.aupdate_or_create(
+			resume_id=resume_id,
+			defaults={"resume_json": resume_json}
+		)
+
+		model = get_embedding_model()
+		semantic_text = build_semantic_text(resume_json)
+		embedding, *facet_embeddings = await aembed_texts(resume_embedding_texts(semantic_text, resume_json), model=model)
+
+		resume_embedding, emb_created = await ResumeEmbedding.objects.aupdate_or_create(
+			resume_id=resume_id,
+			defaults={
+				"semantic_text": semantic_text,
+				"embedding": embedding,
+				"facet_embeddings": facet_embeddings,
+				**embedding_write_fields(model, facets=True),
+			}
+		)
+		index_resume_text(resume_id, semantic_text)
+
+		return HttpResponse(
+			fast_json_dumps({
+				"message": "Resume JSON and embedding stored successfully",
+				"json_record": ResumeJSONSerializer(resume_record).data,
+				"embedding_record": ResumeEmbeddingSerializer(resume_embedding, context={"embedding_format": embedding_format}).data
+			}),
+			status=status.HTTP_201_CREATED if created or emb_created else status.HTTP_200_OK,
+			content_type="application/json"
+		)
+	except Exception as e:
+		return JsonResponse(
+			{"error": f"Resume JSON storage failed: {str(e)}"},
+			status=status.HTTP_500_INTERNAL_SERVER_ERROR
+		)
+
+
+@api_view(['GET'])
+def resume_clusters(request):
+	"""
+	Cached cluster assignments for all clustered resumes.
+
+	GET /api/resume/clusters/?cluster=cluster_3
+	Assignments are refreshed by `manage.py cluster_resumes`.
+	"""
+	model = get_cluster_model()
+	if model is None:
+		return Response(
+			{"error": "No cluster model yet; run manage.py cluster_resumes"},
+			status=status.HTTP_404_NOT_FOUND
+		)
+
+	assignments = model["assignments"]
+	cluster = request.query_params.get('cluster')
+	if cluster:
+		assignments = {
+			resume_id: data for resume_id, data in assignments.items()
+			if any(m["cluster_id"] == cluster for m in data["memberships"]) or data["primary_cluster"] == cluster
+		}
+
+	return Response({
+		"fitted_at": model["fitted_at"],
+		"clusters": [f"cluster_{c}" for c in model["centroid_ids"]],
+		"count": len(assignments),
+		"assignments": assignments,
+	}, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+def resume_cluster(request, resume_id):
+	"""
+	Cluster assignment for one resume.
+
+	GET /api/resume/{resume_id}/cluster/
+	Resumes added since the last clustering run are placed on the fly with
+	approximate_predict (not persisted until the next cluster_resumes run).
+	"""
+	model = get_cluster_model()
+	if model is None:
+		return Response(
+			{"error": "No cluster model yet; run manage.py cluster_resumes"},
+			status=status.HTTP_404_NOT_FOUND
+		)
+
+	assignment = model["assignments"].get(resume_id)
+	cached = assignment is not None
+	if not cached:
+		embedding = ResumeEmbedding.objects.filter(resume_id=resume_id).values_list("embedding", flat=True).first()
+		if not embedding:
+			return Response(
+				{"error": f"Resume {resume_id} has no embedding"},
+				status=status.HTTP_404_NOT_FOUND
+			)
+		# Assign against a shallow copy so the cached model is not mutated
+		preview = dict(model, assignments={})
+		assignment = assign_users(preview, [{"user_id": resume_id, "embedding": embedding}])[resume_id]
+
+	return Response({"resume_id": resume_id, "cached": cached, **assignment}, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@renderer_classes([FastJSONRenderer])
+def resume_similar(request, resume_id):
+	"""
+	Resumes most similar to one resume (teammate suggestions, duplicate detection).
+
+	GET /api/resume/{resume_id}/similar/?k=20&skills=true
+	Cosine similarity of the resume embeddings, from a resident matrix;
+	neighbour lists are cached until a resume embedding changes.
+	skills=true adds the skills each neighbour shares with this resume.
+
+	Returns: {
+		"resume_id": 123,
+		"k": 20,
+		"cached": false,
+		"neighbours": [
+			{"resume_id": 456, "similarity": 0.91,
+			 "shared_skills": {"count": 2, "by_category": {"programming_languages": ["Python", "Rust"]}}},
+			...
+		],
+		"count": 20
+	}
+	"""
+	try:
+		k = int(request.query_params.get('k', 20))
+	except ValueError:
+		return Response({"error": "k must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+	if not 1 <= k <= SIMILAR_MAX_K:
+		return Response({"error": f"k must be between 1 and {SIMILAR_MAX_K}"}, status=status.HTTP_400_BAD_REQUEST)
+	with_skills = request.query_params.get('skills', '').lower() in ('1', 'true', 'yes')
+
+	try:
+		neighbours, cached = similar_resumes(resume_id, k)
+		if neighbours is None:
+			return Response(
+				{"error": f"Resume {resume_id} has no embedding"},
+				status=status.HTTP_404_NOT_FOUND
+			)
+
+		results = [
+			{"resume_id": other_id, "similarity": round(similarity, 4)}
+			for other_id, similarity in neighbours
+		]
+		if with_skills:
+			resume_jsons = dict(
+				ResumeJSON.objects
+				.filter(resume_id__in=[resume_id] + [other_id for other_id, _ in neighbours])
+				.values_list("resume_id", "resume_json")
+			)
+			for result in results:
+				result["shared_skills"] = shared_skills(resume_jsons.get(resume_id), resume_jsons.get(result["resume_id"]))
+
+		return Response({
+			"resume_id": resume_id,
+			"k": k,
+			"cached": cached,
+			"neighbours": results,
+			"count": len(results),
+		}, status=status.HTTP_200_OK)
+	except Exception as e:
+		return Response(
+			{"error": f"Similarity search failed: {str(e)}"},
+			status=status.HTTP_500_INTERNAL_SERVER_ERROR
+		)
@@ -118,7 +118,8 @@ def test_matching(project_json_path, resume_json_paths):
             project_type,
             required_skills,
             skills,
-            experience.get("overall", "beginner")
+            experience.get("overall", "beginner"),
+            semantic_score=sim_score
         )
         print(f"    Capability: {capability_data['capability_score']:.4f}")
         print(f"      - Semantic:   {capability_data['s_semantic']:.4f}")